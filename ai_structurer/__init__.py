@@ -1,2 +1,23 @@
 # ai_structurer package
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+# The pipeline entry points are loaded on first access, so `import ai_structurer`
+# (and every submodule import, e.g. the CLI) stays cheap.
+_LAZY = {
+    "process_all_inputs": "runner",
+    "write_outputs": "runner",
+    "iter_records": "runner",
+    "stream_outputs": "runner",
+}
+
+__all__ = ["__version__", *_LAZY]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+
+        value = getattr(import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
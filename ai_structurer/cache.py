@@ -0,0 +1,112 @@
+"""Persistent content-addressed cache for raw LLM responses.
+
+ResponseCache stores the raw text returned by call_groq_llm in SQLite, keyed by
+a hash of model + prompt + max_tokens. Entries expire after a TTL and the
+least recently used entries are evicted once the cache grows past max_entries.
+Callers decide what is worth storing (the runner only stores responses that
+parse_and_repair_json can parse).
+"""
+from typing import Optional, Dict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from . import metrics
+
+DEFAULT_CACHE_PATH = ".ai_structurer_cache.sqlite3"
+
+
+def cache_key(model: str, prompt: str, max_tokens: int) -> str:
+    payload = json.dumps([model, prompt, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL and size-based LRU eviction.
+
+    - path: database file (":memory:" for an in-process cache)
+    - max_entries: upper bound on stored responses, 0 for unbounded
+    - ttl_seconds: entries older than this are treated as misses, 0 disables expiry
+
+    Safe to share between worker threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 100_000, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        # WAL lets shard worker processes share one cache file
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, model: str, prompt: str, max_tokens: int) -> Optional[str]:
+        key = cache_key(model, prompt, max_tokens)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                metrics.incr("cache_misses")
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            metrics.incr("cache_hits")
+            return row[0]
+
+    def put(self, model: str, prompt: str, max_tokens: int, response: str):
+        key = cache_key(model, prompt, max_tokens)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self.stores += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl_seconds:
+            cur = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self.evictions += max(cur.rowcount, 0)
+        if self.max_entries:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                cur = self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.evictions += max(cur.rowcount, 0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores, "evictions": self.evictions}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
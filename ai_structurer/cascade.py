@@ -0,0 +1,116 @@
+"""Model cascade: a fast model first, the large model only for hard lines.
+
+With a cascade configured, the runner sends each line to fast_model first
+(one call, no correction prompt). A line goes to the large model (the run's
+--model, with the usual retry.RetryPolicy attempts) only when:
+
+- parse_and_repair_json could not parse the fast answer, or
+- a record fails the confidence check: one of the required fields
+  (material_name, quantity by default) is null, or there are no records.
+
+Batched prompts go to the fast model too; lines the batched answer does not
+cover confidently go straight to the large model.
+
+Per-tier line counts, confident answers and latencies (each tier's own time
+for a line, escalations from batched prompts included) are kept on the
+cascade for stats_line(). Counters: cascade_fast_accepted,
+cascade_escalations; histograms: cascade_fast, cascade_large.
+
+configure_cascade sets the cascade for the whole process, like
+retry.configure_retries; without it every line goes to the large model.
+"""
+from typing import Dict, List, Optional, Sequence
+import threading
+
+from . import metrics
+from .retry import LatencyWindow
+
+DEFAULT_REQUIRED = ("material_name", "quantity")
+
+
+class TierStats:
+    """Line count, accepted lines and recent latencies for one tier."""
+
+    def __init__(self):
+        self.lines = 0
+        self.accepted = 0
+        self.seconds = 0.0
+        self.latencies = LatencyWindow(size=4096, refresh=64)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, accepted: bool):
+        with self._lock:
+            self.lines += 1
+            self.accepted += accepted
+            self.seconds += seconds
+        self.latencies.observe(seconds)
+
+    def summary(self) -> Dict:
+        p50, p95 = self.latencies.quantile(0.5), self.latencies.quantile(0.95)
+        return {
+            "lines": self.lines,
+            "accepted": self.accepted,
+            "mean_s": self.seconds / self.lines if self.lines else None,
+            "p50_s": p50,
+            "p95_s": p95,
+        }
+
+
+class ModelCascade:
+    """Fast-model tier in front of the large model; see the module docstring."""
+
+    def __init__(self, fast_model: str, required: Sequence[str] = DEFAULT_REQUIRED):
+        self.fast_model = fast_model
+        self.required = tuple(required)
+        self.fast = TierStats()
+        self.large = TierStats()
+
+    def confident(self, records: Optional[List[dict]]) -> bool:
+        """True when records exist and none has a null required field."""
+        if not records:
+            return False
+        return all(rec.get(key) is not None for rec in records for key in self.required)
+
+    def accept_fast(self, records: Optional[List[dict]], seconds: float) -> bool:
+        """Record a fast-tier answer; False means the line must be escalated."""
+        ok = self.confident(records)
+        self.fast.observe(seconds, ok)
+        metrics.incr("cascade_fast_accepted" if ok else "cascade_escalations")
+        metrics.observe("cascade_fast", seconds)
+        return ok
+
+    def observe_large(self, records: Optional[List[dict]], seconds: float):
+        """Record the large-model time spent on an escalated line.
+
+        The line counts as accepted only when the answer passes the confidence
+        check; the null fallback never does.
+        """
+        self.large.observe(seconds, self.confident(records))
+        metrics.observe("cascade_large", seconds)
+
+    def hit_rate(self) -> float:
+        return self.fast.accepted / self.fast.lines if self.fast.lines else 0.0
+
+    def stats(self) -> Dict:
+        return {"fast_model": self.fast_model, "hit_rate": self.hit_rate(), "fast": self.fast.summary(), "large": self.large.summary()}
+
+    def stats_line(self) -> str:
+        line = f"cascade: {self.fast.accepted}/{self.fast.lines} lines answered by {self.fast_model} ({self.hit_rate():.1%}), {self.large.lines} escalated"
+        for name, tier in (("fast", self.fast), ("large", self.large)):
+            s = tier.summary()
+            if s["lines"]:
+                line += f"; {name} p50 {s['p50_s'] * 1000:.0f}ms p95 {s['p95_s'] * 1000:.0f}ms"
+        return line
+
+
+_cascade: Optional[ModelCascade] = None
+
+
+def configure_cascade(fast_model: Optional[str] = None, required: Sequence[str] = DEFAULT_REQUIRED):
+    """Route lines through fast_model first; None turns the cascade off."""
+    global _cascade
+    _cascade = ModelCascade(fast_model, required) if fast_model else None
+
+
+def get_cascade() -> Optional[ModelCascade]:
+    return _cascade
@@ -0,0 +1,79 @@
+"""Checkpoint journal for resumable runs.
+
+CheckpointJournal appends one NDJSON entry per finished input line:
+{"i": line index, "h": hash of the line text, "records": [...]}. On resume the
+journal is loaded and lines whose index and hash both match are skipped, so
+only the missing lines reach the LLM. A torn final entry (crash mid-write) is
+ignored and that line is simply extracted again. The runner does not journal
+lines that ended in the null fallback (e.g. during an LLM outage), so a
+resumed run retries them.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+
+
+def line_hash(line: str) -> str:
+    return hashlib.sha1(line.encode("utf-8")).hexdigest()
+
+
+class CheckpointJournal:
+    """Append-only journal of completed lines.
+
+    - path: journal file
+    - resume: if True, load existing entries; otherwise start a fresh journal
+
+    Safe to share between worker threads.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self._done: Dict[int, Tuple[str, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._load()
+            mode = "a"
+        else:
+            mode = "w"
+        self._f = open(path, mode, encoding="utf-8")
+        if mode == "a" and self._f.tell() and not self._ends_with_newline():
+            # Terminate a torn last entry so new entries start on their own line
+            self._f.write("\n")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    entry = json.loads(raw)
+                    self._done[int(entry["i"])] = (entry["h"], entry["records"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def lookup(self, index: int, line: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the journaled records for this line, or None if it still needs work."""
+        entry = self._done.get(index)
+        if entry is None or entry[0] != line_hash(line):
+            return None
+        return entry[1]
+
+    def record(self, index: int, line: str, records: List[Dict[str, Any]]):
+        entry = {"i": index, "h": line_hash(line), "records": records}
+        data = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._done[index] = (entry["h"], records)
+            self._f.write(data)
+            self._f.flush()
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def close(self):
+        with self._lock:
+            self._f.close()
@@ -1,17 +1,409 @@
-"""CLI entrypoint for running the processing pipeline."""
-from argparse import ArgumentParser
-from .runner import process_all_inputs, write_outputs
+"""CLI entrypoint for running the processing pipeline.
 
+`python -m ai_structurer.cli --input ...` runs the pipeline;
+`python -m ai_structurer.cli merge SHARD... --output ...` merges shard files;
+`python -m ai_structurer.cli serve [--port 8080]` runs the HTTP extraction service;
+`python -m ai_structurer.cli worker --socket PATH` runs a persistent warm worker.
+
+Package modules are imported inside the functions that need them, so
+forwarding a run to a warm worker (--worker-socket) or printing --help
+does not import the pipeline at all.
+"""
+from __future__ import annotations
+
+from argparse import ArgumentParser, Namespace
+from typing import TYPE_CHECKING, Optional, Tuple
+import copy
+import os
+import sys
+
+if TYPE_CHECKING:
+    from .cache import ResponseCache
+    from .rules import RuleExtractor
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    socket_path, argv = _pop_worker_socket(argv)
+    if socket_path and argv[:1] not in (["merge"], ["serve"], ["worker"]):
+        from .worker import forward
+
+        code = forward(socket_path, argv)
+        if code is not None:
+            sys.exit(code)
+    if argv[:1] == ["worker"]:
+        return _worker_main(argv[1:])
+    if argv[:1] == ["merge"]:
+        return _merge_main(argv[1:])
+    if argv[:1] == ["serve"]:
+        return _serve_main(argv[1:])
+    from .writers import WRITERS
 
-def main():
     p = ArgumentParser()
-    p.add_argument("--input", "-i", required=True, help="Path to input text file")
-    p.add_argument("--output", "-o", default="outputs.json", help="Path to output JSON")
+    p.add_argument("--input", "-i", required=True, help="Path to input text file ('-' for stdin, streaming only)")
+    p.add_argument("--output", "-o", default="outputs.json", help="Path to output JSON ('-' for stdout)")
+    _add_extraction_args(p)
+    p.add_argument("--stream", action="store_true", help="Read lines lazily and write records as they complete")
+    p.add_argument("--format", choices=sorted(WRITERS), default="json", help="Output format (see ai_structurer.writers)")
+    p.add_argument("--follow", action="store_true", help="Tail the input file for appended lines (implies --stream)")
+    p.add_argument("--idle-timeout", type=float, default=None, help="With --follow, stop after this many idle seconds")
+    p.add_argument("--checkpoint", default=None, help="Journal file for finished lines (default with --resume: <output>.ckpt)")
+    p.add_argument("--resume", action="store_true", help="Skip lines already in the checkpoint journal")
+    p.add_argument("--dedup", action="store_true", help="Extract repeated lines (after normalisation) once and copy the records")
+    p.add_argument("--near-dup-threshold", type=float, default=None, help="Also group near-identical lines by MinHash Jaccard >= this (implies --dedup)")
+    p.add_argument("--priority", action="store_true", help="Extract urgent lines (urgency keywords, deadlines within 7 days) first; the output keeps input order")
+    p.add_argument("--priority-out", default=None, help="Also write NDJSON {line, priority, records} as each line finishes, urgent lines first ('-' for stdout; implies --priority)")
+    p.add_argument("--metrics-out", action="append", default=[], help="Write run metrics: Prometheus text for *.prom/*.txt, JSON otherwise (repeatable)")
+    p.add_argument("--profile", default=None, help="Write cProfile stats for the run to this file (main thread only; use --concurrency 1 for the full hot path)")
+    p.add_argument("--shard", default=None, help="Process only shard i/N (0-based) of the input and write a shard file for `merge`")
+    p.add_argument("--workers", type=int, default=1, help="Split the input into this many shards, run them in parallel processes and merge")
+    p.add_argument("--worker-socket", default=None, help="Run in the warm worker listening on this Unix socket if it is up (env: AI_STRUCTURER_WORKER_SOCKET)")
+    args = p.parse_args(argv)
+    if (args.shard or args.workers > 1) and (args.input == "-" or args.follow):
+        p.error("--shard/--workers need a regular input file")
+    if args.priority_out:
+        args.priority = True
+    if args.priority and (args.stream or args.follow or args.input == "-" or args.shard or args.workers > 1):
+        p.error("--priority needs the whole input file up front (no --stream/--follow/--shard/--workers)")
+    if args.priority and (args.dedup or args.near_dup_threshold is not None):
+        p.error("--priority cannot be combined with --dedup")
+    if args.priority_out == "-" and args.output == "-":
+        p.error("--priority-out and --output cannot both be stdout")
+    if args.shard:
+        from .shard import parse_shard
+
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as e:
+            p.error(str(e))
+    if args.workers > 1 and not args.shard:
+        return _run_workers(args)
+    _run(args)
+
+
+def _add_extraction_args(p: ArgumentParser):
+    """Options shared by pipeline runs and `serve`: model, LLM client, cache, fast path."""
+    from .cache import DEFAULT_CACHE_PATH
+
     p.add_argument("--model", "-m", default="llama3-70b-8192", help="Groq model id")
-    args = p.parse_args()
+    p.add_argument("--cascade-model", default=None, help="Fast model tried first; lines it cannot answer confidently escalate to --model")
+    p.add_argument("--concurrency", "-c", type=int, default=1, help="Number of lines extracted in parallel")
+    p.add_argument("--batch-size", "-b", type=int, default=1, help="Number of lines packed into one LLM prompt")
+    p.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="SQLite file for the LLM response cache")
+    p.add_argument("--no-cache", action="store_true", help="Disable the LLM response cache")
+    p.add_argument("--cache-max-entries", type=int, default=100_000, help="Max cached responses (0 = unbounded)")
+    p.add_argument("--cache-ttl", type=float, default=7 * 24 * 3600, help="Cache entry TTL in seconds (0 = never expire)")
+    p.add_argument("--fast-path", action="store_true", help="Extract simple lines with local rules, skipping the LLM")
+    p.add_argument("--fast-path-threshold", type=float, default=0.9, help="Minimum rule confidence to bypass the LLM")
+    p.add_argument("--stream-completions", action="store_true", help="Stream LLM completions (SSE), parsing records as they arrive")
+    p.add_argument("--prompt-style", choices=["compact", "full"], default="compact", help="Schema preamble: compact (default) or the original full prose")
+    p.add_argument("--fixed-max-tokens", action="store_true", help="Always request 2048 completion tokens instead of sizing the budget per line")
+    p.add_argument("--pool-size", type=int, default=None, help="HTTP keep-alive pool size (default: max(10, concurrency))")
+    p.add_argument("--connect-timeout", type=float, default=5.0, help="HTTP connect timeout in seconds")
+    p.add_argument("--read-timeout", type=float, default=60.0, help="HTTP read timeout in seconds")
+    p.add_argument("--max-retries", type=int, default=3, help="Retries for 429/5xx and connection errors")
+    p.add_argument("--max-attempts", type=int, default=2, help="LLM attempts per line: the first prompt plus correction prompts")
+    p.add_argument("--line-deadline", type=float, default=None, help="Seconds one line may spend on all its attempts before it falls back")
+    p.add_argument("--hedge", action="store_true", help="Send a duplicate request when an attempt is slower than the observed p95 latency")
+    p.add_argument("--hedge-quantile", type=float, default=0.95, help="Latency quantile after which --hedge fires")
+    p.add_argument("--hedge-after", type=float, default=None, help="Hedge after this many seconds instead of the observed quantile")
+    p.add_argument("--rpm", type=float, default=None, help="Client-side requests/minute limit")
+    p.add_argument("--tpm", type=float, default=None, help="Client-side tokens/minute limit")
+    p.add_argument("--adaptive", action="store_true", help="Adapt in-flight requests (AIMD) to 429s and latency, up to --concurrency")
+
+
+def _configure_extraction(args: Namespace) -> Tuple[Optional[ResponseCache], Optional[RuleExtractor]]:
+    """Configure the shared LLM client from args; return the cache and fast-path extractor."""
+    from .cache import ResponseCache
+    from .cascade import configure_cascade
+    from .llm import configure_default_client
+    from .prompts import configure_prompts
+    from .ratelimit import RateLimiter
+    from .retry import configure_retries
+    from .rules import RuleExtractor
+
+    configure_prompts(style=args.prompt_style, adaptive=not args.fixed_max_tokens)
+    configure_cascade(args.cascade_model)
+    configure_retries(
+        max_attempts=args.max_attempts,
+        deadline=args.line_deadline,
+        hedge=args.hedge or args.hedge_after is not None,
+        hedge_quantile=args.hedge_quantile,
+        hedge_after=args.hedge_after,
+        concurrency=args.concurrency,
+    )
+    limiter = None
+    if args.rpm or args.tpm or args.adaptive:
+        limiter = RateLimiter(
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            max_concurrency=max(1, args.concurrency),
+            adaptive=args.adaptive,
+        )
+
+    configure_default_client(
+        pool_size=args.pool_size or max(10, args.concurrency),
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        max_retries=args.max_retries,
+        limiter=limiter,
+    )
+
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(args.cache_path, max_entries=args.cache_max_entries, ttl_seconds=args.cache_ttl)
+    rules = RuleExtractor(args.fast_path_threshold) if args.fast_path else None
+    return cache, rules
+
+
+def _run(args: Namespace):
+    from . import metrics
+    from .cascade import get_cascade
+    from .checkpoint import CheckpointJournal
+    from .dedup import Deduper
+    from .priority import PriorityScheduler
+    from .runner import process_all_inputs, write_outputs, iter_records, iter_line_results, stream_outputs
+    from .shard import LineIndex, shard_range, write_shard
+    from .utils import iter_inputs
+
+    cache, rules = _configure_extraction(args)
+    dedup = None
+    if args.dedup or args.near_dup_threshold is not None:
+        dedup = Deduper(near_threshold=args.near_dup_threshold)
+    scheduler = PriorityScheduler() if args.priority else None
+    journal = None
+    if args.checkpoint or args.resume:
+        journal = CheckpointJournal(args.checkpoint or f"{args.output}.ckpt", resume=args.resume)
+
+    if args.metrics_out:
+        metrics.enable()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        if args.shard:
+            index = LineIndex(args.input)
+            i, n = args.shard
+            start, stop = shard_range(len(index), i, n)
+            results = iter_line_results(
+                index.iter_lines(start, stop),
+                model=args.model,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                cache=cache,
+                journal=journal,
+                rules=rules,
+                stream=args.stream_completions,
+                dedup=dedup,
+            )
+            write_shard(args.output, results, i, n, start, stop, len(index))
+        elif args.stream or args.follow or args.input == "-":
+            lines = iter_inputs(args.input, follow=args.follow, idle_timeout=args.idle_timeout)
+            records = iter_records(
+                lines,
+                model=args.model,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                cache=cache,
+                journal=journal,
+                rules=rules,
+                stream=args.stream_completions,
+                dedup=dedup,
+            )
+            stream_outputs(records, args.output, fmt=args.format)
+        elif scheduler is not None:
+            records = _run_prioritized(args, scheduler, cache=cache, journal=journal, rules=rules)
+            if args.output != "-":
+                write_outputs(records, args.output, fmt=args.format)
+            else:
+                stream_outputs(records, args.output, fmt=args.format)
+        else:
+            records = process_all_inputs(
+                args.input,
+                model=args.model,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                cache=cache,
+                journal=journal,
+                rules=rules,
+                stream=args.stream_completions,
+                dedup=dedup,
+                compact=True,
+            )
+            if args.output != "-":
+                write_outputs(records, args.output, fmt=args.format)
+            else:
+                stream_outputs(records, args.output, fmt=args.format)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        registry = metrics.get()
+        if registry is not None:
+            for path in args.metrics_out:
+                registry.write(path)
+            metrics.disable()
+        if rules is not None:
+            print(rules.stats_line(), file=sys.stderr)
+        if dedup is not None:
+            print(dedup.stats_line(), file=sys.stderr)
+        if get_cascade() is not None:
+            print(get_cascade().stats_line(), file=sys.stderr)
+        if scheduler is not None:
+            print(scheduler.stats_line(), file=sys.stderr)
+        if journal is not None:
+            journal.close()
+        if cache is not None:
+            st = cache.stats()
+            print(f"cache: {st['hits']} hits, {st['misses']} misses, {st['stores']} stored, {st['evictions']} evicted", file=sys.stderr)
+            cache.close()
+
+
+def _run_prioritized(args: Namespace, scheduler, **kwargs) -> list:
+    """Extract urgent lines first, writing --priority-out as lines finish.
+
+    Returns compact records in input order.
+    """
+    import json
+    from .records import Record
+    from .runner import iter_prioritized
+    from .utils import load_inputs
+
+    lines = load_inputs(args.input)
+    per_line = [None] * len(lines)
+    out = None
+    if args.priority_out:
+        out = sys.stdout if args.priority_out == "-" else open(args.priority_out, "w", encoding="utf-8")
+    try:
+        results = iter_prioritized(lines, scheduler, model=args.model, concurrency=args.concurrency, batch_size=args.batch_size, stream=args.stream_completions, **kwargs)
+        for i, priority, parsed in results:
+            if out is not None:
+                out.write(json.dumps({"line": i, "priority": priority, "records": parsed}, ensure_ascii=False) + "\n")
+                out.flush()
+            per_line[i] = [Record.from_dict(r) for r in parsed]
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    return [rec for recs in per_line for rec in recs]
+
+
+def _run_workers(args: Namespace):
+    """Run args.workers shards in a process pool, then merge them into args.output.
+
+    Each worker builds its own index, HTTP client, limiter (rpm/tpm split
+    evenly) and cache connection; metrics and profiles are not collected from
+    workers. Shard files are removed after a successful merge.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import tempfile
+    from .runner import stream_outputs
+    from .shard import merge_shards
+
+    n = args.workers
+    base = args.output if args.output != "-" else os.path.join(tempfile.mkdtemp(), "outputs")
+    jobs = []
+    for i in range(n):
+        job = copy.copy(args)
+        job.shard = (i, n)
+        job.output = f"{base}.shard-{i}-of-{n}"
+        job.checkpoint = f"{args.checkpoint}.shard-{i}-of-{n}" if args.checkpoint else None
+        job.rpm = args.rpm / n if args.rpm else args.rpm
+        job.tpm = args.tpm / n if args.tpm else args.tpm
+        job.metrics_out = []
+        job.profile = None
+        jobs.append(job)
+    with ProcessPoolExecutor(max_workers=n) as pool:
+        for future in [pool.submit(_run, job) for job in jobs]:
+            future.result()
+    paths = [job.output for job in jobs]
+    stream_outputs(merge_shards(paths), args.output, fmt=args.format)
+    for path in paths:
+        os.remove(path)
+
+
+def _merge_main(argv):
+    from .runner import stream_outputs
+    from .shard import merge_shards
+    from .writers import WRITERS
+
+    p = ArgumentParser(prog="ai_structurer.cli merge", description="Merge shard files back into input order")
+    p.add_argument("shards", nargs="+", help="Shard files written with --shard")
+    p.add_argument("--output", "-o", default="outputs.json", help="Path to output JSON ('-' for stdout)")
+    p.add_argument("--format", choices=sorted(WRITERS), default="json", help="Output format (see ai_structurer.writers)")
+    args = p.parse_args(argv)
+    try:
+        stream_outputs(merge_shards(args.shards), args.output, fmt=args.format)
+    except (OSError, ValueError) as e:
+        p.error(str(e))
+
+
+def _serve_main(argv):
+    from .service import ExtractionService
+
+    p = ArgumentParser(prog="ai_structurer.cli serve", description="Run the HTTP extraction service (POST /extract)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    _add_extraction_args(p)
+    p.add_argument("--batch-window-ms", type=float, default=5.0, help="Coalesce lines arriving within this many ms into one batch")
+    p.add_argument("--max-body-mb", type=float, default=10.0, help="Reject request bodies larger than this with 413")
+    p.set_defaults(concurrency=4, batch_size=8)
+    args = p.parse_args(argv)
+    cache, rules = _configure_extraction(args)
+    service = ExtractionService(
+        model=args.model,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        batch_window=args.batch_window_ms / 1000,
+        cache=cache,
+        rules=rules,
+        stream=args.stream_completions,
+        host=args.host,
+        port=args.port,
+        max_body=int(args.max_body_mb * 1024 * 1024),
+    )
+    print(f"ai_structurer service listening on http://{args.host}:{args.port}", file=sys.stderr, flush=True)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _pop_worker_socket(argv):
+    """Split --worker-socket PATH (or the env default) off argv."""
+    rest, path, it = [], os.environ.get("AI_STRUCTURER_WORKER_SOCKET"), iter(argv)
+    for arg in it:
+        if arg == "--worker-socket":
+            path = next(it, None)
+        elif arg.startswith("--worker-socket="):
+            path = arg.split("=", 1)[1]
+        else:
+            rest.append(arg)
+    return path, rest
+
+
+def _worker_main(argv):
+    from .worker import serve_worker
+
+    p = ArgumentParser(prog="ai_structurer.cli worker", description="Run a persistent warm worker for --worker-socket")
+    p.add_argument("--socket", required=True, help="Unix socket path to listen on")
+    p.add_argument("--idle-timeout", type=float, default=None, help="Exit after this many seconds without a job")
+    args = p.parse_args(argv)
+    import signal
 
-    records = process_all_inputs(args.input, model=args.model)
-    write_outputs(records, args.output)
+    # Exit through the normal path on SIGTERM so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"ai_structurer worker listening on {args.socket}", file=sys.stderr, flush=True)
+    try:
+        serve_worker(args.socket, idle_timeout=args.idle_timeout)
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
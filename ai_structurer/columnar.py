@@ -0,0 +1,51 @@
+"""Columnar batch post-processing: the batch form of utils.process_record.
+
+process_records(raw_objs, now) returns exactly
+[process_record(obj, now) for obj in raw_objs], computed per column:
+
+- to_columns enforces the schema one key at a time (schema.enforce_schema_columns)
+- infer_urgency_column fills missing urgencies from the deadline column; every
+  row is bucketed against the same reference time `now`, taken once per call
+  when not given, so a batch never straddles midnight
+- from_columns turns the columns back into schema dicts
+
+Each distinct deadline is parsed once and the result reused, which gives
+the same output as utils.infer_urgency_from_deadline.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from .schema import SCHEMA_KEYS, enforce_schema_columns
+from .utils import infer_urgency_from_deadline
+
+
+def to_columns(raw_objs: Sequence[Dict]) -> Dict[str, List]:
+    return enforce_schema_columns(raw_objs)
+
+
+def from_columns(columns: Dict[str, List]) -> List[Dict]:
+    return [dict(zip(SCHEMA_KEYS, row)) for row in zip(*(columns[key] for key in SCHEMA_KEYS))]
+
+
+def infer_urgency_column(urgencies: List[Optional[str]], deadlines: List[Optional[str]], now: Optional[datetime] = None) -> List[str]:
+    """Urgency column with every missing value inferred from its deadline (default "low").
+
+    deadlines are schema-enforced YYYY-MM-DD strings or None.
+    """
+    now = now if now is not None else datetime.now()
+    memo: Dict[Optional[str], str] = {}
+    out = []
+    for urgency, deadline in zip(urgencies, deadlines):
+        if not urgency:
+            urgency = memo.get(deadline)
+            if urgency is None:
+                urgency = memo[deadline] = infer_urgency_from_deadline(deadline, now) or "low"
+        out.append(urgency)
+    return out
+
+
+def process_records(raw_objs: Sequence[Dict], now: Optional[datetime] = None) -> List[Dict]:
+    """Batch process_record: enforce the schema and infer missing urgencies."""
+    columns = to_columns(raw_objs)
+    columns["urgency"] = infer_urgency_column(columns["urgency"], columns["deadline"], now)
+    return from_columns(columns)
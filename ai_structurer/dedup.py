@@ -0,0 +1,119 @@
+"""Input deduplication with result fan-out.
+
+Deduper maps every input line to a group key. Lines with the same key are
+extracted once and the records are copied to every position in the group.
+
+- exact mode: lines are grouped when they are equal after normalisation
+  (case, whitespace, punctuation and trailing courtesy words like "thanks")
+- near-duplicate mode (opt-in, near_threshold): MinHash over character
+  shingles with LSH banding groups lines whose estimated Jaccard similarity
+  reaches the threshold. Lines are only merged when they contain exactly the
+  same numbers, so "20 boxes" never absorbs "30 boxes".
+
+All hashing is seeded and stable across runs, so grouping is deterministic.
+"""
+from typing import Dict, List, Optional, Tuple
+import random
+import re
+import threading
+import zlib
+
+from . import metrics
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_COURTESY_RE = re.compile(r"(?:\s+(?:thanks|thank you|thx|ty|pls|please|cheers|regards))+$")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_line(line: str) -> str:
+    """Canonical form used for exact grouping."""
+    s = line.lower()
+    s = _PUNCT_RE.sub(" ", s)
+    s = _SPACE_RE.sub(" ", s).strip()
+    s = _COURTESY_RE.sub("", " " + s).strip()
+    return s
+
+
+class Deduper:
+    """Assigns group keys to lines; the first line of a group is its representative.
+
+    - near_threshold: None for exact-only grouping, else a Jaccard threshold in (0, 1]
+    - shingle_size / num_perm / bands: MinHash + LSH parameters (num_perm must divide by bands)
+    """
+
+    def __init__(self, near_threshold: Optional[float] = None, shingle_size: int = 5, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        self.near_threshold = near_threshold
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rnd = random.Random(seed)
+        self._perms = [(rnd.randrange(1, _MERSENNE_PRIME), rnd.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+        self._exact: Dict[str, str] = {}
+        self._lsh: List[Dict[Tuple[int, ...], List[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, Tuple[Tuple[str, ...], List[int]]] = {}
+        self._lock = threading.Lock()
+        self.lines = 0
+        self.groups = 0
+
+    def key(self, line: str) -> str:
+        """Return the group key for line, registering a new group when needed."""
+        norm = normalize_line(line)
+        with self._lock:
+            self.lines += 1
+            known = self._exact.get(norm)
+            if known is not None:
+                metrics.incr("dedup_fanout")
+                return known
+            key = norm
+            if self.near_threshold is not None:
+                near = self._near_match(norm)
+                if near is not None:
+                    metrics.incr("dedup_fanout")
+                    key = near
+                else:
+                    self.groups += 1
+            else:
+                self.groups += 1
+            self._exact[norm] = key
+            return key
+
+    def _signature(self, norm: str) -> List[int]:
+        k = self.shingle_size
+        text = norm if len(norm) >= k else norm.ljust(k)
+        hashes = {zlib.crc32(text[i:i + k].encode("utf-8")) for i in range(len(text) - k + 1)}
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms]
+
+    def _near_match(self, norm: str) -> Optional[str]:
+        numbers = tuple(_NUMBER_RE.findall(norm))
+        sig = self._signature(norm)
+        bands = [tuple(sig[b * self.rows:(b + 1) * self.rows]) for b in range(self.bands)]
+        best, best_score = None, 0.0
+        seen = set()
+        for table, band in zip(self._lsh, bands):
+            for cand in table.get(band, ()):
+                if cand in seen:
+                    continue
+                seen.add(cand)
+                cand_numbers, cand_sig = self._signatures[cand]
+                if cand_numbers != numbers:
+                    continue
+                score = sum(1 for x, y in zip(sig, cand_sig) if x == y) / self.num_perm
+                if score >= self.near_threshold and score > best_score:
+                    best, best_score = cand, score
+        if best is not None:
+            return best
+        # New representative: index it for later lines
+        self._signatures[norm] = (numbers, sig)
+        for table, band in zip(self._lsh, bands):
+            table.setdefault(band, []).append(norm)
+        return None
+
+    def saved_rate(self) -> float:
+        return 1.0 - self.groups / self.lines if self.lines else 0.0
+
+    def stats_line(self) -> str:
+        return f"dedup: {self.lines} lines -> {self.groups} extractions ({self.saved_rate():.1%} saved)"
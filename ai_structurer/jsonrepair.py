@@ -0,0 +1,279 @@
+"""Linear-time JSON candidate scanner and token-level repair.
+
+LLM output often wraps JSON in prose, uses single quotes or trailing commas,
+or stops mid-array. Everything here is a single left-to-right pass:
+
+- scan_json_candidates: finds every top-level balanced [...] / {...} span,
+  ignoring brackets inside strings, plus a final unclosed (truncated) span
+- match_span: the end of the one span opened at a given position
+- repair_json_tokens: rewrites single-quoted strings, drops trailing commas
+  and maps Python literals (None/True/False) token by token
+- recover_array_objects: salvages the complete objects of a broken or
+  truncated array one by one
+- extract_json: picks the best candidate from a raw response
+
+The scanner steps over brackets and whole string literals with one
+precompiled pattern, so prose and string content are skipped in C. Valid
+JSON is handed straight to the C decoder until the first decode failure.
+"""
+from typing import Any, Iterator, List, Optional, Tuple
+import json
+import re
+
+_OPENERS = {"[": "]", "{": "}"}
+_CLOSERS = frozenset("]}")
+_PY_LITERALS = {"None": "null", "True": "true", "False": "false"}
+
+_OPEN_RE = re.compile(r"[\[{]")
+# One match per bracket or per whole string literal (an unterminated string runs to the end)
+_SPAN_TOKEN_RE = re.compile(r'[\[\]{}]|"(?:[^"\\]|\\.)*"?|\'(?:[^\'\\]|\\.)*\'?')
+# Cheap gate before decoding a span: objects must open with a key or close,
+# arrays with something that can start a JSON (or Python-literal) value
+_PLAUSIBLE_RE = re.compile(r"""\{\s*[}"']|\[\s*(?:[\]"'{\[\-\d.]|(?:true|false|null|None|True|False)\b)""")
+_DECODER = json.JSONDecoder()
+_TOKEN_RE = re.compile(
+    r'(?P<dq>"(?:[^"\\]|\\.)*")'
+    r"|(?P<sq>'(?:[^'\\]|\\.)*')"
+    r"|(?P<comma>,)(?=\s*[\]}])"
+    r"|\b(?P<lit>None|True|False)\b"
+)
+
+
+def match_span(text: str, start: int) -> Tuple[int, Optional[bool]]:
+    """Walk the [...] / {...} span opened at text[start], skipping string literals.
+
+    Returns (end, True) when balanced, (len(text), False) when the text ends
+    inside the span, and (end, None) when a mismatched closer abandons it.
+    """
+    stack: List[str] = []
+    for m in _SPAN_TOKEN_RE.finditer(text, start):
+        ch = m.group()
+        if ch in _OPENERS:
+            stack.append(_OPENERS[ch])
+        elif ch in _CLOSERS:
+            if ch != stack[-1]:
+                return m.end(), None
+            stack.pop()
+            if not stack:
+                return m.end(), True
+    return len(text), False
+
+
+def scan_json_candidates(text: str) -> Iterator[Tuple[int, int, bool]]:
+    """Yield (start, end, closed) for every top-level JSON-looking span.
+
+    Spans are balanced by bracket type and string-aware (double or single
+    quotes with backslash escapes). A closer that does not match abandons the
+    current span. If text ends inside a span it is yielded with closed=False.
+    """
+    pos = 0
+    while True:
+        m = _OPEN_RE.search(text, pos)
+        if m is None:
+            return
+        end, closed = match_span(text, m.start())
+        if closed is not None:
+            yield m.start(), end, closed
+        pos = end
+
+
+def _repair_token(m: "re.Match") -> str:
+    kind = m.lastgroup
+    if kind == "dq":
+        return m.group(0)
+    if kind == "comma":
+        return ""
+    if kind == "lit":
+        return _PY_LITERALS[m.group(0)]
+    # Single-quoted string: unescape \' and escape bare double quotes
+    body = m.group(0)[1:-1].replace("\\'", "'").replace('"', '\\"')
+    return '"' + body + '"'
+
+
+def repair_json_tokens(span: str) -> str:
+    """Token-level repair: single-quoted strings, trailing commas, Python literals.
+
+    Double-quoted strings are matched as whole tokens, so nothing inside them
+    is ever rewritten.
+    """
+    return _TOKEN_RE.sub(_repair_token, span)
+
+
+def _loads(span: str) -> Optional[Any]:
+    try:
+        return json.loads(span)
+    except (ValueError, RecursionError):
+        pass
+    try:
+        return json.loads(repair_json_tokens(span))
+    except (ValueError, RecursionError):
+        return None
+
+
+def recover_array_objects(span: str) -> List[Any]:
+    """Return every complete, parseable object element of a (possibly broken or truncated) array.
+
+    Elements are walked left to right from the opening bracket; scalars and
+    nested arrays are stepped over, objects are decoded (and repaired) one by
+    one, and the walk stops at the array's end or where the text is cut off.
+    """
+    objs = []
+    pos = 1
+    optimistic = True
+    n = len(span)
+    while pos < n:
+        m = _SPAN_TOKEN_RE.search(span, pos)
+        if m is None or m.group() in "]}":
+            break
+        start = m.start()
+        if span[start] in "\"'":
+            # String element: step over it
+            pos = m.end()
+            continue
+        if m.group() == "{" and optimistic:
+            try:
+                value, pos = _DECODER.raw_decode(span, start)
+                objs.append(value)
+                continue
+            except (ValueError, RecursionError):
+                optimistic = False
+        end, closed = match_span(span, start)
+        if not closed:
+            break
+        if m.group() == "{":
+            value = _loads(span[start:end])
+            if isinstance(value, dict):
+                objs.append(value)
+        pos = end
+    return objs
+
+
+def _iter_values(text: str) -> Iterator[Any]:
+    """Yield the parsed value of every top-level candidate, repairing where needed."""
+    pos = 0
+    optimistic = True
+    while True:
+        m = _OPEN_RE.search(text, pos)
+        if m is None:
+            return
+        start = m.start()
+        if optimistic:
+            # Let the C decoder consume valid JSON directly. A failed raw_decode
+            # costs O(position) to build its error, so after the first failure
+            # every later candidate goes through the scanner instead.
+            try:
+                value, pos = _DECODER.raw_decode(text, start)
+                yield value
+                continue
+            except (ValueError, RecursionError):
+                optimistic = False
+        end, closed = match_span(text, start)
+        pos = end
+        if closed is None:
+            continue
+        span = text[start:end]
+        value = _loads(span) if closed and _PLAUSIBLE_RE.match(span) else None
+        if value is None and span[0] == "[":
+            value = recover_array_objects(span) or None
+        if value is not None:
+            yield value
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """Return the most plausible JSON value embedded in text, or None.
+
+    Preference order: the first array containing objects, else a run of
+    consecutive top-level objects (returned as a list), else the first
+    parseable candidate. Broken or truncated arrays are recovered object by
+    object.
+    """
+    first = None
+    objs: List[Any] = []
+    for value in _iter_values(text):
+        if isinstance(value, dict):
+            objs.append(value)
+            continue
+        if objs:
+            break
+        if isinstance(value, list) and any(isinstance(x, dict) for x in value):
+            return value
+        if first is None:
+            first = value
+    if objs:
+        return objs
+    return first
+
+
+class IncrementalArrayParser:
+    """Feed-as-you-go parser for a streamed JSON array (or single object).
+
+    feed() returns the values of top-level array elements that are objects,
+    as soon as each one closes; a top-level object is returned whole when it
+    closes. After feed(), `done` is True once the top-level value has closed
+    (the rest of the stream can be dropped) and `failed` is True once the
+    text can no longer become valid JSON: a mismatched bracket, an element
+    that does not parse even after repair, or more than max_prose characters
+    of prose before the opening bracket.
+    """
+
+    def __init__(self, max_prose: int = 200):
+        self.max_prose = max_prose
+        self.done = False
+        self.failed = False
+        self._prose = 0
+        self._stack: List[str] = []
+        self._top = None
+        self._quote = None
+        self._escape = False
+        self._buf: Optional[List[str]] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        out: List[Any] = []
+        stack = self._stack
+        for ch in chunk:
+            if self.done or self.failed:
+                break
+            buf = self._buf
+            if buf is not None:
+                buf.append(ch)
+            if self._quote is not None:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = None
+                continue
+            if not stack:
+                if ch in _OPENERS:
+                    stack.append(_OPENERS[ch])
+                    self._top = ch
+                    if ch == "{":
+                        self._buf = [ch]
+                elif not ch.isspace():
+                    self._prose += 1
+                    if self._prose > self.max_prose:
+                        self.failed = True
+                continue
+            if ch == '"' or ch == "'":
+                self._quote = ch
+            elif ch in _OPENERS:
+                stack.append(_OPENERS[ch])
+                if ch == "{" and self._top == "[" and len(stack) == 2:
+                    self._buf = [ch]
+            elif ch in _CLOSERS:
+                if ch != stack[-1]:
+                    self.failed = True
+                    break
+                stack.pop()
+                depth_done = len(stack) == (1 if self._top == "[" else 0)
+                if buf is not None and depth_done:
+                    value = _loads("".join(buf))
+                    self._buf = None
+                    if not isinstance(value, dict):
+                        self.failed = True
+                        break
+                    out.append(value)
+                if not stack:
+                    self.done = True
+        return out
@@ -4,51 +4,289 @@ Provides call_groq_llm() which calls the Groq REST API (configurable) and
 returns the raw text output from the model. It supports a single retry
 with a correction prompt when asked.
 
+HTTP goes through a GroqClient: a pooled keep-alive requests.Session with
+separate connect/read timeouts that retries transient statuses (429/5xx) with
+jittered exponential backoff, honouring Retry-After. An optional shared
+ratelimit.RateLimiter gates every attempt. call_groq_llm uses a shared
+module-level client unless one is passed in.
+
+A call may carry a deadline (a time.monotonic() value, see retry.RetryPolicy):
+the read timeout of each attempt is cut to the time left, and no transient
+retry starts after it has passed.
+
+stream_groq_llm requests a server-sent-events completion and yields text
+deltas as they arrive; closing the generator cancels the request.
+
+`requests` is imported when the first client is built, so mock runs and
+short CLI invocations never pay for it.
+
 Note: Network errors bubble up to the caller for testability.
 """
-from typing import Optional, Dict
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Dict
+import json
 import os
-import requests
+import random
+import threading
+import time
+
+from . import metrics
+from .ratelimit import RateLimiter
+
+if TYPE_CHECKING:
+    import requests
 
 GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/v1/engines")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Default completion budget; smaller (adaptive) budgets fall back to it when cut off
+FULL_MAX_TOKENS = 2048
+
 
 class GroqError(RuntimeError):
     pass
 
 
-def call_groq_llm(prompt: str, model: str = "llama3-70b-8192", max_tokens: int = 2048, retry_with_correction: bool = True) -> str:
+class GroqClient:
+    """Reusable HTTP client for the Groq completions endpoint.
+
+    - pool_size: keep-alive connections kept per host (match it to --concurrency)
+    - connect_timeout / read_timeout: passed to requests as a (connect, read) tuple
+    - max_retries: extra attempts for transient statuses and connection errors
+    - backoff_base / backoff_max: full-jitter exponential backoff bounds in seconds
+    - limiter: optional RateLimiter; each attempt takes a slot and quota from it
+      and reports its status and latency back
+
+    A Retry-After header on a transient response overrides the computed delay
+    (capped at backoff_max). Thread-safe: one client can be shared by all workers.
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self.api_url = api_url or GROQ_API_URL
+        self.api_key = api_key or GROQ_API_KEY
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = limiter
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._requests = requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, url: str, body: Dict, tokens: int = 0, stream: bool = False, deadline: Optional[float] = None) -> "requests.Response":
+        """POST with retries; returns the final response (which may be non-200).
+
+        tokens is the request's estimated token cost, charged to the limiter.
+        With stream=True the body is left unread (retries happen before it starts).
+        Raises GroqError once the deadline (time.monotonic()) has passed.
+        """
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        attempt = 0
+        while True:
+            timeout = self._timeout(deadline)
+            metrics.incr("llm_http_attempts")
+            if attempt:
+                metrics.incr("llm_http_retries")
+            try:
+                with metrics.timer("llm_http"):
+                    resp = self._send(url, body, headers, tokens, stream, timeout)
+            except (self._requests.ConnectionError, self._requests.Timeout):
+                metrics.incr("llm_http_connection_errors")
+                if attempt >= self.max_retries:
+                    raise
+                _sleep_until(self._backoff(attempt), deadline)
+                attempt += 1
+                continue
+            metrics.incr(f"llm_http_status_{resp.status_code}")
+            if resp.status_code not in TRANSIENT_STATUSES or attempt >= self.max_retries:
+                return resp
+            resp.close()
+            delay = _retry_after_seconds(resp.headers.get("Retry-After"))
+            _sleep_until(min(delay, self.backoff_max) if delay is not None else self._backoff(attempt), deadline)
+            attempt += 1
+
+    def _timeout(self, deadline: Optional[float]):
+        if deadline is None:
+            return self.timeout
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise GroqError("deadline exceeded")
+        connect, read = self.timeout
+        return (min(connect, left), min(read, left))
+
+    def _send(self, url: str, body: Dict, headers: Dict, tokens: int, stream: bool = False, timeout=None) -> "requests.Response":
+        timeout = timeout or self.timeout
+        if self.limiter is None:
+            return self.session.post(url, json=body, headers=headers, timeout=timeout, stream=stream)
+        self.limiter.acquire(tokens)
+        status = None
+        start = time.monotonic()
+        try:
+            resp = self.session.post(url, json=body, headers=headers, timeout=timeout, stream=stream)
+            status = resp.status_code
+            return resp
+        finally:
+            self.limiter.release(status, time.monotonic() - start)
+
+    def complete(self, prompt: str, model: str, max_tokens: int, deadline: Optional[float] = None) -> "requests.Response":
+        # ~4 characters per prompt token plus the full completion budget
+        tokens = len(prompt) // 4 + max_tokens
+        return self.post(f"{self.api_url}/{model}/completions", {"prompt": prompt, "max_tokens": max_tokens}, tokens=tokens, deadline=deadline)
+
+    def stream_complete(self, prompt: str, model: str, max_tokens: int, deadline: Optional[float] = None) -> Iterator[str]:
+        """Yield completion text deltas from a server-sent-events stream.
+
+        Raises GroqError on a non-200 status, or once the deadline has passed
+        between events. Closing the generator closes the connection, which
+        cancels the generation server-side.
+        """
+        tokens = len(prompt) // 4 + max_tokens
+        body = {"prompt": prompt, "max_tokens": max_tokens, "stream": True}
+        resp = self.post(f"{self.api_url}/{model}/completions", body, tokens=tokens, stream=True, deadline=deadline)
+        try:
+            if resp.status_code != 200:
+                raise GroqError(f"Groq API error: {resp.status_code} {resp.text}")
+            usage_seen = False
+            for line in resp.iter_lines(decode_unicode=True):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise GroqError("deadline exceeded")
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                    text = (event.get("choices") or [{}])[0].get("text") or ""
+                except (ValueError, AttributeError, IndexError):
+                    continue
+                if isinstance(event.get("usage"), dict):
+                    # Streams report usage in their final event, when at all
+                    usage_seen = True
+                    _count_usage(event)
+                if text:
+                    yield text
+            if not usage_seen:
+                _count_usage(None)
+        finally:
+            resp.close()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def close(self):
+        self.session.close()
+
+
+def _sleep_until(seconds: float, deadline: Optional[float]):
+    """Sleep before a retry; raise GroqError if the retry would start past the deadline."""
+    if deadline is not None and time.monotonic() + seconds >= deadline:
+        raise GroqError("deadline exceeded")
+    time.sleep(seconds)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from datetime import datetime, timezone
+    from email.utils import parsedate_to_datetime
+
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+
+
+_default_client: Optional[GroqClient] = None
+_default_client_kwargs: Dict[str, Any] = {}
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> GroqClient:
+    """Return the shared client, creating it from the configured settings on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = GroqClient(**_default_client_kwargs)
+        return _default_client
+
+
+def configure_default_client(**kwargs):
+    """Set the GroqClient keyword arguments of the shared client.
+
+    The client itself is built lazily by get_default_client. If one already
+    exists with the same settings (other than the limiter, which is swapped
+    in place) it is kept, so a long-lived process reuses its warm connections.
+    """
+    global _default_client, _default_client_kwargs
+    with _default_client_lock:
+        same = {k: v for k, v in kwargs.items() if k != "limiter"} == {k: v for k, v in _default_client_kwargs.items() if k != "limiter"}
+        if _default_client is not None and same:
+            _default_client.limiter = kwargs.get("limiter")
+        elif _default_client is not None:
+            _default_client.close()
+            _default_client = None
+        _default_client_kwargs = dict(kwargs)
+
+
+_MOCK_RESPONSE = '[{"material_name":"Screws","quantity":20,"unit":"boxes","project_name":null,"location":null,"urgency":"low","deadline":null}]'
+
+
+def call_groq_llm(prompt: str, model: str = "llama3-70b-8192", max_tokens: int = 2048, retry_with_correction: bool = True, client: Optional[GroqClient] = None, deadline: Optional[float] = None) -> str:
     """Call the Groq LLM and return raw text.
 
     - prompt: prompt to send
     - model: model id
     - retry_with_correction: if True, performs one additional call with a correction prompt when response is empty or obviously malformed
+    - client: GroqClient to use; defaults to the shared pooled client
+    - deadline: time.monotonic() value by which the call must finish
 
-    Raises GroqError on non-200 or API key missing.
+    Raises GroqError on non-200 (after transient retries) or API key missing.
     """
     # Development/mock mode: when AI_STRUCTURER_USE_MOCK=1, return deterministic JSON for testing.
     if os.getenv("AI_STRUCTURER_USE_MOCK") == "1":
         # Return a simple deterministic JSON array for a single input line.
-        mock = '[{"material_name":"Screws","quantity":20,"unit":"boxes","project_name":null,"location":null,"urgency":"low","deadline":null}]'
-        return mock
+        return _MOCK_RESPONSE
 
-    if not GROQ_API_KEY:
+    client = client or get_default_client()
+    if not client.api_key:
         raise GroqError("GROQ_API_KEY not set in environment")
 
-    url = f"{GROQ_API_URL}/{model}/completions"
-
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
+    metrics.incr("llm_calls")
+    with metrics.timer("llm_call"):
+        return _call(client, prompt, model, max_tokens, retry_with_correction, deadline)
 
-    body = {
-        "prompt": prompt,
-        "max_tokens": max_tokens,
-    }
 
-    resp = requests.post(url, json=body, headers=headers, timeout=60)
+def _call(client: GroqClient, prompt: str, model: str, max_tokens: int, retry_with_correction: bool, deadline: Optional[float] = None) -> str:
+    resp = client.complete(prompt, model, max_tokens, deadline)
     if resp.status_code != 200:
         raise GroqError(f"Groq API error: {resp.status_code} {resp.text}")
 
@@ -59,6 +297,12 @@ def call_groq_llm(prompt: str, model: str = "llama3-70b-8192", max_tokens: int =
         text = j.get("choices", [{}])[0].get("text", "")
     except Exception:
         text = resp.text
+    _count_usage(j)
+
+    # A tight (adaptive) budget that cut the answer off gets one full-budget retry
+    if max_tokens < FULL_MAX_TOKENS and _finish_reason(j) == "length":
+        metrics.incr("llm_budget_retries")
+        return _call(client, prompt, model, FULL_MAX_TOKENS, retry_with_correction, deadline)
 
     # If content looks empty or non-json and we want to retry, do so once with correction prompt
     if retry_with_correction and (not text.strip() or text.strip().startswith("Error") or "{" not in text):
@@ -68,13 +312,56 @@ def call_groq_llm(prompt: str, model: str = "llama3-70b-8192", max_tokens: int =
             " {\n  \"material_name\": string,\n  \"quantity\": number,\n  \"unit\": string,\n  \"project_name\": string|null,\n  \"location\": string|null,\n  \"urgency\": \"low\"|\"medium\"|\"high\",\n  \"deadline\": string(ISO date)|null\n}\n"
         )
         # Append correction instruction to original prompt
-        resp2 = requests.post(url, json={"prompt": prompt + "\n\n" + correction_prompt, "max_tokens": max_tokens}, headers=headers, timeout=60)
+        metrics.incr("llm_corrections")
+        with metrics.timer("llm_correction"):
+            resp2 = client.complete(prompt + "\n\n" + correction_prompt, model, max_tokens, deadline)
         if resp2.status_code != 200:
             raise GroqError(f"Groq correction API error: {resp2.status_code} {resp2.text}")
         try:
-            text2 = resp2.json().get("choices", [{}])[0].get("text", "")
+            j2 = resp2.json()
+            text2 = j2.get("choices", [{}])[0].get("text", "")
         except Exception:
-            text2 = resp2.text
+            j2, text2 = None, resp2.text
+        _count_usage(j2)
         return text2
 
     return text
+
+
+def _finish_reason(j) -> Optional[str]:
+    try:
+        return j["choices"][0].get("finish_reason")
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+def _count_usage(j):
+    """Add provider-reported token usage to the metrics counters.
+
+    Responses without a usage field are counted in llm_usage_missing, so
+    per-line token figures can be checked for gaps.
+    """
+    usage = j.get("usage") if isinstance(j, dict) else None
+    if isinstance(usage, dict):
+        metrics.incr("llm_prompt_tokens", usage.get("prompt_tokens") or 0)
+        metrics.incr("llm_completion_tokens", usage.get("completion_tokens") or 0)
+    else:
+        metrics.incr("llm_usage_missing")
+
+
+def stream_groq_llm(prompt: str, model: str = "llama3-70b-8192", max_tokens: int = 2048, client: Optional[GroqClient] = None, deadline: Optional[float] = None) -> Iterator[str]:
+    """Stream the completion for prompt, yielding text deltas as they arrive.
+
+    No correction retry happens here; the caller decides when to give up on a
+    stream and retry. Raises GroqError on non-200 (after transient retries),
+    API key missing, or once deadline (time.monotonic()) has passed.
+    """
+    if os.getenv("AI_STRUCTURER_USE_MOCK") == "1":
+        for i in range(0, len(_MOCK_RESPONSE), 16):
+            yield _MOCK_RESPONSE[i:i + 16]
+        return
+
+    client = client or get_default_client()
+    if not client.api_key:
+        raise GroqError("GROQ_API_KEY not set in environment")
+    yield from client.stream_complete(prompt, model, max_tokens, deadline)
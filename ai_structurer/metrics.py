@@ -0,0 +1,184 @@
+"""Lightweight run instrumentation: stage timers, counters and histograms.
+
+Instrumentation is off by default. While disabled, every helper returns after
+a single global check (timer() hands back a shared no-op context manager), so
+the hot path pays close to nothing. enable() installs a thread-safe Metrics
+registry that the pipeline reports into:
+
+- timers/histograms (seconds): line, llm_call, llm_http, llm_correction,
+  runner_correction, local_repair, schema_enforce
+- counters: llm_calls, llm_http_attempts, llm_http_retries, llm_corrections,
+  runner_corrections, local_repairs, local_repair_failures, fallbacks, ...
+
+Metrics.to_json() gives a summary dict and Metrics.to_prometheus() the
+Prometheus text exposition format.
+"""
+from typing import Dict, List, Optional
+import bisect
+import json
+import threading
+import time
+
+# Upper bounds (seconds) for histogram buckets; +Inf is implicit
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound at quantile q (an upper estimate, like Prometheus)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return self.max
+
+
+class Metrics:
+    """Thread-safe registry of counters and histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram(self.buckets)
+            h.observe(seconds)
+
+    def to_json(self) -> Dict:
+        with self._lock:
+            stages = {}
+            for name, h in sorted(self.histograms.items()):
+                stages[name] = {
+                    "count": h.count,
+                    "total_s": round(h.sum, 6),
+                    "mean_s": round(h.sum / h.count, 6) if h.count else None,
+                    "min_s": h.min,
+                    "max_s": h.max,
+                    "p50_s": h.quantile(0.5),
+                    "p95_s": h.quantile(0.95),
+                    "p99_s": h.quantile(0.99),
+                    "buckets": {str(b): c for b, c in zip(list(h.buckets) + ["+Inf"], h.counts)},
+                }
+            return {
+                "wall_s": round(time.time() - self.started, 6),
+                "counters": dict(sorted(self.counters.items())),
+                "stages": stages,
+            }
+
+    def to_prometheus(self, prefix: str = "ai_structurer") -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value:g}")
+            for name, h in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum:.6f}")
+                lines.append(f"{metric}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write Prometheus text for *.prom / *.txt paths, a JSON summary otherwise."""
+        if path.endswith((".prom", ".txt")):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.to_json(), indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry: Metrics, name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NOOP = _NoopTimer()
+_registry: Optional[Metrics] = None
+
+
+def enable(buckets=DEFAULT_BUCKETS) -> Metrics:
+    """Start collecting into a fresh registry and return it."""
+    global _registry
+    _registry = Metrics(buckets)
+    return _registry
+
+
+def disable():
+    global _registry
+    _registry = None
+
+
+def get() -> Optional[Metrics]:
+    return _registry
+
+
+def incr(name: str, value: float = 1):
+    if _registry is not None:
+        _registry.incr(name, value)
+
+
+def observe(name: str, seconds: float):
+    if _registry is not None:
+        _registry.observe(name, seconds)
+
+
+def timer(name: str):
+    """Context manager timing a stage into histogram `name` (no-op while disabled)."""
+    if _registry is None:
+        return _NOOP
+    return _Timer(_registry, name)
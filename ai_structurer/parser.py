@@ -6,10 +6,18 @@ parse it into a list of strict schema objects, following the rules:
 - Try local repair
 - If still fails, allow LLM retry (caller handles LLM retry) -- here we implement a helper
 - Final fallback: produce null-filled schema for one record
+
+parse_batched_response demultiplexes a multi-line (batched) response back into
+per-line record lists; lines it cannot recover are returned as None.
+
+iter_stream_records turns streamed text deltas into processed records as each
+object closes, raising StreamAborted once the stream cannot become valid JSON.
 """
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Optional
 import json
 from .utils import attempt_local_json_repair, ensure_array_of_objects, process_record
+from .jsonrepair import IncrementalArrayParser
+from . import metrics
 from .schema import strict_schema_template
 
 
@@ -24,14 +32,84 @@ def parse_and_repair_json(raw_text: str) -> Optional[List[Dict[str, Any]]]:
     try:
         data = json.loads(raw_text)
     except Exception:
-        data = attempt_local_json_repair(raw_text)
+        metrics.incr("local_repairs")
+        with metrics.timer("local_repair"):
+            data = attempt_local_json_repair(raw_text)
 
     if data is None:
+        metrics.incr("local_repair_failures")
         return None
 
     arr = ensure_array_of_objects(data)
     if not arr:
         return None
 
-    processed = [process_record(obj) for obj in arr]
+    with metrics.timer("schema_enforce"):
+        processed = [process_record(obj) for obj in arr]
     return processed
+
+
+def parse_batched_response(raw_text: str, n_lines: int) -> List[Optional[List[Dict[str, Any]]]]:
+    """Split a batched response into one processed record list per input line.
+
+    The model is asked to return a JSON object keyed by the 1-based line index
+    tags, e.g. {"1": [...], "2": [...]}. A list of {"index": i, "records": [...]}
+    items is accepted as well. Entries that are missing, out of range or empty
+    are returned as None so the caller can fall back to single-line extraction
+    for just those lines.
+    """
+    out: List[Optional[List[Dict[str, Any]]]] = [None] * n_lines
+    if not raw_text or not raw_text.strip():
+        return out
+
+    try:
+        data = json.loads(raw_text)
+    except Exception:
+        data = attempt_local_json_repair(raw_text)
+
+    # Local repair wraps a top-level object into a list; undo that here
+    if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict) and "index" not in data[0]:
+        data = data[0]
+
+    if isinstance(data, dict):
+        entries = list(data.items())
+    elif isinstance(data, list):
+        entries = [(item.get("index"), item.get("records")) for item in data if isinstance(item, dict)]
+    else:
+        return out
+
+    for key, value in entries:
+        try:
+            idx = int(str(key).strip("[] "))
+        except (TypeError, ValueError):
+            continue
+        if not 1 <= idx <= n_lines:
+            continue
+        arr = ensure_array_of_objects(value)
+        if arr:
+            out[idx - 1] = [process_record(obj) for obj in arr]
+    return out
+
+
+class StreamAborted(ValueError):
+    """A streamed completion stopped being (or never became) valid JSON."""
+
+
+def iter_stream_records(deltas: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield processed records from streamed text deltas as soon as each object closes.
+
+    Stops consuming deltas once the top-level JSON value has closed, so the
+    caller can cancel the rest of the stream. Raises StreamAborted when the
+    output turns invalid, or when the stream ends before the JSON closed;
+    records yielded before that point are still valid.
+    """
+    parser = IncrementalArrayParser()
+    for delta in deltas:
+        for obj in parser.feed(delta):
+            yield process_record(obj)
+        if parser.failed:
+            metrics.incr("stream_aborts")
+            raise StreamAborted("streamed output can no longer become valid JSON")
+        if parser.done:
+            return
+    raise StreamAborted("stream ended before the JSON value closed")
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""Priority-aware scheduling: urgent lines are extracted and flushed first.
+
+PriorityScheduler pre-scans every line before dispatch, with regexes only (no
+LLM), and puts it in one of the urgency classes the schema uses:
+
+- high: urgency keywords (urgent, ASAP, immediately, emergency, critical),
+  "today"/"tonight"/"tomorrow", "within/in N days" with N <= 7, or an explicit
+  date at most 7 days from now (overdue dates included)
+- medium: "soon", "next week", "end of the week/month", or an explicit date
+  8-30 days from now
+- low: everything else
+
+runner.iter_prioritized dispatches high lines first, then medium, then low
+(input order within a class), and yields each line's records as soon as they
+are ready. The scheduler also keeps per-class time-to-result (seconds from
+the start of the run until a line's records are ready) for stats_line().
+Histograms: priority_high, priority_medium, priority_low.
+"""
+from datetime import datetime
+from typing import Dict, Optional
+import re
+import threading
+
+from . import metrics
+from .retry import LatencyWindow
+from .rules import _find_date
+from .utils import infer_urgency_from_deadline, urgency_for_days
+
+PRIORITIES = ("high", "medium", "low")
+
+_HIGH_RE = re.compile(
+    r"\b(?:urgent(?:ly)?|asap|immediately|emergency|critical|today|tonight|tomorrow)\b",
+    re.IGNORECASE,
+)
+_MEDIUM_RE = re.compile(r"\b(?:soon|next week|end of (?:the )?(?:week|month))\b", re.IGNORECASE)
+_WITHIN_DAYS_RE = re.compile(r"\b(?:within|in) (\d+) days?\b", re.IGNORECASE)
+
+
+class PriorityScheduler:
+    """Urgency pre-scan plus per-class latency report.
+
+    Thread-safe: results may be observed from worker threads.
+    """
+
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now
+        self.counts = {p: 0 for p in PRIORITIES}
+        self.latencies = {p: LatencyWindow(size=1 << 20, refresh=1) for p in PRIORITIES}
+        self.worst = {p: 0.0 for p in PRIORITIES}
+        self._lock = threading.Lock()
+
+    def classify(self, line: str) -> str:
+        """Priority class of line: "high", "medium" or "low"."""
+        if _HIGH_RE.search(line):
+            return "high"
+        days = _WITHIN_DAYS_RE.search(line)
+        if days:
+            return urgency_for_days(int(days.group(1))) or "low"
+        if any(c.isdigit() for c in line):
+            iso, _ = _find_date(line)
+            if iso:
+                return infer_urgency_from_deadline(iso, self.now) or "low"
+        return "medium" if _MEDIUM_RE.search(line) else "low"
+
+    def observe(self, priority: str, seconds: float):
+        """Record the time-to-result of one line."""
+        with self._lock:
+            self.counts[priority] += 1
+            self.worst[priority] = max(self.worst[priority], seconds)
+        self.latencies[priority].observe(seconds)
+        metrics.observe(f"priority_{priority}", seconds)
+
+    def report(self) -> Dict[str, Dict]:
+        """Per class: lines, p50/p95/max time-to-result in seconds (None when empty)."""
+        out = {}
+        for p in PRIORITIES:
+            window = self.latencies[p]
+            out[p] = {
+                "lines": self.counts[p],
+                "p50_s": window.quantile(0.5),
+                "p95_s": window.quantile(0.95),
+                "max_s": self.worst[p] if self.counts[p] else None,
+            }
+        return out
+
+    def stats_line(self) -> str:
+        parts = [
+            f"{p} {r['lines']} lines p50 {r['p50_s']:.2f}s p95 {r['p95_s']:.2f}s max {r['max_s']:.2f}s"
+            for p, r in self.report().items()
+            if r["lines"]
+        ]
+        return "priority: " + ("; ".join(parts) if parts else "no lines")
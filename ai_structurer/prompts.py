@@ -0,0 +1,143 @@
+"""Prompt builder: compact schema preamble and adaptive max_tokens.
+
+- Prompts start with a fixed preamble built once from schema.SCHEMA_KEYS and
+  end with the variable text, so consecutive requests share an identical
+  prefix the provider can cache. style="full" keeps the original, longer
+  prose instructions.
+- estimate_items counts the quantity mentions in a line ("20 boxes",
+  "5 kg", "two pallets"). The completion budget is sized from that and the
+  line length instead of the flat 2048 tokens. The estimate errs on the
+  generous side, and llm retries a completion that stops at the budget
+  ("finish_reason": "length") once with the full budget.
+- record_usage adds the requested budget of every LLM call and the number of
+  lines it covered to the metrics counters max_tokens_requested and
+  llm_lines. Token counts come from the provider's `usage` field
+  (llm_prompt_tokens, llm_completion_tokens; see llm._count_usage), so
+  dividing those by llm_lines gives real tokens per line, to compare runs.
+
+configure_prompts sets the style and whether budgets adapt for the whole
+process, like llm.configure_default_client.
+"""
+from functools import lru_cache
+from typing import List, NamedTuple
+import re
+
+from . import metrics
+from .llm import FULL_MAX_TOKENS
+from .schema import SCHEMA_KEYS
+
+# Completion budget per line in a batched prompt when budgets do not adapt
+_BATCH_TOKENS_PER_LINE = 256
+# One pretty-printed record is ~60-70 tokens; leave headroom for long names
+_TOKENS_PER_ITEM = 96
+_TOKENS_OVERHEAD = 32
+_MIN_MAX_TOKENS = 128
+
+_SCHEMA_TYPES = {
+    "material_name": "str",
+    "quantity": "number",
+    "unit": "str",
+    "project_name": "str|null",
+    "location": "str|null",
+    "urgency": '"low"|"medium"|"high"',
+    "deadline": '"YYYY-MM-DD"|null',
+}
+
+_RECORD_KEYS_STR = (
+    "material_name (string), quantity (number), unit (string), project_name (string|null),"
+    " location (string|null), urgency (\"low\"|\"medium\"|\"high\"), deadline (ISO date string|null)."
+)
+
+_NUMBER_WORDS = r"one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|twenty|fifty|hundred|a dozen|dozen|a couple of|a few"
+# A quantity followed by a word: not part of a date/code (no -, / or . around it) and not a place or id number
+_QUANTITY_RE = re.compile(
+    rf"(?<![\w/.-])(?<!warehouse )(?<!site )(?<!yard )(?<!project )(?<!block )(?<!floor )(?<!gate )(?<!dock )(?<!room )(?<!#)"
+    rf"(?:\d+(?:[.,]\d+)?|{_NUMBER_WORDS})(?![\d/.-])\s*(?:x\s*)?[a-z]",
+    re.IGNORECASE,
+)
+
+_style = "compact"
+_adaptive = True
+
+
+class Prompt(NamedTuple):
+    text: str
+    max_tokens: int
+    lines: int = 1
+
+
+def configure_prompts(style: str = "compact", adaptive: bool = True):
+    """Set the process-wide prompt style ("compact" or "full") and budget mode."""
+    global _style, _adaptive
+    if style not in ("compact", "full"):
+        raise ValueError(f"unknown prompt style: {style}")
+    _style, _adaptive = style, adaptive
+
+
+@lru_cache(maxsize=None)
+def _preamble(style: str, batched: bool) -> str:
+    if style == "full":
+        if batched:
+            return (
+                "Extract structured data from each of the following business text lines. "
+                "Return a strictly valid JSON object and nothing else. Its keys are the line numbers shown in square brackets"
+                " (as strings) and each value is a JSON array of objects with exactly these keys: " + _RECORD_KEYS_STR
+            )
+        return (
+            "Extract structured data from the following business text line. "
+            "Return a strictly valid JSON array and nothing else. Each element must be an object with exactly these keys: " + _RECORD_KEYS_STR
+        )
+    spec = ", ".join(f"{k}:{_SCHEMA_TYPES[k]}" for k in SCHEMA_KEYS)
+    if batched:
+        return f"Extract ordered items per line. Reply only JSON: an object keyed by the [n] line numbers, each value an array of {{{spec}}}."
+    return f"Extract ordered items. Reply only a JSON array of {{{spec}}}."
+
+
+def estimate_items(line: str) -> int:
+    """Number of items a line probably mentions (at least 1)."""
+    return max(1, len(_QUANTITY_RE.findall(line)))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _line_budget(line: str) -> int:
+    return _TOKENS_OVERHEAD + estimate_items(line) * _TOKENS_PER_ITEM + estimate_tokens(line)
+
+
+def _round_budget(tokens: int, ceiling: int) -> int:
+    return min(ceiling, max(_MIN_MAX_TOKENS, -(-tokens // 64) * 64))
+
+
+def line_prompt(line: str) -> Prompt:
+    text = f"{_preamble(_style, False)}\n\nText: {line}\n"
+    max_tokens = _round_budget(_line_budget(line), FULL_MAX_TOKENS) if _adaptive else FULL_MAX_TOKENS
+    return Prompt(text, max_tokens)
+
+
+def batch_prompt(lines: List[str]) -> Prompt:
+    tagged = "\n".join(f"[{i}] {line}" for i, line in enumerate(lines, start=1))
+    text = f"{_preamble(_style, True)}\n\nLines:\n{tagged}\n"
+    ceiling = max(FULL_MAX_TOKENS, _BATCH_TOKENS_PER_LINE * len(lines))
+    if not _adaptive:
+        return Prompt(text, ceiling, len(lines))
+    # Each line's array sits under a quoted index key
+    budget = sum(_line_budget(line) + 8 for line in lines)
+    return Prompt(text, _round_budget(budget, ceiling), len(lines))
+
+
+def correction_prompt(line: str) -> Prompt:
+    """Retry prompt after an unparseable answer; always gets the full budget."""
+    text = (
+        line_prompt(line).text
+        + "\n\nThe previous response was invalid JSON. Return ONLY a strictly valid JSON array that follows the exact schema (no commentary)."
+    )
+    return Prompt(text, FULL_MAX_TOKENS)
+
+
+def record_usage(prompt: Prompt):
+    """Count the lines and the requested budget of one call (tokens: llm._count_usage)."""
+    metrics.incr("llm_lines", prompt.lines)
+    metrics.incr("max_tokens_requested", prompt.max_tokens)
@@ -0,0 +1,140 @@
+"""Client-side rate limiting with adaptive (AIMD) concurrency.
+
+RateLimiter is shared by every worker thread and gates each HTTP attempt made
+by GroqClient:
+
+- two token buckets enforce requests/minute and tokens/minute quotas
+- an adaptive in-flight limit grows additively (+1 per window of healthy
+  responses) and shrinks multiplicatively on 429/503 (THROTTLE_STATUSES), on
+  connection failures, or when latency climbs well above the best latency
+  seen so far; other 5xx errors are retried by the client but leave the
+  limit alone, since they are not a sign of overload
+
+This keeps a run close to the provider's quota ceiling without tripping the
+throttling that would otherwise turn lines into null fallback records.
+"""
+from typing import Optional
+import threading
+import time
+
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute / 60 per second."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 when available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Shared request/token quota plus AIMD-controlled in-flight limit.
+
+    - requests_per_minute / tokens_per_minute: quotas, None for unlimited
+    - max_concurrency / min_concurrency: bounds for the adaptive limit
+    - adaptive: if False the in-flight limit stays at max_concurrency
+    - latency_tolerance: back off when latency exceeds best EWMA latency by this factor
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        adaptive: bool = True,
+        latency_tolerance: float = 2.0,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.adaptive = adaptive
+        self.latency_tolerance = latency_tolerance
+        # Adaptive mode starts halfway and finds the ceiling from there
+        self.limit = float(max_concurrency if not adaptive else max(min_concurrency, max_concurrency // 2))
+        self.in_flight = 0
+        self.throttled = 0
+        self._ewma_latency: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens: float = 0):
+        """Block until an in-flight slot and enough request/token quota are available."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.in_flight < int(self.limit):
+                    wait = 0.0
+                    if self.request_bucket is not None:
+                        wait = max(wait, self.request_bucket.wait_time(1, now))
+                    if self.token_bucket is not None:
+                        wait = max(wait, self.token_bucket.wait_time(tokens, now))
+                    if wait == 0.0:
+                        if self.request_bucket is not None:
+                            self.request_bucket.take(1)
+                        if self.token_bucket is not None:
+                            self.token_bucket.take(tokens)
+                        self.in_flight += 1
+                        return
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def release(self, status: Optional[int], latency: float):
+        """Return the slot and feed the outcome into the AIMD controller.
+
+        status is the HTTP status, or None when the request failed to connect.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if status is None or status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self._decrease(0.5)
+            elif status == 200:
+                self._observe_latency(latency)
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float):
+        self._ewma_latency = latency if self._ewma_latency is None else 0.8 * self._ewma_latency + 0.2 * latency
+        if self._best_latency is None or self._ewma_latency < self._best_latency:
+            self._best_latency = self._ewma_latency
+        if self._ewma_latency > self._best_latency * self.latency_tolerance:
+            self._decrease(0.9)
+        elif self.adaptive:
+            # Additive increase: roughly +1 per window of `limit` healthy responses
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+
+    def _decrease(self, factor: float):
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        # One cut per latency window, so a burst of 429s from requests already
+        # in flight does not collapse the limit to the floor
+        if now - self._last_decrease < (self._ewma_latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_concurrency), self.limit * factor)
+
+    @property
+    def concurrency(self) -> int:
+        return int(self.limit)
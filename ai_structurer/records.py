@@ -0,0 +1,56 @@
+"""Compact record type.
+
+Record holds one schema record in __slots__ (one attribute per SCHEMA_KEYS
+field, no per-instance dict), which takes about a quarter of the memory of
+the equivalent dict. to_dict() gives back the exact schema dict, with keys in
+SCHEMA_KEYS order.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .schema import SCHEMA_KEYS
+
+
+class Record:
+    __slots__ = tuple(SCHEMA_KEYS)
+
+    def __init__(self, *values: Any):
+        if len(values) > len(SCHEMA_KEYS):
+            raise TypeError(f"Record takes at most {len(SCHEMA_KEYS)} values")
+        for key, value in zip(SCHEMA_KEYS, values + (None,) * (len(SCHEMA_KEYS) - len(values))):
+            setattr(self, key, value)
+
+    @classmethod
+    def from_dict(cls, obj: Dict[str, Any]) -> "Record":
+        return cls(*(obj.get(k) for k in SCHEMA_KEYS))
+
+    def to_dict(self) -> Dict[str, Optional[Any]]:
+        return {k: getattr(self, k) for k in SCHEMA_KEYS}
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, k) for k in SCHEMA_KEYS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return self.as_tuple() == other.as_tuple()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Record({self.to_dict()!r})"
+
+
+def as_dict(record: Union[Record, Dict[str, Any]]) -> Dict[str, Any]:
+    """Dict view of a Record or a record dict (returned unchanged)."""
+    return record.to_dict() if isinstance(record, Record) else record
+
+
+def as_row(record: Union[Record, Dict[str, Any]]) -> Tuple[Any, ...]:
+    """Values of a Record or record dict in SCHEMA_KEYS order."""
+    if isinstance(record, Record):
+        return record.as_tuple()
+    return tuple(record.get(k) for k in SCHEMA_KEYS)
+
+
+def compact(records: Iterable[Dict[str, Any]]) -> List[Record]:
+    return [Record.from_dict(r) for r in records]
@@ -0,0 +1,203 @@
+"""Per-line retry budget, deadline and hedged attempts.
+
+RetryPolicy owns how hard the runner tries to extract one line:
+
+- max_attempts: LLM attempts per line, the first prompt plus correction
+  prompts (default 2). llm.call_groq_llm's own correction retry is not used
+  by the runner, so a bad line costs at most this many calls.
+- deadline: seconds one line may take across all its attempts (None = no
+  limit). Each call gets the remaining time as its HTTP deadline, and
+  transient-error retries stop when it has passed. A line that runs out of
+  time gets the null fallback record.
+- hedge: when an attempt has not answered within the observed p95 latency
+  of LLM calls (hedge_quantile, or a fixed hedge_after), a duplicate is
+  sent and whichever returns parseable records first wins. Hedging waits
+  for min_samples observed calls and never fires earlier than hedge_min
+  seconds. Hedged copies use rate-limiter quota like any other call.
+
+Attempts without hedging run inline on the caller's thread; the deadline
+reaches them as their HTTP deadline. With hedging, the attempt and its copy
+run on a thread pool so the caller can take whichever answers first. The
+pool is sized from concurrency (four threads per line in flight: the
+attempt, its hedge, and room for copies still finishing after the line
+moved on), so attempts never queue behind other lines.
+
+Counters: retry_attempts, retry_deadline_exceeded, hedged_requests,
+hedge_wins (the duplicate answered first).
+
+configure_retries sets the policy for the whole process, like
+prompts.configure_prompts.
+"""
+from collections import deque
+from typing import Callable, Optional, Sequence, TypeVar
+import threading
+import time
+
+from . import metrics
+
+T = TypeVar("T")
+
+# An attempt gets its monotonic deadline (or None) and returns None when it failed
+Attempt = Callable[[Optional[float]], Optional[T]]
+
+
+class LatencyWindow:
+    """Sliding window of recent call latencies with cached quantiles."""
+
+    def __init__(self, size: int = 512, refresh: int = 16):
+        self.samples = deque(maxlen=size)
+        self.refresh = refresh
+        self._since_sort = 0
+        self._sorted = []
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+            self._since_sort += 1
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self.samples:
+                return None
+            if self._since_sort >= self.refresh or not self._sorted:
+                self._sorted = sorted(self.samples)
+                self._since_sort = 0
+            return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class RetryPolicy:
+    """Attempt budget, per-line deadline and hedging; see the module docstring."""
+
+    def __init__(
+        self,
+        max_attempts: int = 2,
+        deadline: Optional[float] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_after: Optional[float] = None,
+        hedge_min: float = 0.05,
+        min_samples: int = 20,
+        concurrency: int = 1,
+        hedge_workers: Optional[int] = None,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_after = hedge_after
+        self.hedge_min = hedge_min
+        self.min_samples = min_samples
+        self.hedge_workers = hedge_workers or max(8, 4 * concurrency)
+        self.latencies = LatencyWindow()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record the latency of one LLM call (cache hits should not be reported)."""
+        self.latencies.observe(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging an attempt, or None to not hedge (yet)."""
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if len(self.latencies) < self.min_samples:
+            return None
+        return max(self.hedge_min, self.latencies.quantile(self.hedge_quantile))
+
+    def run(self, attempts: Sequence[Attempt]) -> Optional[T]:
+        """Run attempts in order until one returns a result, within the budget.
+
+        Only the first max_attempts are used. Returns None when all of them
+        failed or the deadline passed.
+        """
+        deadline = time.monotonic() + self.deadline if self.deadline is not None else None
+        for attempt in attempts[:self.max_attempts]:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            metrics.incr("retry_attempts")
+            delay = self.hedge_delay()
+            if delay is None:
+                result = _safe(attempt, deadline)
+            else:
+                result = self._race(attempt, deadline, delay)
+            if result is not None:
+                return result
+        if deadline is not None and time.monotonic() >= deadline:
+            metrics.incr("retry_deadline_exceeded")
+        return None
+
+    def _race(self, attempt: Attempt, deadline: Optional[float], delay: float) -> Optional[T]:
+        """Run attempt on the pool, hedging it after delay seconds, until deadline."""
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        pool = self._executor()
+        first = pool.submit(_safe, attempt, deadline)
+        running = {first}
+        hedged = False
+        while running:
+            timeout = _remaining(deadline)
+            if not hedged and delay is not None:
+                timeout = delay if timeout is None else min(timeout, delay)
+            done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                result = fut.result()
+                if result is not None:
+                    if fut is not first:
+                        metrics.incr("hedge_wins")
+                    return result
+            if done:
+                # The failed copy is not re-sent; wait for a hedge still running
+                delay = None
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            if not hedged and delay is not None:
+                hedged = True
+                metrics.incr("hedged_requests")
+                running.add(pool.submit(_safe, attempt, deadline))
+        return None
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._pool = ThreadPoolExecutor(max_workers=self.hedge_workers, thread_name_prefix="hedge")
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+def _safe(attempt: Attempt, deadline: Optional[float]):
+    try:
+        return attempt(deadline)
+    except Exception:
+        return None
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+_policy = RetryPolicy()
+
+
+def configure_retries(**kwargs):
+    """Replace the process-wide RetryPolicy with RetryPolicy(**kwargs)."""
+    global _policy
+    old, _policy = _policy, RetryPolicy(**kwargs)
+    old.close()
+
+
+def get_policy() -> RetryPolicy:
+    return _policy
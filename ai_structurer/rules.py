@@ -0,0 +1,136 @@
+"""Deterministic rule-based fast path that can bypass the LLM for simple lines.
+
+extract_by_rules() fills the schema from precompiled patterns for regular
+lines such as "Need 20 boxes of screws for Project Phoenix, deliver to
+Warehouse 12 by 2026-01-15" and returns a confidence score. RuleExtractor wraps
+it with a threshold and bypass counters; the runner only sends lines below the
+threshold to the LLM.
+
+Dates go through schema._to_iso_date_or_null and urgency falls back to
+utils.infer_urgency_from_deadline (via process_record), so rule records are
+post-processed exactly like LLM records.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import re
+import threading
+
+from . import metrics
+from .schema import _to_iso_date_or_null
+from .utils import process_record
+
+_UNITS = (
+    "boxes|box|packs|pack|packets|packet|bags|bag|kgs|kg|grams|g|tonnes|tons|tonne|ton|"
+    "litres|liters|litre|liter|ltrs|ltr|l|ml|gallons|gallon|pcs|pieces|piece|units|unit|nos|"
+    "meters|metres|meter|metre|m|feet|ft|sheets|sheet|rolls|roll|pallets|pallet|bundles|bundle|"
+    "cartons|carton|crates|crate|drums|drum|sets|set|pairs|pair|cans|can|buckets|bucket"
+)
+
+# <quantity> <unit> [of] <material>, where the material stops at a preposition or punctuation
+_ITEM_RE = re.compile(
+    r"(?<![\w.])(\d+(?:[.,]\d+)*)\s*(" + _UNITS + r")\b\.?\s+(?:of\s+)?"
+    r"((?!(?:for|at|to|by|on|from|in|with|deliver\w*|needed|required|due|before)\b)[A-Za-z0-9][\w\-/]*"
+    r"(?:\s+(?!(?:for|at|to|by|on|from|in|with|deliver\w*|needed|required|due|before|and)\b)[A-Za-z0-9][\w\-/]*)*)",
+    re.IGNORECASE,
+)
+_PROJECT_RE = re.compile(r"\bProject\s+([A-Z0-9][\w\-]*)")
+_LOCATION_RE = re.compile(r"\b((?:Warehouse|Site|Depot|Yard|Plant)\s+[A-Z0-9][\w\-]*)")
+_DATE_RES = (
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+    re.compile(r"\b\d{4}/\d{2}/\d{2}\b"),
+    re.compile(r"\b\d{1,2}/\d{1,2}/\d{4}\b"),
+    re.compile(r"\b\d{2}-\d{2}-\d{4}\b"),
+    re.compile(r"\b[A-Z][a-z]+ \d{1,2},? \d{4}\b"),
+    re.compile(r"\b\d{1,2} [A-Z][a-z]{2} \d{4}\b"),
+)
+# Words that suggest a date we cannot resolve locally
+_RELATIVE_DATE_RE = re.compile(
+    r"\b(?:tomorrow|today|tonight|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"end of (?:the )?(?:week|month)|within \d+ days?|in \d+ (?:days?|weeks?))\b",
+    re.IGNORECASE,
+)
+_HIGH_URGENCY_RE = re.compile(r"\b(?:urgent(?:ly)?|asap|immediately|emergency|critical)\b", re.IGNORECASE)
+_LOW_URGENCY_RE = re.compile(r"\b(?:no rush|whenever|no deadline)\b", re.IGNORECASE)
+
+
+def _find_date(line: str) -> Tuple[Optional[str], bool]:
+    """Return (ISO date or None, True if a date-looking token failed to parse)."""
+    for rx in _DATE_RES:
+        m = rx.search(line)
+        if m:
+            iso = _to_iso_date_or_null(m.group(0))
+            return iso, iso is None
+    return None, False
+
+
+def extract_by_rules(line: str) -> Tuple[Optional[List[Dict[str, Any]]], float]:
+    """Try to extract one schema record from line without the LLM.
+
+    Returns (records, confidence). records is None when the line does not
+    match the basic quantity + unit + material shape. Confidence is in [0, 1]
+    and drops for lines with several items or dates we cannot resolve.
+    """
+    items = _ITEM_RE.findall(line)
+    if not items:
+        return None, 0.0
+
+    qty, unit, material = items[0]
+    confidence = 0.5
+    # Several items in one line are the LLM's job
+    if len(items) == 1:
+        confidence += 0.2
+    # Short material names are reliably captured; long tails usually mean prose
+    if len(material.split()) <= 3:
+        confidence += 0.1
+
+    deadline, unparsed_date = _find_date(line)
+    if not unparsed_date and (deadline or not _RELATIVE_DATE_RE.search(line)):
+        confidence += 0.2
+
+    urgency = None
+    if _HIGH_URGENCY_RE.search(line):
+        urgency = "high"
+    elif _LOW_URGENCY_RE.search(line) and not deadline:
+        urgency = "low"
+
+    project = _PROJECT_RE.search(line)
+    location = _LOCATION_RE.search(line)
+    raw = {
+        "material_name": material.strip(),
+        "quantity": qty.replace(",", ""),
+        "unit": unit,
+        "project_name": project.group(1) if project else None,
+        "location": location.group(1) if location else None,
+        "urgency": urgency,
+        "deadline": deadline,
+    }
+    return [process_record(raw)], round(confidence, 2)
+
+
+class RuleExtractor:
+    """Threshold gate in front of the LLM plus bypass counters.
+
+    Thread-safe: one extractor is shared by all workers.
+    """
+
+    def __init__(self, threshold: float = 0.9):
+        self.threshold = threshold
+        self.attempted = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+
+    def try_extract(self, line: str) -> Optional[List[Dict[str, Any]]]:
+        """Return rule records when confident enough, else None (send to the LLM)."""
+        records, confidence = extract_by_rules(line)
+        hit = records is not None and confidence >= self.threshold
+        with self._lock:
+            self.attempted += 1
+            if hit:
+                self.bypassed += 1
+        metrics.incr("fast_path_bypassed" if hit else "fast_path_to_llm")
+        return records if hit else None
+
+    def bypass_rate(self) -> float:
+        return self.bypassed / self.attempted if self.attempted else 0.0
+
+    def stats_line(self) -> str:
+        return f"fast path: {self.bypassed}/{self.attempted} lines bypassed the LLM ({self.bypass_rate():.1%})"
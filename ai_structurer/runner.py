@@ -1,79 +1,523 @@
 """Top-level process_all_inputs and write_outputs functions.
 
 - process_all_inputs: loads test inputs, calls LLM for each, attempts parse and repair, and applies schema.
-- write_outputs: writes a JSON array to file.
+- write_outputs: writes records to file (JSON array by default, see writers).
+- iter_line_results / iter_records: lazy, order-preserving variants for streaming runs.
+- iter_prioritized: urgent lines first (see priority), yielding (index, class, records).
+- extract_lines: one chunk of lines at once (the service's batch entry point).
+- stream_outputs: writes records incrementally (NDJSON, streamed JSON array, ...).
 
-This module separates I/O and core logic to help testing.
+This module separates I/O and core logic to help testing. Modules only
+needed by some runs (thread pool, writers, compact records) are imported on
+use, and the option types below only for type checking, to keep CLI startup
+short.
 """
-from typing import List
-import json
-from pathlib import Path
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from collections import deque
+from functools import partial
+from itertools import islice
+import os
+import sys
+import time
 
 from .utils import load_inputs
-from .llm import call_groq_llm
-from .parser import parse_and_repair_json
+from .llm import call_groq_llm, stream_groq_llm
+from .parser import parse_and_repair_json, parse_batched_response, iter_stream_records
+from .schema import strict_schema_template
+from . import metrics
+from .prompts import FULL_MAX_TOKENS, Prompt, batch_prompt, correction_prompt, line_prompt, record_usage
+from .retry import get_policy
+from .cascade import get_cascade
+
+if TYPE_CHECKING:
+    from .cache import ResponseCache
+    from .checkpoint import CheckpointJournal
+    from .dedup import Deduper
+    from .priority import PriorityScheduler
+    from .rules import RuleExtractor
+
+
+class FallbackRecords(list):
+    """The null-filled record list of a line that could not be extracted.
+
+    A plain list to every consumer; the runner checks the type so that
+    fallbacks are not journaled as finished lines.
+    """
 
 
-def process_all_inputs(input_path: str, model: str = "llama3-70b-8192") -> List[dict]:
+def process_all_inputs(input_path: str, model: str = "llama3-70b-8192", concurrency: int = 1, batch_size: int = 1, cache: Optional[ResponseCache] = None, journal: Optional[CheckpointJournal] = None, rules: Optional[RuleExtractor] = None, stream: bool = False, dedup: Optional[Deduper] = None, compact: bool = False, priority: Optional[PriorityScheduler] = None) -> List[dict]:
     """Process each line in input file by calling LLM and parsing output.
 
     For each input line, we:
       - call Groq LLM once
       - parse locally
-      - if parse fails, the LLM call_groq_llm is configured to retry once with correction
-      - if still fails, parse_and_repair_json provides final fallback
+      - if parse fails, retry with a correction prompt, within the attempt
+        budget and deadline of the retry.RetryPolicy (which may also hedge
+        slow attempts)
+      - if still fails, a null-filled schema record is the final fallback
+
+    When concurrency > 1, up to that many lines are extracted at the same time
+    on a thread pool. Records are still returned in input order.
+
+    When batch_size > 1, that many lines are packed into one prompt and the
+    response is split back per line; lines missing from a batched response
+    fall back to single-line extraction.
+
+    When a cache is given, LLM responses are looked up there first and
+    parseable responses are stored for later runs.
+
+    When a checkpoint journal is given, finished lines are journaled as they
+    complete and lines already in the journal are not extracted again.
+
+    When a RuleExtractor is given, lines it can extract with enough confidence
+    skip the LLM entirely.
+
+    When stream is True, single-line extractions use streamed completions:
+    records are parsed as each object closes and a stream that turns invalid
+    is cancelled early in favour of the correction retry.
 
-    Returns a list of schema-enforced records.
+    When a cascade.ModelCascade is configured, lines go to its fast model
+    first and only lines it cannot answer confidently reach model.
+
+    When a Deduper is given, lines in the same group are extracted once and
+    the records are copied to every line of the group.
+
+    When a PriorityScheduler is given, urgent lines are extracted first (see
+    iter_prioritized; dedup is not applied). The result is still in input order.
+
+    Returns a list of schema-enforced records; with compact=True they are
+    records.Record objects instead of dicts, to save memory on large runs.
     """
     lines = load_inputs(input_path)
+    if compact:
+        from .records import Record
+    if priority is not None:
+        per_line: List[Optional[List]] = [None] * len(lines)
+        for i, _, parsed in iter_prioritized(lines, priority, model=model, concurrency=concurrency, batch_size=batch_size, cache=cache, journal=journal, rules=rules, stream=stream):
+            per_line[i] = list(map(Record.from_dict, parsed)) if compact else parsed
+        return [rec for parsed in per_line for rec in parsed]
     results = []
-    for line in lines:
-        # Call LLM for this line
+    for parsed in iter_line_results(lines, model=model, concurrency=concurrency, batch_size=batch_size, cache=cache, journal=journal, rules=rules, stream=stream, dedup=dedup):
+        results.extend(map(Record.from_dict, parsed) if compact else parsed)
+    return results
+
+
+def iter_line_results(
+    lines: Iterable[str],
+    model: str = "llama3-70b-8192",
+    concurrency: int = 1,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    journal: Optional[CheckpointJournal] = None,
+    rules: Optional[RuleExtractor] = None,
+    stream: bool = False,
+    dedup: Optional[Deduper] = None,
+) -> Iterator[List[dict]]:
+    """Lazily extract lines, yielding one record list per input line in input order.
+
+    lines may be any iterable (e.g. utils.iter_inputs); it is consumed only as
+    fast as results are produced, so at most a small window of lines is held
+    in memory at once (plus one record list per dedup group when dedup is on).
+    """
+    kwargs = dict(model=model, concurrency=concurrency, batch_size=batch_size, cache=cache, journal=journal, rules=rules, stream=stream)
+    if dedup is None:
+        yield from _iter_extracted(lines, **kwargs)
+        return
+    yield from _iter_deduplicated(lines, dedup, kwargs)
+
+
+def _iter_extracted(lines: Iterable[str], model: str, concurrency: int, batch_size: int, cache: Optional[ResponseCache], journal: Optional[CheckpointJournal], rules: Optional[RuleExtractor], stream: bool) -> Iterator[List[dict]]:
+    chunks = _iter_chunks(enumerate(lines), max(1, batch_size))
+    worker = partial(_process_indexed_chunk, model=model, cache=cache, journal=journal, rules=rules, stream=stream)
+    if concurrency <= 1:
+        per_chunk = map(worker, chunks)
+    else:
+        per_chunk = _ordered_map(worker, chunks, concurrency)
+    for per_line in per_chunk:
+        yield from per_line
+
+
+def iter_prioritized(
+    lines: Sequence[str],
+    scheduler: PriorityScheduler,
+    model: str = "llama3-70b-8192",
+    concurrency: int = 1,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    journal: Optional[CheckpointJournal] = None,
+    rules: Optional[RuleExtractor] = None,
+    stream: bool = False,
+) -> Iterator[Tuple[int, str, List[dict]]]:
+    """Extract high-priority lines first, yielding (line index, class, records) as they finish.
+
+    All lines are classified up front by scheduler, then dispatched high,
+    medium, low (input order within a class). Batches never mix classes.
+    Each line's time-to-result is reported to the scheduler.
+    """
+    from .priority import PRIORITIES
+
+    classes = [scheduler.classify(line) for line in lines]
+    groups = ([i for i, c in enumerate(classes) if c == p] for p in PRIORITIES)
+    chunks = (chunk for group in groups for chunk in _iter_chunks(((i, lines[i]) for i in group), max(1, batch_size)))
+    worker = partial(_process_indexed_chunk, model=model, cache=cache, journal=journal, rules=rules, stream=stream)
+    start = time.monotonic()
+    pairs = ((chunk, worker(chunk)) for chunk in chunks) if concurrency <= 1 else _ordered_map(lambda chunk: (chunk, worker(chunk)), chunks, concurrency)
+    for chunk, per_line in pairs:
+        elapsed = time.monotonic() - start
+        for (i, _), parsed in zip(chunk, per_line):
+            scheduler.observe(classes[i], elapsed)
+            yield i, classes[i], parsed
+
+
+def _iter_deduplicated(lines: Iterable[str], dedup: Deduper, kwargs: dict) -> Iterator[List[dict]]:
+    """Extract only the first line of each dedup group and fan results out.
+
+    A group's first line always precedes its other lines, so every position
+    can be yielded in input order as soon as its group's records exist.
+    """
+    pending = deque()      # group key per line read but not yet yielded
+    new_keys = deque()     # group keys of representatives, in extraction order
+    results = {}
+    seen = set()
+
+    def representatives() -> Iterator[str]:
+        for line in lines:
+            key = dedup.key(line)
+            pending.append(key)
+            if key not in seen:
+                seen.add(key)
+                new_keys.append(key)
+                yield line
+
+    def drain() -> Iterator[List[dict]]:
+        while pending and pending[0] in results:
+            yield [dict(r) for r in results[pending.popleft()]]
+
+    for parsed in _iter_extracted(representatives(), **kwargs):
+        results[new_keys.popleft()] = parsed
+        yield from drain()
+    yield from drain()
+
+
+def iter_records(lines: Iterable[str], **kwargs) -> Iterator[dict]:
+    """Flattened iter_line_results: yields schema-enforced records in input order."""
+    for parsed in iter_line_results(lines, **kwargs):
+        yield from parsed
+
+
+def _iter_chunks(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered_map(fn: Callable, items: Iterable, concurrency: int) -> Iterator:
+    """Like ThreadPoolExecutor.map, but pulls items lazily with a bounded window.
+
+    Items are pulled and submitted on a feeder thread, at most 2 * concurrency
+    ahead of the one being yielded. Results come back in submission order,
+    each as soon as it and every earlier one are done, even while the next
+    item is not available yet (a followed file, a slow stdin).
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor
+    import queue
+    import threading
+
+    submitted = queue.Queue(maxsize=2 * concurrency)
+    stop = threading.Event()
+    end = Future()
+
+    def put(fut: Future) -> bool:
+        while not stop.is_set():
+            try:
+                submitted.put(fut, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def feed():
         try:
-            raw = call_groq_llm(_make_instructions(line), model=model)
-        except Exception:
-            raw = ""
+            for item in items:
+                if not put(pool.submit(fn, item)):
+                    return
+        except BaseException as e:
+            # Raised to the consumer in order, after every earlier result
+            failed = Future()
+            failed.set_exception(e)
+            put(failed)
+        put(end)
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    # A daemon: it may be blocked reading input when the consumer stops early
+    threading.Thread(target=feed, name="ordered-map-feeder", daemon=True).start()
+    try:
+        while True:
+            fut = submitted.get()
+            if fut is end:
+                return
+            yield fut.result()
+    finally:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
 
+
+def _parses(raw: str) -> bool:
+    return parse_and_repair_json(raw) is not None
+
+
+def _call_llm(
+    prompt: Prompt,
+    model: str,
+    cache: Optional[ResponseCache],
+    deadline: Optional[float] = None,
+    observe: bool = True,
+    valid: Callable[[str], bool] = _parses,
+) -> str:
+    """call_groq_llm behind the optional response cache.
+
+    Only responses valid() accepts are stored (by default those
+    parse_and_repair_json can parse), so a bad output is never pinned. Mock mode bypasses the cache so mock answers never leak
+    into live runs. Corrections are left to the RetryPolicy; token usage and
+    latency of calls that reach the LLM are recorded (the latency only with
+    observe=True, so the cascade's fast model does not skew hedge delays).
+    """
+    use_cache = cache is not None and os.getenv("AI_STRUCTURER_USE_MOCK") != "1"
+    if use_cache:
+        cached = cache.get(model, prompt.text, prompt.max_tokens)
+        if cached is not None:
+            return cached
+    kwargs = {"deadline": deadline} if deadline is not None else {}
+    start = time.monotonic()
+    raw = call_groq_llm(prompt.text, model=model, max_tokens=prompt.max_tokens, retry_with_correction=False, **kwargs)
+    if observe:
+        get_policy().observe(time.monotonic() - start)
+    record_usage(prompt)
+    if use_cache and valid(raw):
+        cache.put(model, prompt.text, prompt.max_tokens, raw)
+    return raw
+
+
+def _stream_line(line: str, model: str, cache: Optional[ResponseCache] = None, deadline: Optional[float] = None) -> Optional[List[dict]]:
+    """Extract a line over a streamed completion.
+
+    Returns the records of a stream whose JSON closed, or None when the
+    stream turned invalid, ended early or failed (a failed attempt: partial
+    records are dropped). Only fully closed streams are cached.
+
+    Streams keep the full token budget: a rambling stream is already cut
+    short by the incremental parser, and a truncated one would lose records.
+    """
+    prompt = line_prompt(line)._replace(max_tokens=FULL_MAX_TOKENS)
+    use_cache = cache is not None and os.getenv("AI_STRUCTURER_USE_MOCK") != "1"
+    if use_cache:
+        cached = cache.get(model, prompt.text, prompt.max_tokens)
+        if cached is not None:
+            return parse_and_repair_json(cached)
+
+    pieces: List[str] = []
+
+    kwargs = {"deadline": deadline} if deadline is not None else {}
+
+    def deltas():
+        for delta in stream_groq_llm(prompt.text, model=model, max_tokens=prompt.max_tokens, **kwargs):
+            pieces.append(delta)
+            yield delta
+
+    records: List[dict] = []
+    gen = deltas()
+    try:
+        for rec in iter_stream_records(gen):
+            records.append(rec)
+    except Exception:
+        # Invalid, truncated or dropped stream: a failed attempt, even if
+        # some records arrived before it broke
+        metrics.incr("stream_failures")
+        records = []
+    finally:
+        # Closing the generator closes the HTTP response, cancelling generation
+        gen.close()
+
+    record_usage(prompt)
+    if records and use_cache:
+        cache.put(model, prompt.text, prompt.max_tokens, "".join(pieces))
+    return records or None
+
+
+def extract_lines(lines: List[str], model: str = "llama3-70b-8192", cache: Optional[ResponseCache] = None, rules: Optional[RuleExtractor] = None, stream: bool = False) -> List[List[dict]]:
+    """Extract a chunk of lines now, returning one record list per line in order.
+
+    Several lines share one batched prompt (lines the batched response misses
+    are extracted one by one); the fast path, cascade, retries and fallback
+    apply as in process_all_inputs. Used by the service's micro-batcher.
+    """
+    return _process_chunk(lines, model, cache, rules, stream)
+
+
+def _process_indexed_chunk(
+    chunk: List[Tuple[int, str]],
+    model: str,
+    cache: Optional[ResponseCache] = None,
+    journal: Optional[CheckpointJournal] = None,
+    rules: Optional[RuleExtractor] = None,
+    stream: bool = False,
+) -> List[List[dict]]:
+    """Extract a chunk of (line index, line) pairs, skipping and recording journaled lines.
+
+    Lines that ended in the null fallback are not recorded.
+    """
+    lines = [line for _, line in chunk]
+    if journal is None:
+        return _process_chunk(lines, model, cache, rules, stream)
+
+    out = [journal.lookup(i, line) for i, line in chunk]
+    todo = [k for k, recs in enumerate(out) if recs is None]
+    if todo:
+        fresh = _process_chunk([lines[k] for k in todo], model, cache, rules, stream)
+        for k, recs in zip(todo, fresh):
+            # Null fallbacks are not journaled, so a resumed run extracts them again
+            if not isinstance(recs, FallbackRecords):
+                journal.record(chunk[k][0], lines[k], recs)
+            out[k] = recs
+    return out
+
+
+def _process_chunk(
+    chunk: List[str],
+    model: str,
+    cache: Optional[ResponseCache] = None,
+    rules: Optional[RuleExtractor] = None,
+    stream: bool = False,
+) -> List[List[dict]]:
+    """Extract records for a chunk of lines, returning one record list per line.
+
+    Lines the rule-based fast path handles confidently never reach the LLM.
+    """
+    out = [rules.try_extract(line) if rules is not None else None for line in chunk]
+    todo = [k for k, recs in enumerate(out) if recs is None]
+    if len(todo) == 1:
+        out[todo[0]] = _process_line(chunk[todo[0]], model, cache, stream)
+    elif todo:
+        fresh = _process_batch([chunk[k] for k in todo], model, cache, stream)
+        for k, recs in zip(todo, fresh):
+            out[k] = recs
+    return out
+
+
+def _process_batch(lines: List[str], model: str, cache: Optional[ResponseCache] = None, stream: bool = False) -> List[List[dict]]:
+    """Extract several lines with one batched LLM call.
+
+    Only the lines the batched response does not cover are re-extracted one
+    by one, and the response is cached only when it covers every line. With a cascade the batch goes to the fast model, and lines it does
+    not answer confidently are escalated straight to the large model.
+    """
+    def covers_all(raw: str) -> bool:
+        # Any JSON object parses; only an answer for every line is worth caching
+        return all(parsed is not None for parsed in parse_batched_response(raw, len(lines)))
+
+    cascade = get_cascade()
+    start = time.monotonic()
+    try:
+        if cascade is None:
+            raw = _call_llm(batch_prompt(lines), model, cache, valid=covers_all)
+        else:
+            raw = _call_llm(batch_prompt(lines), cascade.fast_model, cache, observe=False, valid=covers_all)
+    except Exception:
+        raw = ""
+
+    per_line = parse_batched_response(raw, len(lines))
+    metrics.incr("batch_calls")
+    metrics.incr("batch_lines_fallback", sum(1 for parsed in per_line if parsed is None))
+    if cascade is not None:
+        elapsed = time.monotonic() - start
+        per_line = [parsed if cascade.accept_fast(parsed, elapsed) else None for parsed in per_line]
+    return [parsed if parsed is not None else _process_line(line, model, cache, stream, escalated=cascade is not None) for line, parsed in zip(lines, per_line)]
+
+
+def _process_line(line: str, model: str, cache: Optional[ResponseCache] = None, stream: bool = False, escalated: bool = False) -> List[dict]:
+    """Extract records for a single input line, with correction retry (see retry) and fallback.
+
+    escalated=True skips the cascade's fast tier (the line already failed it,
+    e.g. in a batched prompt); the large-model call is still timed on the cascade.
+    """
+    with metrics.timer("line"):
+        cascade = get_cascade()
+        if cascade is None:
+            return _extract_line(line, model, cache, stream)
+        if not escalated:
+            start = time.monotonic()
+            parsed = _fast_tier(line, cascade.fast_model, cache, stream)
+            if cascade.accept_fast(parsed, time.monotonic() - start):
+                return parsed
+        start = time.monotonic()
+        parsed = _extract_line(line, model, cache, stream)
+        cascade.observe_large(parsed, time.monotonic() - start)
+        return parsed
+
+
+def _fast_tier(line: str, fast_model: str, cache: Optional[ResponseCache], stream: bool) -> Optional[List[dict]]:
+    """One call to the cascade's fast model, without correction or fallback."""
+    policy = get_policy()
+    deadline = time.monotonic() + policy.deadline if policy.deadline is not None else None
+    try:
+        if stream:
+            return _stream_line(line, fast_model, cache, deadline)
+        return parse_and_repair_json(_call_llm(line_prompt(line), fast_model, cache, deadline, observe=False))
+    except Exception:
+        return None
+
+
+def _extract_line(line: str, model: str, cache: Optional[ResponseCache], stream: bool) -> List[dict]:
+    def first(deadline: Optional[float]) -> Optional[List[dict]]:
+        if stream:
+            # Records are parsed as the completion streams in; an invalid stream
+            # is cancelled early and goes straight to the correction attempt
+            return _stream_line(line, model, cache, deadline)
         # First attempt: parse & local repair only
-        parsed = parse_and_repair_json(raw)
+        return parse_and_repair_json(_call_llm(line_prompt(line), model, cache, deadline))
 
-        # If parsing failed locally, retry LLM once with a correction prompt
-        if parsed is None:
-            try:
-                correction_prompt = (
-                    _make_instructions(line)
-                    + "\n\nThe previous response was invalid JSON. Return ONLY a strictly valid JSON array that follows the exact schema (no commentary)."
-                )
-                corrected_raw = call_groq_llm(correction_prompt, model=model, max_tokens=2048, retry_with_correction=False)
-            except Exception:
-                corrected_raw = ""
+    def corrected(deadline: Optional[float]) -> Optional[List[dict]]:
+        metrics.incr("runner_corrections")
+        with metrics.timer("runner_correction"):
+            return parse_and_repair_json(_call_llm(correction_prompt(line), model, cache, deadline))
 
-            parsed = parse_and_repair_json(corrected_raw)
+    policy = get_policy()
+    parsed = policy.run([first] + [corrected] * (policy.max_attempts - 1))
 
-        # Final fallback: if still None, append one null-filled schema
-        if parsed is None:
-            from .schema import strict_schema_template
+    # Final fallback: if still None, append one null-filled schema
+    if parsed is None:
+        metrics.incr("fallbacks")
+        parsed = FallbackRecords([strict_schema_template()])
 
-            parsed = [strict_schema_template()]
+    return parsed
 
-        results.extend(parsed)
-    return results
 
+def write_outputs(records: List, output_path: str, fmt: str = "json"):
+    """Write records (dicts or records.Record) to a file in chunks; see writers."""
+    from .writers import write_records
 
-def write_outputs(records: List[dict], output_path: str):
-    p = Path(output_path)
-    p.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+    with open(output_path, "w", encoding="utf-8") as f:
+        write_records(records, f, fmt)
 
 
-def _make_instructions(line: str) -> str:
-    """Construct the prompt to extract the required JSON array.
+def stream_outputs(records: Iterable, output_path: str, fmt: str = "ndjson") -> int:
+    """Write records as they arrive, flushing after each one.
 
-    The prompt must instruct the model to output only JSON and follow the schema exactly.
+    - fmt="ndjson": one compact JSON object per line
+    - fmt="json": a JSON array opened up front and closed at the end; the bytes
+      are identical to write_outputs for the same records
+    - any other writers.WRITERS format (csv, json-compact, columnar)
+
+    output_path "-" writes to stdout. Returns the number of records written.
     """
-    schema_str = (
-        "Return a strictly valid JSON array and nothing else. Each element must be an object with exactly these keys:"
-        " material_name (string), quantity (number), unit (string), project_name (string|null),"
-        " location (string|null), urgency (\"low\"|\"medium\"|\"high\"), deadline (ISO date string|null)."
-    )
-    prompt = f"Extract structured data from the following business text line. {schema_str}\n\nText: {line}\n"
-    return prompt
\ No newline at end of file
+    from .writers import write_records
+
+    if output_path == "-":
+        return write_records(records, sys.stdout, fmt, flush_each=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        return write_records(records, f, fmt, flush_each=True)
@@ -3,9 +3,15 @@
 Functions:
 - strict_schema_template(): returns the strict keys and types
 - enforce_schema(obj): returns an object that strictly matches the schema
+- enforce_schema_many(objs): batch variant of enforce_schema
+- enforce_schema_columns(objs): the same values as one list per key
+
+Enforcement runs from a converter table built once from SCHEMA_KEYS, with
+precompiled patterns and bounded memo caches for string dates and numbers.
 """
-from typing import Any, Dict, Optional
-from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from datetime import date, datetime
+from functools import lru_cache
 import re
 
 SCHEMA_KEYS = [
@@ -31,55 +37,112 @@ def strict_schema_template() -> Dict[str, Optional[Any]]:
     }
 
 
+_LEADING_NUMBER_RE = re.compile(r"^[^0-9-]*([0-9]+(?:\.[0-9]+)?)")
+_ISO_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+_STRICT_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_VAGUE_KEYWORDS = ("soon", "asap", "urgent", "next month", "next week", "whenever", "no rush", "sometime")
+_DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%Y/%m/%d", "%b %d %Y", "%B %d, %Y", "%d %b %Y")
+_URGENCY_VALUES = frozenset({"low", "medium", "high"})
+
+# Bounded memo size for string -> number / date conversions
+_MEMO_SIZE = 8192
+
+
 def _to_number(value) -> Optional[float]:
     if value is None:
         return None
     if isinstance(value, (int, float)):
         return float(value)
     if isinstance(value, str):
-        s = value.strip()
-        # remove commas
-        s2 = s.replace(",", "")
-        try:
-            return float(s2)
-        except ValueError:
-            # try extracting leading number
-            m = re.match(r"^[^0-9-]*([0-9]+(?:\.[0-9]+)?)", s2)
-            if m:
-                return float(m.group(1))
-            return None
+        return _str_to_number(value)
     return None
 
 
+@lru_cache(maxsize=_MEMO_SIZE)
+def _str_to_number(value: str) -> Optional[float]:
+    s = value.strip()
+    # remove commas
+    s2 = s.replace(",", "")
+    try:
+        return float(s2)
+    except ValueError:
+        # try extracting leading number
+        m = _LEADING_NUMBER_RE.match(s2)
+        if m:
+            return float(m.group(1))
+        return None
+
+
 def _to_iso_date_or_null(value) -> Optional[str]:
     if not value:
         return None
     if isinstance(value, str):
-        s = value.strip()
-        # Check common vague phrases that must be null
-        vague_keywords = ["soon", "asap", "urgent", "next month", "next week", "whenever", "no rush", "sometime"]
-        if any(k in s.lower() for k in vague_keywords):
-            return None
-        # Try parse with datetime for a few formats, prefer ISO
-        for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%Y/%m/%d", "%b %d %Y", "%B %d, %Y", "%d %b %Y"):
-            try:
-                dt = datetime.strptime(s, fmt)
-                return dt.date().isoformat()
-            except Exception:
-                pass
-        # Try ISO parsing
+        return _str_to_iso_date_or_null(value)
+    return None
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _str_to_iso_date_or_null(value: str) -> Optional[str]:
+    s = value.strip()
+    # Check common vague phrases that must be null
+    lowered = s.lower()
+    if any(k in lowered for k in _VAGUE_KEYWORDS):
+        return None
+    # Fast path for the common zero-padded ISO form: same result as strptime("%Y-%m-%d")
+    if len(s) == 10 and _STRICT_ISO_DATE_RE.fullmatch(s):
         try:
-            dt = datetime.fromisoformat(s)
+            return date(int(s[:4]), int(s[5:7]), int(s[8:])).isoformat()
+        except ValueError:
+            pass
+    # Try parse with datetime for a few formats, prefer ISO
+    for fmt in _DATE_FORMATS:
+        try:
+            dt = datetime.strptime(s, fmt)
             return dt.date().isoformat()
         except Exception:
             pass
-        # Try to extract a yyyy-mm-dd pattern
-        m = re.search(r"(\d{4}-\d{2}-\d{2})", s)
-        if m:
-            return m.group(1)
+    # Try ISO parsing
+    try:
+        dt = datetime.fromisoformat(s)
+        return dt.date().isoformat()
+    except Exception:
+        pass
+    # Try to extract a yyyy-mm-dd pattern
+    m = _ISO_DATE_RE.search(s)
+    if m:
+        return m.group(1)
     return None
 
 
+def _to_str_or_null(value) -> Optional[str]:
+    return value if isinstance(value, str) else (str(value) if value is not None else None)
+
+
+def _str_or_null(value) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def _to_urgency(value) -> Optional[str]:
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in _URGENCY_VALUES:
+            return lowered
+    return None
+
+
+# Per-field converters; the enforcement table below is generated from SCHEMA_KEYS once at import
+_FIELD_CONVERTERS = {
+    "material_name": _to_str_or_null,
+    "quantity": _to_number,
+    "unit": _to_str_or_null,
+    "project_name": _str_or_null,
+    "location": _str_or_null,
+    "urgency": _to_urgency,
+    "deadline": _to_iso_date_or_null,
+}
+_ENFORCERS = tuple((key, _FIELD_CONVERTERS[key]) for key in SCHEMA_KEYS)
+
+
 def enforce_schema(obj: Dict) -> Dict:
     """Return a new dict that strictly matches the schema.
 
@@ -89,29 +152,16 @@ def enforce_schema(obj: Dict) -> Dict:
     - Ensure urgency is in allowed set or set to 'low' if unknown
     - Ensure deadline is ISO date string or None
     """
-    out = strict_schema_template()
-
-    # material_name
-    out["material_name"] = obj.get("material_name") if isinstance(obj.get("material_name"), str) else (str(obj.get("material_name")) if obj.get("material_name") is not None else None)
-
-    # quantity
-    out["quantity"] = _to_number(obj.get("quantity"))
-
-    # unit
-    out["unit"] = obj.get("unit") if isinstance(obj.get("unit"), str) else (str(obj.get("unit")) if obj.get("unit") is not None else None)
+    get = obj.get
+    return {key: convert(get(key)) for key, convert in _ENFORCERS}
 
-    # project_name & location
-    out["project_name"] = obj.get("project_name") if isinstance(obj.get("project_name"), str) else None
-    out["location"] = obj.get("location") if isinstance(obj.get("location"), str) else None
 
-    # urgency deterministic enforcement
-    urgency = obj.get("urgency")
-    if isinstance(urgency, str) and urgency.lower() in {"low", "medium", "high"}:
-        out["urgency"] = urgency.lower()
-    else:
-        out["urgency"] = None
+def enforce_schema_many(objs: Iterable[Dict]) -> List[Dict]:
+    """Batch enforce_schema: one pass over many objects with identical output."""
+    enforcers = _ENFORCERS
+    return [{key: convert(obj.get(key)) for key, convert in enforcers} for obj in objs]
 
-    # deadline
-    out["deadline"] = _to_iso_date_or_null(obj.get("deadline"))
 
-    return out
\ No newline at end of file
+def enforce_schema_columns(objs: Sequence[Dict]) -> Dict[str, List]:
+    """Column-wise enforce_schema: {key: [value per object]} in SCHEMA_KEYS order."""
+    return {key: [convert(obj.get(key)) for obj in objs] for key, convert in _ENFORCERS}
@@ -0,0 +1,261 @@
+"""Long-running extraction service (asyncio HTTP/1.1, standard library only).
+
+Endpoints:
+- POST /extract with a JSON body {"line": "..."} -> {"records": [...]}
+- POST /extract with Content-Type application/x-ndjson, one {"line": "..."}
+  per body line -> NDJSON, one {"records": [...]} per input line, in order
+- GET /health -> {"status": "ok", ...counters} (plus per-tier cascade stats
+  when a cascade is configured)
+
+Request bodies larger than max_body bytes are answered with 413 without
+being read, and the connection is closed.
+
+Lines from concurrent requests that arrive within batch_window seconds of
+each other are coalesced by MicroBatcher into one runner.extract_lines call
+(one batched prompt for up to batch_size lines). Extraction runs on a thread
+pool through the shared LLM client, so HTTP connections to the LLM stay warm
+between requests. Records are produced by the same runner code as the CLI.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import threading
+
+from .cache import ResponseCache
+from .cascade import get_cascade
+from .rules import RuleExtractor
+from .runner import extract_lines
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+DEFAULT_MAX_BODY = 10 * 1024 * 1024
+
+
+class MicroBatcher:
+    """Coalesce lines submitted within `window` seconds into one chunk call.
+
+    fn(lines) must return one record list per line. A batch is flushed when
+    it reaches max_batch lines or when the window after its first line ends.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, fn: Callable[[List[str]], List[List[dict]]], max_batch: int = 8, window: float = 0.005, executor: Optional[ThreadPoolExecutor] = None):
+        self.fn = fn
+        self.max_batch = max(1, max_batch)
+        self.window = window
+        self.executor = executor
+        self.batches = 0
+        self.lines = 0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, line: str) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((line, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if not items:
+            return
+        self.batches += 1
+        self.lines += len(items)
+        done = asyncio.get_running_loop().run_in_executor(self.executor, self.fn, [line for line, _ in items])
+        done.add_done_callback(partial(_resolve, [fut for _, fut in items]))
+
+
+def _resolve(futures: List[asyncio.Future], done: asyncio.Future):
+    exc = done.exception()
+    results = done.result() if exc is None else [None] * len(futures)
+    for fut, records in zip(futures, results):
+        if fut.done():
+            continue
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(records)
+
+
+class ExtractionService:
+    """HTTP front end over MicroBatcher; see the module docstring for the API.
+
+    Use serve_forever() to run in the current thread, or start()/stop() (or a
+    with-block) to run on a background thread, e.g. in tests.
+    """
+
+    def __init__(
+        self,
+        model: str = "llama3-70b-8192",
+        concurrency: int = 4,
+        batch_size: int = 8,
+        batch_window: float = 0.005,
+        cache: Optional[ResponseCache] = None,
+        rules: Optional[RuleExtractor] = None,
+        stream: bool = False,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        max_body: int = DEFAULT_MAX_BODY,
+    ):
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.requests = 0
+        self.executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        fn = partial(extract_lines, model=model, cache=cache, rules=rules, stream=stream)
+        self.batcher = MicroBatcher(fn, max_batch=batch_size, window=batch_window, executor=self.executor)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _start_server(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _close(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    def serve_forever(self):
+        async def run():
+            await self._start_server()
+            async with self._server:
+                await self._server.serve_forever()
+
+        try:
+            asyncio.run(run())
+        finally:
+            self.executor.shutdown(wait=False)
+
+    def start(self) -> "ExtractionService":
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._start_server())
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self.executor.shutdown(wait=False)
+
+    def __enter__(self) -> "ExtractionService":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    raw = await reader.readline()
+                    if raw in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = raw.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = _content_length(headers)
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    status, ctype, payload = 411, "application/json", _error("chunked bodies are not supported")
+                    headers["connection"] = "close"
+                elif length is None:
+                    status, ctype, payload = 400, "application/json", _error("invalid Content-Length")
+                    headers["connection"] = "close"
+                elif length > self.max_body:
+                    # The body is never read, so the connection cannot be reused
+                    status, ctype, payload = 413, "application/json", _error(f"body larger than {self.max_body} bytes")
+                    headers["connection"] = "close"
+                else:
+                    body = await reader.readexactly(length)
+                    status, ctype, payload = await self._route(method, target.split("?", 1)[0], headers, body)
+                keep_alive = version.strip() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {ctype}\r\nContent-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _route(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        if path == "/health":
+            if method != "GET":
+                return 405, "application/json", _error("use GET")
+            stats = {"status": "ok", "requests": self.requests, "lines": self.batcher.lines, "batches": self.batcher.batches}
+            cascade = get_cascade()
+            if cascade is not None:
+                stats["cascade"] = cascade.stats()
+            return 200, "application/json", json.dumps(stats).encode("utf-8")
+        if path != "/extract":
+            return 404, "application/json", _error(f"unknown path {path}")
+        if method != "POST":
+            return 405, "application/json", _error("use POST")
+        self.requests += 1
+        ndjson = headers.get("content-type", "").split(";")[0].strip() == "application/x-ndjson"
+        try:
+            text = body.decode("utf-8")
+            lines = [_parse_item(raw) for raw in text.splitlines() if raw.strip()] if ndjson else [_parse_item(text)]
+        except ValueError as e:
+            return 400, "application/json", _error(str(e))
+        try:
+            results = await asyncio.gather(*(self.batcher.submit(line) for line in lines))
+        except Exception as e:  # extraction itself failed (e.g. missing API key)
+            return 500, "application/json", _error(f"{type(e).__name__}: {e}")
+        if ndjson:
+            payload = "".join(json.dumps({"records": recs}, ensure_ascii=False) + "\n" for recs in results)
+            return 200, "application/x-ndjson", payload.encode("utf-8")
+        return 200, "application/json", json.dumps({"records": results[0]}, ensure_ascii=False).encode("utf-8")
+
+
+def _content_length(headers: Dict[str, str]) -> Optional[int]:
+    """The request's Content-Length (0 when absent), or None when it is not a non-negative integer."""
+    value = headers.get("content-length", "")
+    if not value:
+        return 0
+    return int(value) if value.isascii() and value.isdigit() else None
+
+
+def _parse_item(raw: str) -> str:
+    """Return the stripped input line of one {"line": "..."} request item."""
+    try:
+        item = json.loads(raw)
+    except ValueError:
+        raise ValueError("body is not valid JSON")
+    line = item.get("line") if isinstance(item, dict) else None
+    if not isinstance(line, str) or not line.strip():
+        raise ValueError('expected {"line": "<non-empty text>"}')
+    return line.strip()
+
+
+def _error(message: str) -> bytes:
+    return json.dumps({"error": message}).encode("utf-8")
@@ -0,0 +1,152 @@
+"""Sharded execution: byte-offset line index, shard files and merge.
+
+- LineIndex: start offsets of the non-empty input lines, built over a
+  memory-mapped file so the input is never loaded whole. Line numbers match
+  load_inputs / iter_inputs (blank lines are not counted).
+- shard_range / parse_shard: shard i of N (0-based) is a contiguous slice of
+  the line numbers.
+- write_shard: a shard file is NDJSON. The first line is a header
+  {"shard": i, "shards": n, "start": a, "stop": b, "total": t}, and each
+  following line is {"line": k, "records": [...]} with k the global line
+  number.
+- merge_shards: k-way merges shard files back into input order. It checks that
+  the shards cover every line exactly once.
+"""
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple
+import heapq
+import json
+import mmap
+import re
+
+# A line with at least one non-space byte, matched from its first byte
+_LINE_RE = re.compile(rb"[^\S\n]*\S[^\n]*")
+
+
+class LineIndex:
+    """Byte offsets of the non-empty lines of a file, for random access by line number."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets = array("Q")
+        with open(path, "rb") as f:
+            mm = _map(f)
+            if mm is None:
+                return
+            with mm:
+                for m in _LINE_RE.finditer(mm):
+                    # str.strip() also drops non-ASCII whitespace; keep line numbers identical
+                    if not m.group().isascii() and not m.group().decode("utf-8", "replace").strip():
+                        continue
+                    self.offsets.append(m.start())
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def iter_lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Yield stripped lines start..stop-1, reading only their bytes."""
+        stop = len(self.offsets) if stop is None else min(stop, len(self.offsets))
+        if start >= stop:
+            return
+        with open(self.path, "rb") as f:
+            mm = _map(f)
+            with mm:
+                for k in range(start, stop):
+                    begin = self.offsets[k]
+                    end = mm.find(b"\n", begin)
+                    yield mm[begin:end if end != -1 else len(mm)].decode("utf-8").strip()
+
+
+def _map(f) -> Optional[mmap.mmap]:
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file
+        return None
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse "i/N" (0 <= i < N)."""
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"invalid shard {spec!r}, expected i/N")
+    if n < 1 or not 0 <= i < n:
+        raise ValueError(f"invalid shard {spec!r}, need 0 <= i < N")
+    return i, n
+
+
+def shard_range(total: int, i: int, n: int) -> Tuple[int, int]:
+    """Line numbers [start, stop) of shard i of n; sizes differ by at most one."""
+    return i * total // n, (i + 1) * total // n
+
+
+def write_shard(path: str, line_results: Iterable[List[dict]], i: int, n: int, start: int, stop: int, total: int) -> int:
+    """Write a shard file, one entry per line result, flushing as they arrive.
+
+    line_results must yield one record list per line, for lines start..stop-1
+    in order. Returns the number of lines written.
+    """
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"shard": i, "shards": n, "start": start, "stop": stop, "total": total}) + "\n")
+        for k, records in enumerate(line_results, start):
+            f.write(json.dumps({"line": k, "records": records}, ensure_ascii=False) + "\n")
+            f.flush()
+            written += 1
+    return written
+
+
+def _read_header(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            header = None
+    if not isinstance(header, dict) or "shard" not in header:
+        raise ValueError(f"{path}: not a shard file")
+    return header
+
+
+def _iter_entries(path: str) -> Iterator[Tuple[int, List[dict]]]:
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        for raw in f:
+            if not raw.endswith("\n"):
+                break  # torn last entry: reported as a missing line below
+            entry = json.loads(raw)
+            yield entry["line"], entry["records"]
+
+
+def merge_shards(paths: List[str]) -> Iterator[dict]:
+    """Yield the records of all shard files in original line order.
+
+    Shard headers are checked up front: ValueError if the shards disagree on
+    the input size, overlap or leave a gap. Lines missing from a shard (e.g.
+    an unfinished run) raise ValueError while iterating.
+    """
+    headers = [(_read_header(p), p) for p in paths]
+    headers.sort(key=lambda hp: hp[0]["start"])
+    totals = {h["total"] for h, _ in headers}
+    if len(totals) > 1:
+        raise ValueError(f"shards come from different inputs (line totals {sorted(totals)})")
+    total = totals.pop() if totals else 0
+    expected = 0
+    for h, p in headers:
+        if h["start"] != expected:
+            kind = "overlap" if h["start"] < expected else "gap"
+            raise ValueError(f"shard {p}: {kind} at line {min(expected, h['start'])}")
+        expected = h["stop"]
+    if expected != total:
+        raise ValueError(f"shards cover {expected} of {total} lines")
+    return _merged([p for _, p in headers], total)
+
+
+def _merged(paths: List[str], total: int) -> Iterator[dict]:
+    expected = 0
+    for k, records in heapq.merge(*(_iter_entries(p) for p in paths), key=lambda e: e[0]):
+        if k != expected:
+            raise ValueError(f"line {expected} missing from shards" if k > expected else f"line {k} appears twice")
+        yield from records
+        expected += 1
+    if expected != total:
+        raise ValueError(f"line {expected} missing from shards")
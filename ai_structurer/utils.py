@@ -1,10 +1,11 @@
 """Utilities: input loading, local JSON repair, urgency inference, processing pipeline."""
-from typing import List, Dict, Any, Optional
-import json
-import re
+from typing import Iterator, List, Dict, Any, Optional
+import sys
+import time
 from datetime import datetime, timedelta
 
 from .schema import enforce_schema, strict_schema_template
+from .jsonrepair import extract_json
 
 
 def load_inputs(path: str) -> List[str]:
@@ -14,48 +15,56 @@ def load_inputs(path: str) -> List[str]:
     return lines
 
 
+def iter_inputs(path: str, follow: bool = False, poll_interval: float = 0.5, idle_timeout: Optional[float] = None) -> Iterator[str]:
+    """Lazily yield non-empty stripped lines from a file, or stdin when path is "-".
+
+    With follow=True the file is tailed like `tail -f`: after reaching EOF we
+    keep polling for appended lines every poll_interval seconds, and stop once
+    nothing new has arrived for idle_timeout seconds (None = follow forever).
+    A trailing partial line is held back until its newline is written.
+    """
+    if path == "-":
+        for line in sys.stdin:
+            if line.strip():
+                yield line.strip()
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        pending = ""
+        idle_since = time.monotonic()
+        while True:
+            line = f.readline()
+            if line:
+                pending += line
+                if not pending.endswith("\n") and follow:
+                    continue
+                if pending.strip():
+                    yield pending.strip()
+                pending = ""
+                idle_since = time.monotonic()
+                continue
+            if not follow:
+                break
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                break
+            time.sleep(poll_interval)
+        if pending.strip():
+            yield pending.strip()
+
+
 def attempt_local_json_repair(text: str) -> Optional[Any]:
     """Try to repair common malformed JSON issues and return parsed Python object or None.
 
-    Repairs attempted:
-    - Extract first JSON array or object substring
-    - Replace single quotes with double quotes (careful)
+    Repairs attempted (single pass, see jsonrepair):
+    - Find every balanced JSON array/object in surrounding text, string-aware
+    - Replace single-quoted strings with double-quoted ones, token by token
     - Remove trailing commas
-    - Wrap top-level object in array if single object returned
+    - Recover the complete objects of a broken or truncated array
+    - Wrap top-level object(s) in array
     """
     if not text or not text.strip():
         return None
-
-    s = text.strip()
-
-    # If there's surrounding text, try extract first { ... } or [ ... ] block
-    m = re.search(r"(\[.*\]|\{.*\})", s, flags=re.DOTALL)
-    if m:
-        s = m.group(1)
-
-    # Replace trailing commas before closing braces/brackets
-    s = re.sub(r",\s*([}\]])", r"\1", s)
-
-    # Replace single quotes with double quotes when safe-ish (not perfect)
-    if "'" in s and '"' not in s:
-        s = s.replace("'", '"')
-
-    # Remove non-JSON leading/trailing garbage
-    s = s.strip()
-
-    try:
-        parsed = json.loads(s)
-    except Exception:
-        # Try wrapping object into array
-        try:
-            parsed2 = json.loads("[" + s + "]")
-            return parsed2
-        except Exception:
-            return None
-    # If parsed is single object, wrap into list
-    if isinstance(parsed, dict):
-        return [parsed]
-    return parsed
+    return extract_json(text)
 
 
 def ensure_array_of_objects(obj: Any) -> List[Dict[str, Any]]:
@@ -67,12 +76,26 @@ def ensure_array_of_objects(obj: Any) -> List[Dict[str, Any]]:
     return []
 
 
-def infer_urgency_from_deadline(deadline_iso: Optional[str]) -> Optional[str]:
+def urgency_for_days(delta: int) -> Optional[str]:
+    """Urgency bucket for a deadline delta whole days from now (see infer_urgency_from_deadline)."""
+    if delta <= 7:
+        return "high"
+    if 7 < delta <= 30:
+        return "medium"
+    if delta > 30:
+        return "low"
+    return None
+
+
+def infer_urgency_from_deadline(deadline_iso: Optional[str], now: Optional[datetime] = None) -> Optional[str]:
     """Deterministic urgency inference based on deadline date only.
 
     - high → <= 7 days
     - medium → 7–30 days
     - low → >30 days or None
+
+    Days are counted from now (default: datetime.now()); pass one reference
+    time to keep a whole batch consistent.
     """
     if not deadline_iso:
         return None
@@ -83,25 +106,19 @@ def infer_urgency_from_deadline(deadline_iso: Optional[str]) -> Optional[str]:
             dt = datetime.strptime(deadline_iso, "%Y-%m-%d")
         except Exception:
             return None
-    today = datetime.now()
-    delta = (dt - today).days
-    if delta <= 7:
-        return "high"
-    if 7 < delta <= 30:
-        return "medium"
-    if delta > 30:
-        return "low"
-    return None
+    today = now if now is not None else datetime.now()
+    return urgency_for_days((dt - today).days)
 
 
-def process_record(raw_obj: Dict[str, Any]) -> Dict[str, Any]:
+def process_record(raw_obj: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
     """Enforce schema and deterministically infer urgency if missing.
 
     Returns an object that strictly matches the schema (no extra keys).
+    columnar.process_records is the batch form.
     """
     enforced = enforce_schema(raw_obj)
     # If urgency missing/null, infer from deadline
     if not enforced.get("urgency"):
-        inferred = infer_urgency_from_deadline(enforced.get("deadline"))
+        inferred = infer_urgency_from_deadline(enforced.get("deadline"), now)
         enforced["urgency"] = inferred or "low"
     return enforced
@@ -0,0 +1,153 @@
+"""Persistent warm worker for repeated CLI runs.
+
+`python -m ai_structurer.cli worker --socket PATH` starts a long-lived
+process that has already imported the pipeline (and `requests`). A CLI run
+given `--worker-socket PATH` (or AI_STRUCTURER_WORKER_SOCKET) sends its
+argv, working directory and AI_STRUCTURER_* environment over the Unix socket
+instead of running locally; the worker runs cli.main in-process, relays
+stdout/stderr back and returns the exit code. Because the worker keeps the
+shared LLM client between jobs, repeated runs with the same client settings
+reuse its open connections.
+
+Jobs run one at a time (the CLI configures process-wide state); further
+clients wait in the listen backlog. If the socket is not reachable, or the
+input is stdin, the CLI simply runs locally.
+
+Protocol: one JSON line {"argv", "cwd", "env"} from the client, then JSON
+lines {"stream": "stdout"|"stderr", "data"} and a final {"exit": code}.
+"""
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, Dict, List, Optional
+import json
+import os
+import socket
+import sys
+import threading
+import traceback
+
+ENV_PREFIX = "AI_STRUCTURER_"
+_SOCKET_ENV = "AI_STRUCTURER_WORKER_SOCKET"
+
+
+def forward(socket_path: str, argv: List[str]) -> Optional[int]:
+    """Run argv in the worker; returns its exit code, or None if it is not reachable."""
+    if _uses_stdin(argv):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    env = {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX) and k != _SOCKET_ENV}
+    with sock, sock.makefile("rwb") as f:
+        f.write(json.dumps({"argv": argv, "cwd": os.getcwd(), "env": env}).encode("utf-8") + b"\n")
+        f.flush()
+        for raw in f:
+            msg = json.loads(raw)
+            if "exit" in msg:
+                return msg["exit"]
+            out = sys.stdout if msg.get("stream") == "stdout" else sys.stderr
+            out.write(msg.get("data", ""))
+            out.flush()
+    print("ai_structurer: lost connection to worker", file=sys.stderr)
+    return 1
+
+
+def _uses_stdin(argv: List[str]) -> bool:
+    return any(a in ("-i", "--input") and b == "-" for a, b in zip(argv, argv[1:])) or "--input=-" in argv
+
+
+class _Relay:
+    """File-like object that forwards writes to the client as stream messages."""
+
+    def __init__(self, stream: str, send: Callable[[Dict], None]):
+        self.stream = stream
+        self.send = send
+
+    def write(self, data: str) -> int:
+        if data:
+            self.send({"stream": self.stream, "data": data})
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def run_job(request: Dict, send: Callable[[Dict], None]) -> int:
+    """Run one forwarded CLI invocation in this process and return its exit code."""
+    from . import cli
+
+    saved_cwd = os.getcwd()
+    saved_env = {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+    code = 0
+    try:
+        os.chdir(request["cwd"])
+        for k in saved_env:
+            del os.environ[k]
+        os.environ.update(request.get("env", {}))
+        err = _Relay("stderr", send)
+        with redirect_stdout(_Relay("stdout", send)), redirect_stderr(err):
+            try:
+                cli.main(list(request["argv"]))
+            except SystemExit as e:
+                if isinstance(e.code, int) or e.code is None:
+                    code = e.code or 0
+                else:
+                    print(e.code, file=err)
+                    code = 1
+            except Exception:
+                traceback.print_exc(file=err)
+                code = 1
+    finally:
+        os.chdir(saved_cwd)
+        for k in [k for k in os.environ if k.startswith(ENV_PREFIX)]:
+            del os.environ[k]
+        os.environ.update(saved_env)
+    return code
+
+
+def serve_worker(socket_path: str, idle_timeout: Optional[float] = None, ready: Optional[threading.Event] = None):
+    """Accept and run jobs until idle_timeout seconds pass without one (None = forever)."""
+    # Warm up: everything a run needs is imported before the first job arrives
+    import requests  # noqa: F401
+    from . import cli, runner, service  # noqa: F401
+
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)  # stale socket from a dead worker
+        else:
+            raise RuntimeError(f"a worker is already listening on {socket_path}")
+        finally:
+            probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    server.settimeout(idle_timeout)
+    if ready is not None:
+        ready.set()
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                return
+            conn.settimeout(None)
+            with conn, conn.makefile("rwb") as f:
+                try:
+                    request = json.loads(f.readline())
+
+                    def send(msg: Dict):
+                        f.write(json.dumps(msg).encode("utf-8") + b"\n")
+                        f.flush()
+
+                    send({"exit": run_job(request, send)})
+                except (OSError, ValueError, KeyError):
+                    continue  # client went away or sent garbage; wait for the next one
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,162 @@
+"""Pluggable output writers.
+
+Every format is a function turning records (dicts or records.Record) into
+text pieces; write_records buffers those pieces into chunks of about
+_CHUNK_CHARS before writing, or writes and flushes each piece when streaming.
+
+- json: pretty JSON array, byte-identical to json.dumps(records, indent=2)
+- json-compact: JSON array on one line
+- ndjson: one compact JSON object per line
+- csv: header row of SCHEMA_KEYS, then one row per record (null -> empty)
+- columnar: one JSON object of arrays, {"material_name": [...], ...}; the
+  columns are collected first, so nothing is written until the input ends
+
+The compact formats use orjson when it is installed. Its output parses to
+the same values as the stdlib fallback, though large floats are spelled
+differently (1e20 vs 1e+20) and NaN is written as null. Register more
+formats with register_writer.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, TextIO
+import csv
+import io
+import json
+import math
+from json.encoder import encode_basestring as _encode_str
+
+from .records import as_dict, as_row
+from .schema import SCHEMA_KEYS
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+_CHUNK_CHARS = 1 << 20
+
+
+def dumps_compact(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _encode_scalar(value: Any) -> str:
+    if isinstance(value, str):
+        return _encode_str(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, float) and math.isfinite(value):
+        return float.__repr__(value)
+    return json.dumps(value)
+
+
+def _pretty_record(rec: Dict[str, Any]) -> str:
+    """json.dumps(rec, ensure_ascii=False, indent=2) nested one level deep.
+
+    Records are flat, so the text is assembled directly instead of going
+    through the pure-Python indenting encoder.
+    """
+    if not rec:
+        return "{}"
+    if not all(isinstance(k, str) and _is_scalar(v) for k, v in rec.items()):
+        return json.dumps(rec, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+    items = [f"{_encode_str(k)}: {_encode_scalar(v)}" for k, v in rec.items()]
+    return "{\n    " + ",\n    ".join(items) + "\n  }"
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float))
+
+
+def _json_pieces(records: Iterable) -> Iterator[str]:
+    n = 0
+    for rec in records:
+        yield ("[\n  " if n == 0 else ",\n  ") + _pretty_record(as_dict(rec))
+        n += 1
+    yield "\n]" if n else "[]"
+
+
+def _json_compact_pieces(records: Iterable) -> Iterator[str]:
+    n = 0
+    for rec in records:
+        yield ("[" if n == 0 else ",") + dumps_compact(as_dict(rec))
+        n += 1
+    yield "]" if n else "[]"
+
+
+def _ndjson_pieces(records: Iterable) -> Iterator[str]:
+    for rec in records:
+        yield dumps_compact(as_dict(rec)) + "\n"
+
+
+def _csv_pieces(records: Iterable) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(SCHEMA_KEYS)
+    yield buf.getvalue()
+    for rec in records:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow(["" if v is None else v for v in as_row(rec)])
+        yield buf.getvalue()
+
+
+def _columnar_pieces(records: Iterable) -> Iterator[str]:
+    columns = [[] for _ in SCHEMA_KEYS]
+    for rec in records:
+        for column, value in zip(columns, as_row(rec)):
+            column.append(value)
+    sep = "{"
+    for key, column in zip(SCHEMA_KEYS, columns):
+        yield f"{sep}{json.dumps(key)}:{dumps_compact(column)}"
+        sep = ","
+    yield "}"
+
+
+WRITERS: Dict[str, Callable[[Iterable], Iterator[str]]] = {
+    "json": _json_pieces,
+    "json-compact": _json_compact_pieces,
+    "ndjson": _ndjson_pieces,
+    "csv": _csv_pieces,
+    "columnar": _columnar_pieces,
+}
+
+
+def register_writer(name: str, pieces: Callable[[Iterable], Iterator[str]]):
+    WRITERS[name] = pieces
+
+
+def write_records(records: Iterable, f: TextIO, fmt: str = "json", flush_each: bool = False) -> int:
+    """Write records to f in fmt. Returns the number of records written.
+
+    flush_each=True writes and flushes every piece as it is produced (for
+    streaming output); otherwise pieces are joined into ~1 MB chunks.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown output format: {fmt}")
+    count = [0]
+
+    def counted():
+        for rec in records:
+            count[0] += 1
+            yield rec
+
+    buf, size = [], 0
+    for piece in WRITERS[fmt](counted()):
+        if flush_each:
+            f.write(piece)
+            f.flush()
+            continue
+        buf.append(piece)
+        size += len(piece)
+        if size >= _CHUNK_CHARS:
+            f.write("".join(buf))
+            buf, size = [], 0
+    if buf:
+        f.write("".join(buf))
+    f.flush()
+    return count[0]
@@ -0,0 +1,68 @@
+"""Microbenchmark: per-record process_record vs columnar.process_records.
+
+Run: python benchmarks/bench_columnar.py [--n 1000000] [--distinct-deadlines 400]
+
+The corpus looks like cached LLM extractions: most records lack urgency
+and carry a deadline within a few months of today. Every path uses the
+same reference time and must produce identical records.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_structurer.columnar import process_records  # noqa: E402
+from ai_structurer.utils import process_record  # noqa: E402
+
+
+def make_corpus(n, distinct_deadlines, now, seed=0):
+    rnd = random.Random(seed)
+    deadlines = [(now + timedelta(days=rnd.randint(-30, 120))).date().isoformat() for _ in range(distinct_deadlines)]
+    deadlines += [None, "2026-02-30", "next month"]
+    return [
+        {
+            "material_name": rnd.choice(["Screws", "Cement", "Paint"]),
+            "quantity": rnd.choice([20, "1,200", 5.5]),
+            "unit": rnd.choice(["boxes", "kg", "liters"]),
+            "project_name": rnd.choice(["Phoenix", None]),
+            "location": rnd.choice(["Warehouse 12", None]),
+            "urgency": rnd.choice([None, None, None, "high", "Low"]),
+            "deadline": rnd.choice(deadlines),
+        }
+        for _ in range(n)
+    ]
+
+
+def _time(fn, corpus):
+    start = time.perf_counter()
+    out = fn(corpus)
+    return time.perf_counter() - start, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--distinct-deadlines", type=int, default=400)
+    args = ap.parse_args()
+    now = datetime.now()
+    corpus = make_corpus(args.n, args.distinct_deadlines, now)
+
+    runs = [("process_record", lambda c: [process_record(o, now) for o in c])]
+    runs.append(("process_records", lambda c: process_records(c, now)))
+
+    print(f"records: {args.n}, distinct deadlines: {args.distinct_deadlines}")
+    base_s = reference = None
+    for name, fn in runs:
+        secs, out = _time(fn, corpus)
+        if reference is None:
+            base_s, reference = secs, out
+        assert out == reference, f"{name} diverges from process_record"
+        print(f"{name:26s} {secs:8.3f}s  {args.n / secs:12,.0f} rec/s  x{base_s / secs:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark: single-pass JSON scanner vs the original greedy-regex repair.
+
+Run: python benchmarks/bench_json_repair.py [--size 20000]
+
+The corpus holds large, adversarial model responses: chatty prose with many
+stray brackets, unclosed brackets, truncated arrays and JSON buried between
+prose. The legacy function is a verbatim copy of the pre-scanner repair.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_structurer.utils import attempt_local_json_repair  # noqa: E402
+
+
+def legacy_attempt_local_json_repair(text):
+    if not text or not text.strip():
+        return None
+    s = text.strip()
+    m = re.search(r"(\[.*\]|\{.*\})", s, flags=re.DOTALL)
+    if m:
+        s = m.group(1)
+    s = re.sub(r",\s*([}\]])", r"\1", s)
+    if "'" in s and '"' not in s:
+        s = s.replace("'", '"')
+    s = s.strip()
+    try:
+        parsed = json.loads(s)
+    except Exception:
+        try:
+            return json.loads("[" + s + "]")
+        except Exception:
+            return None
+    if isinstance(parsed, dict):
+        return [parsed]
+    return parsed
+
+
+RECORD = '{"material_name": "Screws", "quantity": 20, "unit": "boxes", "project_name": null, "location": "Warehouse 12", "urgency": "low", "deadline": "2026-01-15"}'
+
+
+def make_corpus(size):
+    records = ", ".join([RECORD] * max(1, size // 160))
+    prose = "The model [thinks] about (this) {carefully} and notes [1], [2] along the way. " * max(1, size // 80)
+    return {
+        "clean array": "[" + records + "]",
+        "prose around array": prose + "[" + records + "]" + prose,
+        "stray brackets after array": "[" + records + "] " + prose,
+        "unclosed brackets": "[" * size + " no json here",
+        "truncated array": "[" + records + ", " + RECORD[:40],
+        "single quotes + trailing commas": "[" + ", ".join([RECORD.replace('"', "'")[:-1] + ", }"] * max(1, size // 160)) + ",]",
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=20_000, help="approximate characters per response")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'case':34s} {'legacy':>10s} {'scanner':>10s} {'speedup':>8s}  legacy/scanner records")
+    for name, text in make_corpus(args.size).items():
+        timings = []
+        results = []
+        for fn in (legacy_attempt_local_json_repair, attempt_local_json_repair):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                out = fn(text)
+            timings.append((time.perf_counter() - start) / args.repeat)
+            results.append(len([x for x in out if isinstance(x, dict)]) if isinstance(out, list) else 0)
+        print(f"{name:34s} {timings[0] * 1000:9.2f}ms {timings[1] * 1000:9.2f}ms {timings[0] / timings[1]:7.1f}x  {results[0]}/{results[1]}")
+
+
+if __name__ == "__main__":
+    main()
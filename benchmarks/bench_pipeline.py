@@ -0,0 +1,242 @@
+"""End-to-end throughput benchmark against the local stub Groq endpoint.
+
+Run: python benchmarks/bench_pipeline.py --lines 1000 10000 --concurrency 16
+
+For each input size a synthetic input file is generated and
+runner.process_all_inputs is driven over real HTTP against
+benchmarks/stub_llm.py. The report covers:
+
+- lines/sec
+- p50/p95/p99 per-line latency
+- peak RSS
+- LLM calls per line
+- hedged requests and lines that hit --line-deadline (with --hedge / --line-deadline)
+- with --cascade-model, the share of lines the fast model answered and p50/p95
+  per tier; the stub serves that model with the --fast-* settings
+
+--save-baseline writes the report as JSON. --compare loads a saved baseline,
+prints deltas, and exits non-zero when lines/sec drops by more than
+--tolerance.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_structurer import runner  # noqa: E402
+from ai_structurer.llm import configure_default_client  # noqa: E402
+from ai_structurer import metrics  # noqa: E402
+from ai_structurer.cascade import configure_cascade, get_cascade  # noqa: E402
+from ai_structurer.prompts import configure_prompts  # noqa: E402
+from ai_structurer.retry import configure_retries  # noqa: E402
+from ai_structurer.rules import RuleExtractor  # noqa: E402
+from stub_llm import StubConfig, StubLLMServer  # noqa: E402
+
+_TEMPLATES = [
+    "Need {q} boxes of screws for Project {p}, deliver to Warehouse {w} by 2026-0{m}-1{d}",
+    "Order {q} packs of 10x10 tiles for renovation, ASAP",
+    "We need {q} kg cement at Site {s}, deadline next month",
+    "Can you get {q} PCs and {q2} monitors for the new office? Budget pending",
+    "Supply {q} liters of paint for Project {p}; delivery 2026-1{d}-0{m}, urgent",
+    "Hey team, following up on yesterday's call: please arrange {q} bags of sand and {q2} rolls of wire at Yard {s} when possible, thanks!",
+]
+
+
+def make_input(path: str, n: int, seed: int = 0):
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(n):
+            f.write(
+                rnd.choice(_TEMPLATES).format(
+                    q=rnd.randint(1, 500),
+                    q2=rnd.randint(1, 50),
+                    p=rnd.choice(["Phoenix", "Aurora", "Atlas", "Nova"]),
+                    w=rnd.randint(1, 40),
+                    s=rnd.choice("ABCDEFG"),
+                    m=rnd.randint(1, 9),
+                    d=rnd.randint(0, 2),
+                )
+                + "\n"
+            )
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(q / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def run_scenario(n_lines: int, args) -> dict:
+    cfg = StubConfig(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        malformed_rate=args.malformed_rate,
+        records_per_response=args.records,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    if args.cascade_model:
+        cfg.models[args.cascade_model] = StubConfig(
+            latency=args.fast_latency,
+            rate_429=args.rate_429,
+            rate_5xx=args.rate_5xx,
+            malformed_rate=args.fast_malformed_rate,
+            incomplete_rate=args.fast_incomplete_rate,
+            records_per_response=args.records,
+            retry_after=args.retry_after,
+            seed=args.seed + 1,
+        )
+    latencies = []
+    original_chunk = runner._process_chunk
+
+    def timed_chunk(chunk, *a, **kw):
+        start = time.perf_counter()
+        out = original_chunk(chunk, *a, **kw)
+        elapsed = time.perf_counter() - start
+        latencies.extend([elapsed] * len(chunk))
+        return out
+
+    with StubLLMServer(cfg) as server, tempfile.TemporaryDirectory() as tmp:
+        inp = os.path.join(tmp, "input.txt")
+        make_input(inp, n_lines, seed=args.seed)
+        configure_default_client(
+            api_url=server.url,
+            api_key="bench",
+            pool_size=max(10, args.concurrency),
+            max_retries=args.max_retries,
+            backoff_base=0.01,
+            backoff_max=0.5,
+        )
+        configure_prompts(style=args.prompt_style, adaptive=not args.fixed_max_tokens)
+        configure_cascade(args.cascade_model)
+        configure_retries(max_attempts=args.max_attempts, deadline=args.line_deadline, hedge=args.hedge or args.hedge_after is not None, hedge_after=args.hedge_after, concurrency=args.concurrency)
+        registry = metrics.enable()
+        os.environ["AI_STRUCTURER_USE_MOCK"] = "0"
+        runner._process_chunk = timed_chunk
+        rules = RuleExtractor() if args.fast_path else None
+        try:
+            start = time.perf_counter()
+            records = runner.process_all_inputs(
+                inp,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                rules=rules,
+                stream=args.stream_completions,
+            )
+            wall = time.perf_counter() - start
+        finally:
+            runner._process_chunk = original_chunk
+            metrics.disable()
+
+    latencies.sort()
+    fallbacks = sum(1 for r in records if r["material_name"] is None)
+    cascade = get_cascade()
+    configure_cascade(None)
+    return {
+        "lines": n_lines,
+        "records": len(records),
+        "wall_s": round(wall, 3),
+        "lines_per_s": round(n_lines / wall, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),
+        "llm_calls_per_line": round(cfg.requests / n_lines, 3),
+        "prompt_tokens_per_line": round(registry.counters.get("llm_prompt_tokens", 0) / n_lines, 1),
+        "completion_tokens_per_line": round(registry.counters.get("llm_completion_tokens", 0) / n_lines, 1),
+        "max_tokens_per_line": round(cfg.max_tokens_requested / n_lines, 1),
+        "fallback_records": fallbacks,
+        "hedged_requests": int(registry.counters.get("hedged_requests", 0)),
+        "hedge_wins": int(registry.counters.get("hedge_wins", 0)),
+        "deadline_exceeded": int(registry.counters.get("retry_deadline_exceeded", 0)),
+        "statuses": {str(k): v for k, v in sorted(cfg.statuses.items())},
+        "requests_by_model": dict(cfg.requests_by_model),
+        "cascade": cascade.stats() if cascade is not None else None,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    ok = True
+    base_by_lines = {r["lines"]: r for r in baseline["results"]}
+    for r in report["results"]:
+        b = base_by_lines.get(r["lines"])
+        if b is None:
+            continue
+        change = (r["lines_per_s"] - b["lines_per_s"]) / b["lines_per_s"]
+        p99 = (r["p99_ms"] - b["p99_ms"]) / b["p99_ms"] if b["p99_ms"] else 0.0
+        flag = "REGRESSION" if change < -tolerance else "ok"
+        ok = ok and flag == "ok"
+        print(f"{r['lines']:>7} lines: lines/s {change:+.1%}  p99 {p99:+.1%}  calls/line {r['llm_calls_per_line'] - b['llm_calls_per_line']:+.3f}  {flag}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, nargs="+", default=[1000])
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--batch-size", type=int, default=1)
+    ap.add_argument("--stream-completions", action="store_true")
+    ap.add_argument("--fast-path", action="store_true")
+    ap.add_argument("--prompt-style", choices=["compact", "full"], default="compact")
+    ap.add_argument("--fixed-max-tokens", action="store_true", help="request 2048 tokens per call like before adaptive budgets")
+    ap.add_argument("--latency", default="lognormal:-3.5,0.5", help="stub latency spec (see stub_llm.parse_latency)")
+    ap.add_argument("--rate-429", type=float, default=0.02)
+    ap.add_argument("--rate-5xx", type=float, default=0.01)
+    ap.add_argument("--malformed-rate", type=float, default=0.05)
+    ap.add_argument("--records", type=int, default=1, help="records per stub response")
+    ap.add_argument("--retry-after", type=float, default=None)
+    ap.add_argument("--max-retries", type=int, default=3)
+    ap.add_argument("--max-attempts", type=int, default=2, help="LLM attempts per line (first prompt + corrections)")
+    ap.add_argument("--line-deadline", type=float, default=None, help="per-line deadline in seconds")
+    ap.add_argument("--hedge", action="store_true", help="hedge attempts slower than the observed p95")
+    ap.add_argument("--hedge-after", type=float, default=None, help="hedge after a fixed delay (implies --hedge)")
+    ap.add_argument("--cascade-model", default=None, help="fast model tried first (stubbed with the --fast-* settings)")
+    ap.add_argument("--fast-latency", default="lognormal:-5,0.5", help="stub latency spec for --cascade-model")
+    ap.add_argument("--fast-malformed-rate", type=float, default=0.1)
+    ap.add_argument("--fast-incomplete-rate", type=float, default=0.1, help="share of fast answers with a null quantity")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--save-baseline", default=None, help="write the report to this JSON file")
+    ap.add_argument("--compare", default=None, help="compare against a saved baseline JSON file")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed lines/sec drop vs baseline")
+    args = ap.parse_args()
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("save_baseline", "compare", "tolerance")}
+    report = {"settings": settings, "results": []}
+    for n in args.lines:
+        res = run_scenario(n, args)
+        report["results"].append(res)
+        print(
+            f"{n:>7} lines  {res['lines_per_s']:>9.1f} lines/s  p50 {res['p50_ms']:.1f}ms  p95 {res['p95_ms']:.1f}ms"
+            f"  p99 {res['p99_ms']:.1f}ms  rss {res['peak_rss_mb']:.0f}MB  calls/line {res['llm_calls_per_line']:.2f}"
+            f"  prompt tok/line {res['prompt_tokens_per_line']:.0f}  completion tok/line {res['completion_tokens_per_line']:.0f}  max_tokens/line {res['max_tokens_per_line']:.0f}"
+            f"  fallbacks {res['fallback_records']}  hedged {res['hedged_requests']} (won {res['hedge_wins']})"
+            f"  deadline hits {res['deadline_exceeded']}"
+        )
+        if res["cascade"]:
+            c = res["cascade"]
+            tiers = "  ".join(
+                f"{name} {c[name]['lines']} lines p50 {c[name]['p50_s'] * 1000:.1f}ms p95 {c[name]['p95_s'] * 1000:.1f}ms"
+                for name in ("fast", "large")
+                if c[name]["lines"]
+            )
+            print(f"         cascade: {c['hit_rate']:.1%} answered by {c['fast_model']}  {tiers}")
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Time-to-result per priority class, file order vs priority scheduling.
+
+Run: python benchmarks/bench_priority.py --lines 2000 --urgent-share 0.05 --concurrency 8
+
+A synthetic input with a small share of urgent lines (keywords or a deadline
+within a week of --now) spread evenly through routine orders is extracted
+twice against the local stub Groq endpoint: once in file order
+(runner.iter_line_results) and once with runner.iter_prioritized. For each
+priority class the time from the start of the run until a line's records
+are ready is reported (p50/p95/max). Both runs must give the same records.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_structurer import runner  # noqa: E402
+from ai_structurer.llm import configure_default_client  # noqa: E402
+from ai_structurer.priority import PRIORITIES, PriorityScheduler  # noqa: E402
+from stub_llm import StubConfig, StubLLMServer  # noqa: E402
+
+_ROUTINE = [
+    "Need {q} boxes of screws for Project Atlas, deliver to Warehouse {w}",
+    "Order {q} packs of 10x10 tiles for renovation by 2027-0{m}-1{d}",
+    "We need {q} kg cement at Site B, no rush",
+    "Supply {q} liters of paint, needed soon",
+]
+_URGENT = [
+    "URGENT: {q} bags of sand at Yard C",
+    "Need {q} meters of wire by 2026-01-0{d}, ASAP",
+    "Cement {q} kg at Site A, deliver tomorrow",
+]
+
+
+def make_lines(n: int, urgent_share: float, seed: int = 0):
+    rnd = random.Random(seed)
+    every = max(1, round(1 / urgent_share)) if urgent_share > 0 else n + 1
+    return [
+        rnd.choice(_URGENT if k % every == every - 1 else _ROUTINE).format(q=rnd.randint(1, 500), w=rnd.randint(1, 40), m=rnd.randint(1, 9), d=rnd.randint(1, 5))
+        for k in range(n)
+    ]
+
+
+def _fmt(p50, p95, worst):
+    return f"p50 {p50 * 1000:7.0f}ms  p95 {p95 * 1000:7.0f}ms  max {worst * 1000:7.0f}ms"
+
+
+def _summary(times):
+    times.sort()
+    return _fmt(times[len(times) // 2], times[int(0.95 * (len(times) - 1))], times[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=2000)
+    ap.add_argument("--urgent-share", type=float, default=0.05)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--batch-size", type=int, default=1)
+    ap.add_argument("--latency", default="lognormal:-3.5,0.5", help="stub latency spec (see stub_llm.parse_latency)")
+    ap.add_argument("--now", default="2026-01-01", help="reference date for deadline pre-scan")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    lines = make_lines(args.lines, args.urgent_share, args.seed)
+    now = datetime.fromisoformat(args.now)
+    classes = [PriorityScheduler(now).classify(line) for line in lines]
+    kwargs = dict(concurrency=args.concurrency, batch_size=args.batch_size)
+
+    with StubLLMServer(StubConfig(latency=args.latency, seed=args.seed)) as server:
+        configure_default_client(api_url=server.url, api_key="bench", pool_size=max(10, args.concurrency))
+        os.environ["AI_STRUCTURER_USE_MOCK"] = "0"
+
+        file_order = {p: [] for p in PRIORITIES}
+        start = time.perf_counter()
+        baseline = []
+        for i, parsed in enumerate(runner.iter_line_results(lines, **kwargs)):
+            file_order[classes[i]].append(time.perf_counter() - start)
+            baseline.append(parsed)
+        wall_file = time.perf_counter() - start
+
+        scheduler = PriorityScheduler(now)
+        prioritized = [None] * len(lines)
+        start = time.perf_counter()
+        for i, _, parsed in runner.iter_prioritized(lines, scheduler, **kwargs):
+            prioritized[i] = parsed
+        wall_prio = time.perf_counter() - start
+
+    assert prioritized == baseline, "priority scheduling changed the records"
+    report = scheduler.report()
+    print(f"{args.lines} lines, concurrency {args.concurrency}: file order {wall_file:.2f}s, prioritized {wall_prio:.2f}s")
+    for p in PRIORITIES:
+        if not file_order[p]:
+            continue
+        r = report[p]
+        print(f"  {p:<6} {len(file_order[p]):>6} lines  file order   {_summary(file_order[p])}")
+        print(f"  {'':<19}prioritized  {_fmt(r['p50_s'], r['p95_s'], r['max_s'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Microbenchmark: compiled schema enforcement vs the original per-call implementation.
+
+Run: python benchmarks/bench_schema.py [--n 200000]
+
+The legacy functions below are verbatim copies of the pre-optimisation
+schema code and serve as the reference for both speed and output equality.
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_structurer.schema import enforce_schema, enforce_schema_many, strict_schema_template  # noqa: E402
+
+
+def _legacy_to_number(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        s = value.strip()
+        s2 = s.replace(",", "")
+        try:
+            return float(s2)
+        except ValueError:
+            m = re.match(r"^[^0-9-]*([0-9]+(?:\.[0-9]+)?)", s2)
+            if m:
+                return float(m.group(1))
+            return None
+    return None
+
+
+def _legacy_to_iso_date_or_null(value):
+    if not value:
+        return None
+    if isinstance(value, str):
+        s = value.strip()
+        vague_keywords = ["soon", "asap", "urgent", "next month", "next week", "whenever", "no rush", "sometime"]
+        if any(k in s.lower() for k in vague_keywords):
+            return None
+        for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%Y/%m/%d", "%b %d %Y", "%B %d, %Y", "%d %b %Y"):
+            try:
+                dt = datetime.strptime(s, fmt)
+                return dt.date().isoformat()
+            except Exception:
+                pass
+        try:
+            dt = datetime.fromisoformat(s)
+            return dt.date().isoformat()
+        except Exception:
+            pass
+        m = re.search(r"(\d{4}-\d{2}-\d{2})", s)
+        if m:
+            return m.group(1)
+    return None
+
+
+def legacy_enforce_schema(obj):
+    out = strict_schema_template()
+    out["material_name"] = obj.get("material_name") if isinstance(obj.get("material_name"), str) else (str(obj.get("material_name")) if obj.get("material_name") is not None else None)
+    out["quantity"] = _legacy_to_number(obj.get("quantity"))
+    out["unit"] = obj.get("unit") if isinstance(obj.get("unit"), str) else (str(obj.get("unit")) if obj.get("unit") is not None else None)
+    out["project_name"] = obj.get("project_name") if isinstance(obj.get("project_name"), str) else None
+    out["location"] = obj.get("location") if isinstance(obj.get("location"), str) else None
+    urgency = obj.get("urgency")
+    if isinstance(urgency, str) and urgency.lower() in {"low", "medium", "high"}:
+        out["urgency"] = urgency.lower()
+    else:
+        out["urgency"] = None
+    out["deadline"] = _legacy_to_iso_date_or_null(obj.get("deadline"))
+    return out
+
+
+DEADLINES = [
+    "2026-01-15", "2025-12-31", "15-01-2026", "01/15/2026", "2026/01/15", "Jan 15 2026",
+    "January 15, 2026", "15 Jan 2026", "2026-02-30", "2026-01-15T10:00:00", "next month",
+    "ASAP", "by 2026-03-01 please", "whenever", None, "", 20260115,
+]
+QUANTITIES = [20, 5.5, "20", "1,200", "approx 30", "ten", None, "12 boxes", True]
+URGENCIES = ["low", "HIGH", "Medium", "critical", None, 3]
+
+
+def make_corpus(n, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {
+            "material_name": rnd.choice(["Screws", "cement", 42, None]),
+            "quantity": rnd.choice(QUANTITIES),
+            "unit": rnd.choice(["boxes", "kg", None, 7]),
+            "project_name": rnd.choice(["Phoenix", None, 12]),
+            "location": rnd.choice(["Warehouse 12", None]),
+            "urgency": rnd.choice(URGENCIES),
+            "deadline": rnd.choice(DEADLINES),
+            "extra": "dropped",
+        }
+        for _ in range(n)
+    ]
+
+
+def _time(fn, corpus):
+    start = time.perf_counter()
+    out = fn(corpus)
+    return time.perf_counter() - start, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    args = ap.parse_args()
+    corpus = make_corpus(args.n)
+
+    legacy_s, legacy_out = _time(lambda c: [legacy_enforce_schema(o) for o in c], corpus)
+    single_s, single_out = _time(lambda c: [enforce_schema(o) for o in c], corpus)
+    many_s, many_out = _time(enforce_schema_many, corpus)
+
+    assert legacy_out == single_out == many_out, "optimised enforcement diverges from legacy output"
+    print(f"records: {args.n}")
+    for name, secs in (("legacy enforce_schema", legacy_s), ("enforce_schema", single_s), ("enforce_schema_many", many_s)):
+        print(f"{name:24s} {secs:8.3f}s  {args.n / secs:12,.0f} rec/s  x{legacy_s / secs:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark: CLI import time and cold vs warm-worker run latency.
+
+Run: python benchmarks/bench_startup.py [--runs 10]
+
+- import: fresh-interpreter time to import a module, minus a bare `python -c pass`
+- cold: `python solution.py` on a small file in mock mode (new interpreter per run)
+- warm: the same run forwarded to a persistent worker over a Unix socket
+
+All numbers are medians over --runs runs, in milliseconds.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _median_ms(cmd, runs, env, cwd):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args()
+    env = dict(os.environ, PYTHONPATH=str(ROOT), AI_STRUCTURER_USE_MOCK="1")
+    tmp = tempfile.mkdtemp()
+    inp = os.path.join(tmp, "in.txt")
+    with open(inp, "w", encoding="utf-8") as f:
+        f.write("Need 20 boxes of screws for Project Phoenix\nOrder 5 packs of tiles, ASAP\n")
+
+    bare = _median_ms([sys.executable, "-c", "pass"], args.runs, env, tmp)
+    print(f"interpreter startup            {bare:7.1f} ms")
+    for label, stmt in [
+        ("import ai_structurer.cli", "import ai_structurer.cli"),
+        ("import ai_structurer.runner", "import ai_structurer.runner"),
+        ("import requests (eager before)", "import requests"),
+    ]:
+        ms = _median_ms([sys.executable, "-c", stmt], args.runs, env, tmp) - bare
+        print(f"{label:30s} {ms:7.1f} ms")
+
+    out = os.path.join(tmp, "out.json")
+    cold = _median_ms([sys.executable, str(ROOT / "solution.py"), "-i", inp, "-o", out, "--no-cache"], args.runs, env, tmp)
+    print(f"cold run (solution.py)         {cold:7.1f} ms")
+
+    sock = os.path.join(tmp, "worker.sock")
+    worker = subprocess.Popen([sys.executable, "-m", "ai_structurer.cli", "worker", "--socket", sock], env=env, cwd=tmp, stderr=subprocess.DEVNULL)
+    try:
+        while not os.path.exists(sock):
+            time.sleep(0.01)
+        cmd = [sys.executable, "-m", "ai_structurer.cli", "--worker-socket", sock, "-i", inp, "-o", out, "--no-cache"]
+        warm = _median_ms(cmd, args.runs, env, tmp)
+    finally:
+        worker.terminate()
+        worker.wait()
+    print(f"warm run (worker socket)       {warm:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: output writers vs the original one-string write_outputs.
+
+Run: python benchmarks/bench_writers.py [--n 200000]
+
+For each variant it reports write time, output size and the tracemalloc
+peak of holding the records plus writing them. The legacy variant is the
+original write_outputs body: json.dumps(records, indent=2) into one string.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_structurer import writers  # noqa: E402
+from ai_structurer.records import Record  # noqa: E402
+from ai_structurer.runner import write_outputs  # noqa: E402
+
+
+def legacy_write_outputs(records, output_path):
+    Path(output_path).write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def make_records(n, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {
+            "material_name": rnd.choice(["Screws", "Cement", "Plywood sheets", "Tiles"]) + f" #{i}",
+            "quantity": float(rnd.randint(1, 500)),
+            "unit": rnd.choice(["boxes", "kg", "bags", None]),
+            "project_name": rnd.choice(["Phoenix", "Site A", None]),
+            "location": rnd.choice(["Warehouse 12", None]),
+            "urgency": rnd.choice(["low", "medium", "high"]),
+            "deadline": rnd.choice(["2026-01-15", None]),
+        }
+        for i in range(n)
+    ]
+
+
+def _measure(build, write, path):
+    records = build()
+    start = time.perf_counter()
+    write(records, path)
+    elapsed = time.perf_counter() - start
+    del records
+    # Second pass for memory only: tracemalloc slows allocation-heavy code down a lot
+    tracemalloc.start()
+    write(build(), path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, os.path.getsize(path)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    args = ap.parse_args()
+    print(f"orjson: {'yes' if writers.orjson is not None else 'no'}")
+    tmp = tempfile.mkdtemp()
+    variants = [
+        ("legacy json (dicts)", lambda: make_records(args.n), legacy_write_outputs, "json"),
+        ("json (Records)", lambda: [Record.from_dict(r) for r in make_records(args.n)], write_outputs, "json"),
+    ]
+    for fmt in ("json-compact", "ndjson", "csv", "columnar"):
+        variants.append((f"{fmt} (Records)", lambda: [Record.from_dict(r) for r in make_records(args.n)], lambda r, p, fmt=fmt: write_outputs(r, p, fmt=fmt), fmt))
+    outputs = {}
+    for name, build, write, fmt in variants:
+        path = os.path.join(tmp, name.split()[0] + ("-legacy" if name.startswith("legacy") else ""))
+        elapsed, peak, size = _measure(build, write, path)
+        outputs[name] = path
+        print(f"{name:22s} {elapsed:7.3f}s  peak {peak / 1e6:8.1f} MB  file {size / 1e6:7.1f} MB")
+    same = Path(outputs["legacy json (dicts)"]).read_bytes() == Path(outputs["json (Records)"]).read_bytes()
+    print(f"json output identical to legacy: {same}")
+
+
+if __name__ == "__main__":
+    main()
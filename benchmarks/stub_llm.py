@@ -0,0 +1,267 @@
+"""Local HTTP stand-in for the Groq completions endpoint.
+
+Used by the benchmarks and tests to exercise the real HTTP path (GroqClient,
+retries, rate limiting, streaming) without network access or an API key.
+It answers POST {base}/{model}/completions like call_groq_llm expects:
+
+- single-line prompts ("Text: ...") get a JSON array of records
+- batched prompts ("Lines:" with [i] tags) get an object keyed by index
+- "stream": true bodies get a server-sent-events stream of text deltas
+- answers longer than max_tokens (~4 chars/token) are cut off with
+  finish_reason "length"; non-streamed answers report token usage
+
+Latency, 429/5xx rates, malformed-output rate, incomplete-record rate and
+records per response are configurable, and `models` can give a model id its
+own settings (e.g. a fast model that is quicker but less reliable).
+
+This is a development tool, not part of the ai_structurer package. Run it
+standalone with `python benchmarks/stub_llm.py --port 8089` and point
+GROQ_API_URL at the printed URL.
+"""
+from typing import Dict, List, Optional, Tuple
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+_MATERIALS = ["Screws", "Cement", "Paint", "Tiles", "Pipes", "Nails", "Plywood", "Wire"]
+_UNITS = ["boxes", "kg", "liters", "packs", "meters", "pcs"]
+_BATCH_LINE_RE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+
+def parse_latency(spec: str):
+    """Build a latency sampler (seconds) from a spec string.
+
+    - "fixed:0.05"
+    - "uniform:0.01,0.2"
+    - "lognormal:mu,sigma" (of the underlying normal, in log-seconds)
+    - "exp:mean"
+    - "tail:base,slow,p" (slow with probability p, else base: a stalled tail)
+    """
+    kind, _, args = spec.partition(":")
+    vals = [float(x) for x in args.split(",") if x]
+    if kind == "fixed":
+        return lambda rnd: vals[0]
+    if kind == "uniform":
+        return lambda rnd: rnd.uniform(vals[0], vals[1])
+    if kind == "lognormal":
+        return lambda rnd: rnd.lognormvariate(vals[0], vals[1])
+    if kind == "exp":
+        return lambda rnd: rnd.expovariate(1.0 / vals[0])
+    if kind == "tail":
+        return lambda rnd: vals[1] if rnd.random() < vals[2] else vals[0]
+    raise ValueError(f"unknown latency spec: {spec}")
+
+
+class StubConfig:
+    """Behaviour knobs for the stub server (all rates are probabilities per request)."""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        rate_429: float = 0.0,
+        rate_5xx: float = 0.0,
+        malformed_rate: float = 0.0,
+        records_per_response: int = 1,
+        retry_after: Optional[float] = None,
+        seed: int = 0,
+        incomplete_rate: float = 0.0,
+        models: Optional[Dict[str, "StubConfig"]] = None,
+    ):
+        self.latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.malformed_rate = malformed_rate
+        self.records_per_response = records_per_response
+        self.retry_after = retry_after
+        # Records answered with a null quantity (fails cascade confidence checks)
+        self.incomplete_rate = incomplete_rate
+        # Per-model overrides; requests are still counted on this config
+        self.models = models or {}
+        self.rnd = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.prompt_chars = 0
+        self.max_tokens_requested = 0
+        self.statuses: Dict[int, int] = {}
+        self.requests_by_model: Dict[str, int] = {}
+
+    def roll(self) -> Tuple[float, float, float, float]:
+        with self.lock:
+            return self.latency(self.rnd), self.rnd.random(), self.rnd.random(), self.rnd.random()
+
+
+def _records_for(line: str, n: int, incomplete: bool = False) -> List[Dict]:
+    h = int(hashlib.sha1(line.encode("utf-8")).hexdigest(), 16)
+    return [
+        {
+            "material_name": _MATERIALS[(h + i) % len(_MATERIALS)],
+            "quantity": None if incomplete else (h >> 8) % 100 + 1,
+            "unit": _UNITS[(h >> 16) % len(_UNITS)],
+            "project_name": None,
+            "location": None,
+            "urgency": ["low", "medium", "high"][(h >> 24) % 3],
+            "deadline": None,
+        }
+        for i in range(n)
+    ]
+
+
+def build_completion(prompt: str, records_per_response: int, malformed: bool, incomplete: bool = False) -> str:
+    """Return the text the stub model "generates" for prompt."""
+    batched = _BATCH_LINE_RE.findall(prompt)
+    if batched:
+        body = json.dumps({idx: _records_for(line, records_per_response, incomplete) for idx, line in batched})
+    else:
+        line = prompt.rsplit("Text: ", 1)[-1].strip()
+        body = json.dumps(_records_for(line, records_per_response, incomplete))
+    if malformed:
+        # Chatty and cut off: forces local repair or the correction retry
+        return "Sure! Here is the data you asked for: " + body[: max(1, len(body) // 2)]
+    return body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY, Nagle
+    # plus delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002 - signature fixed by BaseHTTPRequestHandler
+        pass
+
+    def _send(self, status: int, payload: bytes, content_type: str = "application/json", headers: Optional[Dict] = None):
+        cfg: StubConfig = self.server.config
+        with cfg.lock:
+            cfg.statuses[status] = cfg.statuses.get(status, 0) + 1
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        cfg: StubConfig = self.server.config
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+        prompt = body.get("prompt", "")
+        model = self.path.strip("/").split("/")[-2] if self.path.count("/") >= 2 else ""
+        with cfg.lock:
+            cfg.requests += 1
+            cfg.prompt_chars += len(prompt)
+            cfg.max_tokens_requested += body.get("max_tokens") or 0
+            cfg.requests_by_model[model] = cfg.requests_by_model.get(model, 0) + 1
+        tier = cfg.models.get(model, cfg)
+        latency, fail_roll, malformed_roll, incomplete_roll = tier.roll()
+
+        if fail_roll < tier.rate_429:
+            headers = {"Retry-After": str(tier.retry_after)} if tier.retry_after is not None else None
+            return self._send(429, b'{"error": "rate limited"}', headers=headers)
+        if fail_roll < tier.rate_429 + tier.rate_5xx:
+            time.sleep(latency)
+            return self._send(503, b'{"error": "unavailable"}')
+
+        text = build_completion(prompt, tier.records_per_response, malformed_roll < tier.malformed_rate, incomplete_roll < tier.incomplete_rate)
+        # Honour max_tokens at ~4 characters per token, like a real model running out of budget
+        finish = "stop"
+        max_tokens = body.get("max_tokens")
+        if isinstance(max_tokens, int) and len(text) > 4 * max_tokens:
+            text, finish = text[: 4 * max_tokens], "length"
+        if body.get("stream"):
+            return self._stream(text, latency)
+        time.sleep(latency)
+        usage = {"prompt_tokens": (len(prompt) + 3) // 4, "completion_tokens": (len(text) + 3) // 4}
+        self._send(200, json.dumps({"choices": [{"text": text, "finish_reason": finish}], "usage": usage}).encode("utf-8"))
+
+    def _stream(self, text: str, latency: float):
+        cfg: StubConfig = self.server.config
+        with cfg.lock:
+            cfg.statuses[200] = cfg.statuses.get(200, 0) + 1
+        chunks = [text[i:i + 16] for i in range(0, len(text), 16)] or [""]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                time.sleep(latency / len(chunks))
+                event = json.dumps({"choices": [{"text": chunk}]})
+                self.wfile.write(f"data: {event}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client cancelled the stream
+            pass
+        self.close_connection = True
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Cancelled streams and closed keep-alive connections are expected here
+        pass
+
+
+class StubLLMServer:
+    """Threaded stub server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.config = self.config
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    p = ArgumentParser(description="Local stub for the Groq completions endpoint")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8089)
+    p.add_argument("--latency", default="fixed:0.05", help="fixed:S | uniform:A,B | lognormal:MU,SIGMA | exp:MEAN")
+    p.add_argument("--rate-429", type=float, default=0.0)
+    p.add_argument("--rate-5xx", type=float, default=0.0)
+    p.add_argument("--malformed-rate", type=float, default=0.0)
+    p.add_argument("--records", type=int, default=1, help="Records per response")
+    p.add_argument("--retry-after", type=float, default=None)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+    cfg = StubConfig(args.latency, args.rate_429, args.rate_5xx, args.malformed_rate, args.records, args.retry_after, args.seed)
+    server = StubLLMServer(cfg, args.host, args.port)
+    print(f"stub Groq endpoint listening on {server.url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,443 @@
+"""Validate pipeline output files against the record schema.
+
+Run: python scripts/validate_outputs.py [PATH ...] [--workers N] [--report FILE]
+
+Accepts a JSON array (the default `json`/`json-compact` output) or NDJSON,
+detected from the first character unless --format is given. A top-level
+object that spans several lines is rejected as not an array rather than
+read as NDJSON. The file is streamed in blocks and never loaded whole.
+
+Blocks are cut at record boundaries: after a line for NDJSON, after an
+object closing outside any string for a JSON array. The chunks are parsed
+with one json.loads each and checked on a process pool, in order; a file
+of less than two blocks is checked in-process. A chunk that does not parse
+(bad JSON, or a cut inside a nested value) is rescanned in-process element
+by element with raw_decode, so each syntax error is reported at its own
+record. A broken element is stepped over with the string-aware span scanner
+of ai_structurer.jsonrepair, so brackets and commas inside its strings do not
+shift the record indexes that follow.
+
+Keys come from schema.SCHEMA_KEYS. quantity must be a number or null,
+urgency low/medium/high or null, deadline YYYY-MM-DD or null, and every
+other field a string or null.
+
+Every violation is collected with its record index. The first --show are
+printed, all of them go to --report as NDJSON, and a count per kind is
+printed with throughput stats. Exit status: 0 if valid, 1 on violations,
+2 if a file cannot be read or is empty (an empty array `[]` is valid).
+"""
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
 import json
+import os
 import re
-from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_structurer.jsonrepair import match_span  # noqa: E402
+from ai_structurer.schema import SCHEMA_KEYS  # noqa: E402
+
+ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+URGENCY_VALUES = frozenset({"low", "medium", "high"})
+EXPECTED_KEYS = frozenset(SCHEMA_KEYS)
+
+# A cut candidate: a "}" followed by the next object of the array
+_NEXT_OBJECT_RE = re.compile(r"\s*,\s*\{")
+# A quote preceded by an odd number of backslashes, i.e. escaped inside a string
+_ESCAPED_QUOTE_RE = re.compile(r'(?<!\\)(?:\\\\)*\\"')
+# A whole string literal, or a separator followed by the next object
+_RESYNC_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|,\s*(?=\{)')
+_SEPARATOR_RE = re.compile(r"\s*,?\s*")
+
+_BLOCK_CHARS = 1 << 22
+# Consecutive unparseable chunks rescanned together at most
+_MAX_RESCAN_CHUNKS = 16
+
+Violation = Tuple[int, str, str]  # record index, kind, detail
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
 
-EXPECTED_KEYS = [
-    "material_name",
-    "quantity",
-    "unit",
-    "project_name",
-    "location",
-    "urgency",
-    "deadline",
-]
+def _check_quantity(v) -> Optional[str]:
+    if v is not None and not _is_number(v):
+        return f"must be number or null, got {type(v).__name__}"
+    return None
 
-ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
-p = Path("outputs.json")
-if not p.exists():
-    raise SystemExit("ERROR: outputs.json not found")
+def _check_urgency(v) -> Optional[str]:
+    if v is not None and v not in URGENCY_VALUES:
+        return f"invalid value: {v!r}"
+    return None
 
-text = p.read_text(encoding="utf-8")
-try:
-    data = json.loads(text)
-except json.JSONDecodeError as e:
-    raise SystemExit(f"ERROR: outputs.json is not valid JSON: {e}")
 
-if not isinstance(data, list):
-    raise SystemExit("ERROR: outputs.json must be a JSON array")
+def _check_deadline(v) -> Optional[str]:
+    if v is not None and not (isinstance(v, str) and ISO_RE.fullmatch(v)):
+        return f"must be ISO YYYY-MM-DD or null, got: {v!r}"
+    return None
 
-for i, obj in enumerate(data):
+
+def _check_str(v) -> Optional[str]:
+    if v is not None and not isinstance(v, str):
+        return f"must be string or null, got {type(v).__name__}"
+    return None
+
+
+_FIELD_CHECKS = {"quantity": _check_quantity, "urgency": _check_urgency, "deadline": _check_deadline}
+_CHECKS = tuple((key, _FIELD_CHECKS.get(key, _check_str)) for key in SCHEMA_KEYS)
+_STR_KEYS = tuple(key for key in SCHEMA_KEYS if key not in _FIELD_CHECKS)
+_STR_TYPES = frozenset({str, type(None)})
+_NUMBER_TYPES = frozenset({int, float, type(None)})
+_URGENCY_OR_NULL = URGENCY_VALUES | {None}
+# Placeholder for an element that could not be decoded
+_INVALID = object()
+
+
+def check_record(obj) -> List[Tuple[str, str]]:
+    """Return (kind, detail) for every schema violation of one record."""
     if not isinstance(obj, dict):
-        raise SystemExit(f"ERROR: item {i} is not an object")
-    keys = list(obj.keys())
-    if set(keys) != set(EXPECTED_KEYS):
-        extra = set(keys) - set(EXPECTED_KEYS)
-        missing = set(EXPECTED_KEYS) - set(keys)
-        raise SystemExit(f"ERROR: item {i} keys mismatch. extra={sorted(extra)}, missing={sorted(missing)}")
-    for k in EXPECTED_KEYS:
-        v = obj.get(k)
-        # quantity must be number or null
-        if k == "quantity":
-            if v is not None and not isinstance(v, (int, float)):
-                raise SystemExit(f"ERROR: item {i} field 'quantity' must be number or null, got {type(v).__name__}")
-        # urgency must be one of allowed or null
-        if k == "urgency":
-            if v is not None and v not in {"low", "medium", "high"}:
-                raise SystemExit(f"ERROR: item {i} field 'urgency' invalid value: {v}")
-        # deadline must be ISO or null
-        if k == "deadline":
-            if v is not None:
-                if not isinstance(v, str) or not ISO_RE.match(v):
-                    raise SystemExit(f"ERROR: item {i} field 'deadline' must be ISO YYYY-MM-DD or null, got: {v}")
-
-print("OK: outputs.json is valid and conforms to the schema")
\ No newline at end of file
+        return [("not_object", f"item is {type(obj).__name__}, not an object")]
+    out = []
+    if obj.keys() != EXPECTED_KEYS:
+        extra = sorted(set(obj) - EXPECTED_KEYS)
+        missing = sorted(EXPECTED_KEYS - set(obj))
+        out.append(("keys", f"keys mismatch. extra={extra}, missing={missing}"))
+    for key, check in _CHECKS:
+        if key in obj:
+            problem = check(obj[key])
+            if problem is not None:
+                out.append((key, f"field {key!r} {problem}"))
+    return out
+
+
+def _valid_fast(obj) -> bool:
+    """True for a record that passes every check (the common case), without building details."""
+    if type(obj) is not dict or obj.keys() != EXPECTED_KEYS:
+        return False
+    for key in _STR_KEYS:
+        if type(obj[key]) not in _STR_TYPES:
+            return False
+    d = obj["deadline"]
+    return type(obj["quantity"]) in _NUMBER_TYPES and obj["urgency"] in _URGENCY_OR_NULL and (d is None or type(d) is str and ISO_RE.fullmatch(d) is not None)
+
+
+def check_objects(objs: Iterable, start: int = 0) -> List[Violation]:
+    violations = []
+    for i, obj in enumerate(objs, start):
+        if obj is _INVALID:
+            violations.append((i, "syntax", "invalid JSON, skipped to the next record"))
+        elif not _valid_fast(obj):
+            violations.extend((i, kind, detail) for kind, detail in check_record(obj))
+    return violations
+
+
+def check_texts(texts: List[str]) -> List[Violation]:
+    """Parse and check records one text each (NDJSON lines)."""
+    violations = []
+    for i, text in enumerate(texts):
+        try:
+            obj = json.loads(text)
+        except ValueError as e:
+            violations.append((i, "syntax", f"invalid JSON: {e}"))
+            continue
+        violations.extend(check_objects([obj], i))
+    return violations
+
+
+def validate_chunk(job: Tuple[str, str, bool]) -> Optional[Tuple[int, List[Violation]]]:
+    """Check one chunk; returns (records, violations with chunk-relative indexes).
+
+    job is (fmt, text, last). A JSON-array chunk is a run of elements, each
+    but the first chunk's starting with its separating comma; the last chunk
+    ends with the closing bracket. Returns None for an array chunk that does
+    not parse as a whole, which the caller then rescans.
+    """
+    fmt, text, last = job
+    if fmt == "ndjson":
+        lines = [raw for raw in text.splitlines() if raw.strip()]
+        try:
+            objs = json.loads("[" + ",".join(lines) + "]")
+        except ValueError:
+            objs = None
+        if objs is None or len(objs) != len(lines):
+            return len(lines), check_texts(lines)
+        return len(objs), check_objects(objs)
+    body = text.lstrip()
+    if body.startswith(","):
+        body = body[1:]
+    if last:
+        body = body.rstrip()
+        if not body.endswith("]"):
+            return None
+        body = body[:-1]
+    try:
+        objs = json.loads("[" + body + "]")
+    except ValueError:
+        return None
+    return len(objs), check_objects(objs)
+
+
+def iter_array_elements(text: str) -> Iterator:
+    """Decode the elements of JSON-array text one by one (the exact, slow path).
+
+    text is the array body without the opening bracket. Yields _INVALID for
+    an element that is not valid JSON; decoding then resumes after it (see
+    _skip_element). Raises ValueError if the closing bracket is missing.
+    """
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        pos = _SEPARATOR_RE.match(text, pos).end()
+        if text.startswith("]", pos):
+            return
+        if pos >= len(text):
+            raise ValueError("unterminated JSON array")
+        try:
+            obj, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            yield _INVALID
+            pos = _skip_element(text, pos)
+            if pos is None:
+                if text.rstrip().endswith("]"):
+                    return
+                raise ValueError("unterminated JSON array")
+            continue
+        yield obj
+
+
+def _skip_element(text: str, pos: int) -> Optional[int]:
+    """Index just after the broken element starting at pos, or None if nothing follows it.
+
+    A balanced object or array is skipped whole; its strings may hold any
+    brackets. Otherwise decoding resumes at the next `, {` outside a string.
+    """
+    if text[pos] in "{[":
+        end, closed = match_span(text, pos)
+        if closed:
+            return end
+    for m in _RESYNC_RE.finditer(text, pos):
+        if m.group().startswith(","):
+            return m.end()
+    return None
+
+
+def _blocks(f, size: int) -> Iterator[str]:
+    while True:
+        block = f.read(size)
+        if not block:
+            return
+        yield block
+
+
+def iter_ndjson_chunks(f, block_chars: int = _BLOCK_CHARS) -> Iterator[Tuple[str, str, bool]]:
+    """Cut NDJSON into runs of whole lines, about one block each."""
+    carry = ""
+    for block in _blocks(f, block_chars):
+        buf = carry + block
+        cut = buf.rfind("\n") + 1
+        if cut:
+            yield "ndjson", buf[:cut], False
+        carry = buf[cut:]
+    if carry.strip():
+        yield "ndjson", carry, True
+
+
+def iter_array_chunks(f, block_chars: int = _BLOCK_CHARS) -> Iterator[Tuple[str, str, bool]]:
+    """Cut a JSON array into runs of whole elements, about one block each."""
+    blocks = _blocks(f, block_chars)
+    buf = next(blocks, "").lstrip()
+    if not buf.startswith("["):
+        raise ValueError("top level must be a JSON array")
+    buf = buf[1:]
+    for block in blocks:
+        buf += block
+        cut = _cut_point(buf)
+        if cut:
+            yield "json", buf[:cut], False
+            buf = buf[cut:]
+    yield "json", buf, True
+
+
+def _cut_point(buf: str) -> int:
+    """Index just after the last "}" of buf that closes an element, or 0.
+
+    buf starts at an element boundary, so a "}" is outside any string when
+    an even number of unescaped quotes precede it. It may still close a
+    nested object, in which case the chunk fails to parse and is rescanned.
+    """
+    p = len(buf)
+    while True:
+        p = buf.rfind("}", 0, p)
+        if p < 0:
+            return 0
+        if _NEXT_OBJECT_RE.match(buf, p + 1) and _unescaped_quotes(buf, p) % 2 == 0:
+            return p + 1
+
+
+def _unescaped_quotes(buf: str, end: int) -> int:
+    n = buf.count('"', 0, end)
+    if buf.find('\\"', 0, end) != -1:
+        n -= len(_ESCAPED_QUOTE_RE.findall(buf, 0, end))
+    return n
+
+
+def detect_format(path: str) -> str:
+    """"json" or "ndjson" from the start of the file.
+
+    An object whose first line does not close it (a pretty-printed top-level
+    object) is reported as "json", so it fails as not an array instead of
+    with a syntax error per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(1 << 16).lstrip()
+    if head.startswith("["):
+        return "json"
+    if head.startswith("{"):
+        first_line = head.split("\n", 1)[0]
+        end, closed = match_span(head, 0)
+        if first_line.strip() == "{" or closed and end > len(first_line):
+            return "json"
+    return "ndjson"
+
+
+def _ordered_results(jobs: Iterator[Tuple[str, str, bool]], workers: int) -> Iterator[Tuple[Tuple[str, str, bool], Optional[Tuple[int, List[Violation]]]]]:
+    """(job, validate_chunk(job)) in order, with at most 2 * workers chunks in flight."""
+    if workers <= 1:
+        for job in jobs:
+            yield job, validate_chunk(job)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job in jobs:
+            pending.append((job, pool.submit(validate_chunk, job)))
+            if len(pending) >= 2 * workers:
+                job, fut = pending.popleft()
+                yield job, fut.result()
+        while pending:
+            job, fut = pending.popleft()
+            yield job, fut.result()
+
+
+def _rescan(texts: List[str], last: bool) -> Tuple[int, List[Violation], Optional[str]]:
+    """Exact element-by-element check of consecutive array chunks that did not parse."""
+    body = "".join(texts).lstrip()
+    if body.startswith(","):
+        body = body[1:]
+    objs = []
+    error = None
+    try:
+        # A run that is not the end of the file stops at an element boundary
+        objs.extend(iter_array_elements(body if last else body + "]"))
+    except ValueError as e:
+        error = str(e)
+    return len(objs), check_objects(objs), error
+
+
+def validate_file(path: str, fmt: str = "auto", workers: int = 1, block_chars: int = _BLOCK_CHARS, report=None, show: int = 20) -> Dict:
+    """Validate one file; returns {"records", "violations", "kinds", "bytes", "seconds", "error"}."""
+    if fmt == "auto":
+        fmt = detect_format(path)
+    size = os.path.getsize(path)
+    # A process pool only pays off once there are several blocks to hand out
+    workers = min(workers, size // block_chars)
+    started = time.perf_counter()
+    records = 0
+    kinds: Counter = Counter()
+    shown = 0
+    error = None
+
+    def emit(offset: int, violations: List[Violation]):
+        nonlocal shown
+        for index, kind, detail in violations:
+            index += offset
+            kinds[kind] += 1
+            if shown < show:
+                print(f"ERROR: {path}: item {index} {detail}")
+                shown += 1
+            if report is not None:
+                report.write(json.dumps({"file": path, "index": index, "kind": kind, "detail": detail}) + "\n")
+
+    with open(path, "r", encoding="utf-8") as f:
+        jobs = iter_array_chunks(f, block_chars) if fmt == "json" else iter_ndjson_chunks(f, block_chars)
+        failed: List[str] = []
+        try:
+            for (_, text, last), result in _ordered_results(jobs, workers):
+                if result is None:
+                    failed.append(text)
+                    if not last and len(failed) < _MAX_RESCAN_CHUNKS:
+                        continue
+                    count, violations, err = _rescan(failed, last)
+                    error = error or err
+                    failed = []
+                elif failed:
+                    # The previous chunks ended at the boundary this one starts at
+                    count, violations, err = _rescan(failed, False)
+                    error = error or err
+                    failed = []
+                    emit(records, violations)
+                    records += count
+                    count, violations = result
+                else:
+                    count, violations = result
+                emit(records, violations)
+                records += count
+        except ValueError as e:
+            error = str(e)
+    if fmt == "ndjson" and records == 0 and error is None:
+        error = "no records: the file is empty"
+    return {
+        "records": records,
+        "violations": sum(kinds.values()),
+        "kinds": dict(kinds),
+        "bytes": size,
+        "seconds": time.perf_counter() - started,
+        "error": error,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Validate JSON-array or NDJSON output files against the record schema.")
+    ap.add_argument("paths", nargs="*", default=["outputs.json"], help="output files (default: outputs.json)")
+    ap.add_argument("--format", choices=["auto", "json", "ndjson"], default="auto")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="validation processes for files of two blocks or more (default: all cores)")
+    ap.add_argument("--block-mb", type=float, default=4, help="approximate size of one validation chunk in MB")
+    ap.add_argument("--show", type=int, default=20, help="violations to print per file")
+    ap.add_argument("--report", default=None, help="write every violation as NDJSON to this file")
+    args = ap.parse_args(argv)
+
+    report = open(args.report, "w", encoding="utf-8") if args.report else None
+    status = 0
+    try:
+        for path in args.paths:
+            if not Path(path).exists():
+                print(f"ERROR: {path} not found")
+                status = 2
+                continue
+            res = validate_file(path, args.format, args.workers, max(1024, int(args.block_mb * 1e6)), report, args.show)
+            rate = res["records"] / res["seconds"] if res["seconds"] else 0.0
+            mb_s = res["bytes"] / 1e6 / res["seconds"] if res["seconds"] else 0.0
+            print(f"{path}: {res['records']} records, {res['bytes'] / 1e6:.1f} MB in {res['seconds']:.2f}s ({rate:,.0f} records/s, {mb_s:.1f} MB/s)")
+            if res["error"]:
+                print(f"ERROR: {path}: {res['error']}")
+                status = 2
+            elif res["violations"]:
+                summary = ", ".join(f"{k}={n}" for k, n in sorted(res["kinds"].items()))
+                print(f"FAIL: {path}: {res['violations']} violations ({summary})")
+                status = max(status, 1)
+            else:
+                print(f"OK: {path} is valid and conforms to the schema")
+    finally:
+        if report is not None:
+            report.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,21 @@
 """Convenience wrapper for running the ai_structurer CLI as `solution.py`.
 
 This file exists so reviewers can run `python solution.py` as a single-step entrypoint.
+It defaults --input to test_inputs.txt and mock mode on, then hands argv to
+the package CLI, which parses it once.
 """
 import os
-import argparse
+import sys
 from ai_structurer.cli import main as cli_main
 
 
 def _run_as_script():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--input", "-i", default="test_inputs.txt")
-    parser.add_argument("--output", "-o", default="outputs.json")
-    parser.add_argument("--model", "-m", default="llama3-70b-8192")
-    args = parser.parse_args()
-    os.environ.setdefault("AI_STRUCTURER_USE_MOCK", os.environ.get("AI_STRUCTURER_USE_MOCK", "1"))
+    argv = sys.argv[1:]
+    if not any(a in ("--input", "-i") or a.startswith("--input=") for a in argv):
+        argv = ["--input", "test_inputs.txt"] + argv
+    os.environ.setdefault("AI_STRUCTURER_USE_MOCK", "1")
     # Delegate to package CLI
-    cli_main()
+    cli_main(argv)
 
 
 if __name__ == "__main__":
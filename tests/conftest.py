@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The stub Groq endpoint (stub_llm) is a development tool kept with the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
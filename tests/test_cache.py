@@ -0,0 +1,74 @@
+from ai_structurer.cache import ResponseCache
+from ai_structurer.runner import process_all_inputs
+
+
+def test_cache_hit_miss_and_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), max_entries=2, ttl_seconds=0)
+    assert cache.get("m", "p1", 10) is None
+    cache.put("m", "p1", 10, "r1")
+    cache.put("m", "p2", 10, "r2")
+    assert cache.get("m", "p1", 10) == "r1"
+    # max_tokens is part of the key
+    assert cache.get("m", "p1", 20) is None
+    cache.put("m", "p3", 10, "r3")
+    # p2 was least recently used and is evicted
+    assert cache.get("m", "p2", 10) is None
+    assert len(cache) == 2
+    st = cache.stats()
+    assert st["hits"] == 1 and st["misses"] == 3 and st["evictions"] == 1
+
+
+def test_cache_ttl_expiry(tmp_path, monkeypatch):
+    import ai_structurer.cache as cache_mod
+
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now["t"])
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl_seconds=60)
+    cache.put("m", "p", 10, "r")
+    now["t"] += 61
+    assert cache.get("m", "p", 10) is None
+
+
+def test_runner_caches_only_parseable_responses(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("good\nbad\n", encoding="utf-8")
+    calls = {"n": 0}
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        calls["n"] += 1
+        if "Text: good" in prompt:
+            return '[{"material_name": "Screws", "quantity": 20}]'
+        return "garbage"
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"))
+
+    first = process_all_inputs(str(inp), cache=cache)
+    assert calls["n"] == 3  # good once, bad twice (initial + correction)
+    second = process_all_inputs(str(inp), cache=cache)
+    assert second == first
+    assert calls["n"] == 5  # only the unparseable line hits the LLM again
+    assert len(cache) == 1
+
+
+def test_runner_does_not_cache_batched_answers_that_miss_lines(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("alpha\nbeta\n", encoding="utf-8")
+    prompts = []
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        prompts.append(prompt)
+        if "alpha" in prompt and "beta" in prompt:
+            return '{"note": "nothing to extract"}'  # parses, but maps to no line
+        return '[{"material_name": "Screws", "quantity": 20}]'
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"))
+
+    first = process_all_inputs(str(inp), cache=cache, batch_size=2)
+    assert len(prompts) == 3  # the batch, then each line alone
+    assert len(cache) == 2  # the two single-line answers only
+    assert process_all_inputs(str(inp), cache=cache, batch_size=2) == first
+    assert len(prompts) == 4  # batching is retried; the single lines come from the cache
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from ai_structurer import cascade
+from ai_structurer.llm import GroqClient
+from ai_structurer.runner import process_all_inputs
+from ai_structurer.schema import strict_schema_template
+from stub_llm import StubConfig, StubLLMServer
+
+GOOD = json.dumps([{"material_name": "Cement", "quantity": 5, "unit": "kg"}])
+NO_QTY = json.dumps([{"material_name": "Cement", "quantity": None, "unit": "kg"}])
+
+
+@pytest.fixture(autouse=True)
+def no_cascade():
+    yield
+    cascade.configure_cascade(None)
+
+
+def _fake_llm(answers, calls):
+    def fake(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        calls.append(model)
+        return answers[model](prompt)
+
+    return fake
+
+
+def test_cascade_escalates_only_unconfident_lines(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("easy line\nhard line\nbroken line\n", encoding="utf-8")
+    calls = []
+
+    def fast(prompt):
+        if "easy" in prompt:
+            return GOOD
+        return NO_QTY if "hard" in prompt else "not json"
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", _fake_llm({"small": fast, "big": lambda p: GOOD}, calls))
+    cascade.configure_cascade("small")
+
+    records = process_all_inputs(str(inp), model="big")
+    assert [r["quantity"] for r in records] == [5, 5, 5]
+    assert calls == ["small", "small", "big", "small", "big"]
+
+    stats = cascade.get_cascade().stats()
+    assert stats["fast"]["lines"] == 3 and stats["fast"]["accepted"] == 1
+    assert stats["large"]["lines"] == 2 and stats["large"]["accepted"] == 2
+    assert "1/3 lines answered by small" in cascade.get_cascade().stats_line()
+
+
+def test_cascade_batches_on_fast_model_and_escalates_per_line(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("alpha\nbeta\n", encoding="utf-8")
+    calls = []
+
+    def fast(prompt):
+        return json.dumps({"1": json.loads(GOOD), "2": json.loads(NO_QTY)})
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", _fake_llm({"small": fast, "big": lambda p: GOOD}, calls))
+    cascade.configure_cascade("small")
+
+    records = process_all_inputs(str(inp), model="big", batch_size=2)
+    assert [r["quantity"] for r in records] == [5, 5]
+    assert calls == ["small", "big"]  # the escalated line skips the fast tier
+    large = cascade.get_cascade().large
+    assert (large.lines, large.accepted) == (1, 1)
+
+
+def test_large_tier_counts_only_confident_answers():
+    c = cascade.ModelCascade("small")
+    c.observe_large([strict_schema_template()], 0.2)
+    c.observe_large(json.loads(NO_QTY), 0.2)
+    c.observe_large(json.loads(GOOD), 0.2)
+    assert (c.large.lines, c.large.accepted) == (3, 1)
+
+
+def test_cascade_against_stub_routes_by_model(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("".join(f"Need {i} boxes of screws\n" for i in range(30)), encoding="utf-8")
+    cfg = StubConfig(models={"small": StubConfig(incomplete_rate=0.3, seed=2)})
+
+    with StubLLMServer(cfg) as server:
+        monkeypatch.setattr("ai_structurer.llm._default_client", GroqClient(api_url=server.url, api_key="k"))
+        monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+        cascade.configure_cascade("small")
+        records = process_all_inputs(str(inp), model="big", concurrency=4)
+
+    assert all(r["quantity"] is not None for r in records)
+    escalated = cascade.get_cascade().large.lines
+    assert 0 < escalated < 30
+    assert cfg.requests_by_model == {"small": 30, "big": escalated}
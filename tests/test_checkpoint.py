@@ -0,0 +1,87 @@
+import pytest
+from ai_structurer.checkpoint import CheckpointJournal
+from ai_structurer.runner import process_all_inputs, write_outputs
+
+
+def _fake_call_factory(calls, crash_on=None):
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        line = prompt.split("Text: ")[1].strip()
+        if line == crash_on:
+            raise KeyboardInterrupt  # not swallowed by the runner, like a killed process
+        calls.append(line)
+        return f'[{{"material_name": "{line}", "quantity": 1}}]'
+
+    return fake_call
+
+
+def test_resume_skips_finished_lines_and_output_is_identical(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("".join(f"line{i}\n" for i in range(6)), encoding="utf-8")
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+
+    # Uninterrupted reference run
+    calls = []
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", _fake_call_factory(calls))
+    write_outputs(process_all_inputs(str(inp)), str(tmp_path / "ref.json"))
+
+    # Run that dies at line4
+    ckpt = str(tmp_path / "run.ckpt")
+    calls = []
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", _fake_call_factory(calls, crash_on="line4"))
+    journal = CheckpointJournal(ckpt)
+    with pytest.raises(KeyboardInterrupt):
+        process_all_inputs(str(inp), journal=journal)
+    journal.close()
+    assert calls == ["line0", "line1", "line2", "line3"]
+
+    # Resume only extracts the missing lines
+    calls = []
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", _fake_call_factory(calls))
+    journal = CheckpointJournal(ckpt, resume=True)
+    assert len(journal) == 4
+    write_outputs(process_all_inputs(str(inp), journal=journal), str(tmp_path / "out.json"))
+    journal.close()
+    assert calls == ["line4", "line5"]
+    assert (tmp_path / "out.json").read_bytes() == (tmp_path / "ref.json").read_bytes()
+
+
+def test_journal_ignores_torn_entry_and_changed_lines(tmp_path):
+    ckpt = tmp_path / "j.ckpt"
+    j = CheckpointJournal(str(ckpt))
+    j.record(0, "a", [{"material_name": "A"}])
+    j.close()
+    with open(ckpt, "a", encoding="utf-8") as f:
+        f.write('{"i": 1, "h": "trunc')
+
+    j = CheckpointJournal(str(ckpt), resume=True)
+    assert j.lookup(0, "a") == [{"material_name": "A"}]
+    assert j.lookup(0, "edited line") is None
+    assert j.lookup(1, "b") is None
+    j.record(1, "b", [])
+    j.close()
+    assert CheckpointJournal(str(ckpt), resume=True).lookup(1, "b") == []
+
+
+def test_fallback_lines_are_not_journaled_and_resume_retries_them(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("line0\nline1\nline2\n", encoding="utf-8")
+    ckpt = str(tmp_path / "run.ckpt")
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+
+    def outage(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        if "line1" in prompt:
+            raise ConnectionError("LLM unreachable")
+        return _fake_call_factory([])(prompt, model, max_tokens, retry_with_correction)
+
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", outage)
+    journal = CheckpointJournal(ckpt)
+    assert [r["material_name"] for r in process_all_inputs(str(inp), journal=journal)] == ["line0", None, "line2"]
+    journal.close()
+
+    calls = []
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", _fake_call_factory(calls))
+    journal = CheckpointJournal(ckpt, resume=True)
+    assert len(journal) == 2
+    assert [r["material_name"] for r in process_all_inputs(str(inp), journal=journal)] == ["line0", "line1", "line2"]
+    journal.close()
+    assert calls == ["line1"]
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ai_structurer.columnar import from_columns, process_records, to_columns
+from ai_structurer.schema import enforce_schema_columns, enforce_schema_many
+from ai_structurer.utils import process_record
+
+
+def _corpus(now):
+    offsets = [-3, -1, 0, 1, 6, 7, 8, 9, 29, 30, 31, 32, 400]
+    objs = [{"material_name": "Screws", "quantity": "20", "deadline": (now + timedelta(days=d)).date().isoformat()} for d in offsets]
+    objs += [
+        {"deadline": "2026-02-30"},  # impossible date kept by the schema's regex fallback
+        {"deadline": "0000-01-01"},
+        {"deadline": "next month"},
+        {"deadline": None, "urgency": "HIGH"},
+        {"deadline": "2026-01-15", "urgency": "critical", "extra": 1},
+        {},
+    ]
+    return objs
+
+
+@pytest.mark.parametrize("now", [datetime(2026, 3, 10, 0, 0), datetime(2026, 3, 10, 23, 59, 59, 999999)])
+def test_process_records_matches_process_record(now):
+    objs = _corpus(now)
+    assert process_records(objs, now) == [process_record(o, now) for o in objs]
+
+
+def test_columns_round_trip():
+    objs = _corpus(datetime(2026, 3, 10, 12))
+    columns = to_columns(objs)
+    assert columns == enforce_schema_columns(objs)
+    assert from_columns(columns) == enforce_schema_many(objs)
+    assert from_columns(to_columns([])) == []
@@ -0,0 +1,40 @@
+from ai_structurer.dedup import Deduper, normalize_line
+from ai_structurer.runner import process_all_inputs
+
+
+def test_normalize_line_ignores_case_spacing_punctuation_and_courtesy():
+    assert normalize_line("Need 20 boxes of screws!!") == normalize_line("  need 20 boxes of screws, thanks")
+    assert normalize_line("Need 20 boxes") != normalize_line("Need 30 boxes")
+
+
+def test_near_duplicates_are_opt_in_and_keep_numbers_apart():
+    exact = Deduper()
+    assert exact.key("Need 20 boxes of screws for Phoenix") != exact.key("Need 20 box of screws for Phoenix")
+
+    near = Deduper(near_threshold=0.6)
+    a = near.key("Need 20 boxes of screws for Project Phoenix")
+    assert near.key("Need 20 boxes of screw for Project Phoenix") == a
+    assert near.key("Need 30 boxes of screws for Project Phoenix") != a
+    assert near.lines == 3 and near.groups == 2
+
+
+def test_runner_dedup_fans_results_out_in_order(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("Need 20 boxes of screws\nOrder 5 tiles\nneed 20 boxes of screws, thanks!\n", encoding="utf-8")
+    prompts = []
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        prompts.append(prompt)
+        if "tiles" in prompt:
+            return '[{"material_name": "tiles", "quantity": 5}]'
+        return '[{"material_name": "screws", "quantity": 20}]'
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+    dedup = Deduper()
+    records = process_all_inputs(str(inp), concurrency=2, dedup=dedup)
+
+    assert len(prompts) == 2
+    assert [r["material_name"] for r in records] == ["screws", "tiles", "screws"]
+    assert records[0] is not records[2]
+    assert dedup.stats_line() == "dedup: 3 lines -> 2 extractions (33.3% saved)"
@@ -0,0 +1,100 @@
+import pytest
+from ai_structurer import llm
+from ai_structurer.llm import GroqClient, GroqError, call_groq_llm
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+        self.text = str(self._payload)
+
+    def json(self):
+        return self._payload
+
+    def close(self):
+        pass
+
+
+def _client_with(responses, monkeypatch, **kwargs):
+    client = GroqClient(api_url="http://stub", api_key="k", **kwargs)
+    calls = []
+
+    def fake_post(url, json=None, headers=None, timeout=None, stream=False):
+        calls.append({"url": url, "json": json, "timeout": timeout})
+        return responses.pop(0)
+
+    monkeypatch.setattr(client.session, "post", fake_post)
+    return client, calls
+
+
+def test_client_retries_transient_status_honouring_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm.time, "sleep", sleeps.append)
+    ok = FakeResponse(200, {"choices": [{"text": '[{"material_name": "Screws"}]'}]})
+    client, calls = _client_with(
+        [FakeResponse(429, headers={"Retry-After": "2"}), FakeResponse(503), ok],
+        monkeypatch,
+        connect_timeout=1.5,
+        read_timeout=9,
+    )
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+
+    text = call_groq_llm("p", model="m", client=client)
+    assert "Screws" in text
+    assert len(calls) == 3
+    assert calls[0]["url"] == "http://stub/m/completions"
+    assert calls[0]["timeout"] == (1.5, 9)
+    assert sleeps[0] == 2.0
+    assert 0 <= sleeps[1] <= client.backoff_base * 2
+
+
+def test_client_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(llm.time, "sleep", lambda s: None)
+    client, calls = _client_with([FakeResponse(503)] * 3, monkeypatch, max_retries=2)
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+
+    with pytest.raises(GroqError):
+        call_groq_llm("p", client=client)
+    assert len(calls) == 3
+
+
+def test_non_transient_status_not_retried(monkeypatch):
+    client, calls = _client_with([FakeResponse(400)], monkeypatch)
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+
+    with pytest.raises(GroqError):
+        call_groq_llm("p", client=client)
+    assert len(calls) == 1
+
+
+def test_stream_complete_parses_sse(monkeypatch):
+    from ai_structurer.llm import stream_groq_llm
+
+    lines = [
+        'data: {"choices": [{"text": "[{\\"a\\""}]}',
+        "",
+        ": keep-alive",
+        'data: {"choices": [{"text": ": 1}]"}]}',
+        "data: [DONE]",
+    ]
+    resp = FakeResponse(200)
+    resp.iter_lines = lambda decode_unicode=False: iter(lines)
+    client, calls = _client_with([resp], monkeypatch)
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+
+    assert "".join(stream_groq_llm("p", client=client)) == '[{"a": 1}]'
+    assert calls[0]["json"]["stream"] is True
+
+
+def test_client_deadline_cuts_read_timeout_and_stops_retries(monkeypatch):
+    monkeypatch.setattr(llm.time, "sleep", lambda s: None)
+    client, calls = _client_with([FakeResponse(503)] * 3, monkeypatch, read_timeout=60)
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr(client, "_backoff", lambda attempt: 10.0)
+
+    with pytest.raises(GroqError, match="deadline"):
+        call_groq_llm("p", client=client, deadline=llm.time.monotonic() + 2)
+    assert len(calls) == 1  # the 10s backoff would overrun the deadline
+    assert calls[0]["timeout"][1] <= 2
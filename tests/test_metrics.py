@@ -0,0 +1,43 @@
+from ai_structurer import metrics
+from ai_structurer.runner import process_all_inputs
+
+
+def test_disabled_metrics_are_noops():
+    metrics.disable()
+    metrics.incr("x")
+    with metrics.timer("y"):
+        pass
+    assert metrics.get() is None
+
+
+def test_runner_reports_stages_and_exports(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("good\nbad\n", encoding="utf-8")
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        if "Text: good" in prompt:
+            return 'Here you go: [{"material_name": "Screws",}]'
+        return "garbage"
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+    registry = metrics.enable()
+    try:
+        process_all_inputs(str(inp))
+    finally:
+        metrics.disable()
+
+    summary = registry.to_json()
+    assert summary["counters"]["runner_corrections"] == 1
+    assert summary["counters"]["fallbacks"] == 1
+    assert summary["counters"]["local_repairs"] == 3
+    assert summary["counters"]["local_repair_failures"] == 2
+    assert summary["stages"]["line"]["count"] == 2
+
+    prom = registry.to_prometheus()
+    assert "ai_structurer_fallbacks_total 1" in prom
+    assert 'ai_structurer_line_seconds_bucket{le="+Inf"} 2' in prom
+
+    registry.write(str(tmp_path / "m.json"))
+    registry.write(str(tmp_path / "m.prom"))
+    assert (tmp_path / "m.prom").read_text().startswith("# TYPE")
@@ -7,3 +7,48 @@ def test_parse_and_repair_fails_locally():
     out = parse_and_repair_json(bad)
     # Parser should return None when it cannot repair locally; caller (runner) applies fallback
     assert out is None
+
+
+def test_parse_batched_response_partial():
+    from ai_structurer.parser import parse_batched_response
+
+    raw = 'Sure: {"1": [{"material_name": "Screws", "quantity": 20}], "3": "oops", "7": [{"material_name": "x"}]}'
+    out = parse_batched_response(raw, 3)
+    assert out[0][0]["material_name"] == "Screws"
+    assert out[1] is None
+    assert out[2] is None
+
+
+def test_parse_batched_response_index_list():
+    from ai_structurer.parser import parse_batched_response
+
+    raw = '[{"index": 2, "records": [{"material_name": "Paint"}]}, {"index": 1, "records": {"material_name": "Cement"}}]'
+    out = parse_batched_response(raw, 2)
+    assert out[0][0]["material_name"] == "Cement"
+    assert out[1][0]["material_name"] == "Paint"
+
+
+def test_iter_stream_records_yields_as_objects_close():
+    from ai_structurer.parser import iter_stream_records
+
+    seen = []
+
+    def deltas():
+        for piece in ['[{"material_name": "Sc', 'rews", "quantity": 20}', ', {"material_name": "Nails"}', "] and then", " some prose"]:
+            seen.append(piece)
+            yield piece
+
+    out = []
+    for rec in iter_stream_records(deltas()):
+        out.append((rec["material_name"], len(seen)))
+    assert out == [("Screws", 2), ("Nails", 3)]
+    # The stream is not read past the closing bracket
+    assert len(seen) == 4
+
+
+def test_iter_stream_records_aborts_on_invalid_output():
+    import pytest
+    from ai_structurer.parser import StreamAborted, iter_stream_records
+
+    with pytest.raises(StreamAborted):
+        list(iter_stream_records(iter(['[{"a": 1}', "}"])))
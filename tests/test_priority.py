@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from ai_structurer.priority import PriorityScheduler
+from ai_structurer.runner import iter_prioritized, process_all_inputs
+
+NOW = datetime(2026, 1, 1)
+LINES = [
+    "Need 10 boxes of screws, no rush",
+    "Order 20 packs of tiles by 2026-03-30",
+    "Cement 50 kg at Site A, deliver tomorrow",
+    "Paint needed soon at Yard B",
+    "Plywood 12 sheets, deadline 2026-01-05",
+    "URGENT: 5 liters of paint",
+    "Wire 30 meters by 2026-01-20",
+]
+
+
+def test_classify_keywords_and_dates():
+    s = PriorityScheduler(NOW)
+    assert [s.classify(line) for line in LINES] == ["low", "low", "high", "medium", "high", "high", "medium"]
+    assert s.classify("Sand 3 bags within 5 days") == "high"
+    assert s.classify("Overdue: 3 pallets by 2025-12-01") == "high"
+
+
+def test_iter_prioritized_dispatches_urgent_first_and_reports(monkeypatch):
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+    scheduler = PriorityScheduler(NOW)
+    out = list(iter_prioritized(LINES, scheduler, batch_size=2))
+    assert [(i, cls) for i, cls, _ in out] == [(2, "high"), (4, "high"), (5, "high"), (3, "medium"), (6, "medium"), (0, "low"), (1, "low")]
+
+    report = scheduler.report()
+    assert {p: r["lines"] for p, r in report.items()} == {"high": 3, "medium": 2, "low": 2}
+    assert report["high"]["max_s"] <= report["low"]["max_s"]
+    assert scheduler.stats_line().startswith("priority: high 3 lines")
+
+
+def test_process_all_inputs_with_priority_keeps_input_order(monkeypatch, tmp_path):
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+    inp = tmp_path / "in.txt"
+    inp.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    assert process_all_inputs(str(inp), priority=PriorityScheduler(NOW), concurrency=3) == process_all_inputs(str(inp))
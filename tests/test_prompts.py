@@ -0,0 +1,50 @@
+from ai_structurer import metrics, prompts
+from ai_structurer.llm import GroqClient
+from ai_structurer.runner import process_all_inputs
+from stub_llm import StubConfig, StubLLMServer
+
+
+def test_estimate_items_counts_quantities_not_dates_or_places():
+    assert prompts.estimate_items("Need 20 boxes of screws for Project 7, Warehouse 12 by 2026-01-15") == 1
+    assert prompts.estimate_items("Need 2 bags of cement, 5 kg nails and two pallets of bricks") == 3
+    assert prompts.estimate_items("Can you get PCs for the office?") == 1
+
+
+def test_prompts_share_a_fixed_prefix_and_size_budgets():
+    a, b = prompts.line_prompt("Need 20 boxes of screws"), prompts.line_prompt("Need 2 bags of cement, 5 kg nails and 3 m pipe")
+    preamble = a.text.split("Text: ")[0]
+    assert b.text.startswith(preamble) and len(preamble) < 260
+    assert prompts.FULL_MAX_TOKENS > b.max_tokens > a.max_tokens >= 128
+    assert prompts.correction_prompt("x").max_tokens == prompts.FULL_MAX_TOKENS
+    batch = prompts.batch_prompt(["Need 20 boxes of screws", "Order 5 tiles"])
+    assert "[2] Order 5 tiles" in batch.text and batch.lines == 2
+
+
+def test_full_style_keeps_original_prompt(monkeypatch):
+    monkeypatch.setattr(prompts, "_style", "full")
+    monkeypatch.setattr(prompts, "_adaptive", False)
+    p = prompts.line_prompt("beta")
+    assert p.text.startswith("Extract structured data from the following business text line. Return a strictly valid JSON array")
+    assert p.text.endswith("\n\nText: beta\n") and p.max_tokens == 2048
+
+
+def test_cut_off_answer_retries_with_full_budget(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("Need 20 boxes of screws\n", encoding="utf-8")
+    # 40 records per answer do not fit the budget sized for a one-item line
+    cfg = StubConfig(records_per_response=40)
+    metrics.enable()
+    try:
+        with StubLLMServer(cfg) as stub:
+            monkeypatch.setattr("ai_structurer.llm._default_client", GroqClient(api_url=stub.url, api_key="k"))
+            monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+            records = process_all_inputs(str(inp))
+        counters = metrics.get().counters
+    finally:
+        metrics.disable()
+    assert len(records) == 40
+    assert counters["llm_budget_retries"] == 1 and cfg.requests == 2
+    assert counters["llm_lines"] == 1 and 0 < counters["max_tokens_requested"] < 2048
+    # Real provider usage of both calls (the cut-off answer and the full-budget retry)
+    assert counters["llm_prompt_tokens"] > 0 and counters["llm_completion_tokens"] > 0
+    assert "prompt_tokens" not in counters and "llm_usage_missing" not in counters
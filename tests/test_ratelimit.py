@@ -0,0 +1,80 @@
+from ai_structurer import ratelimit
+from ai_structurer.ratelimit import RateLimiter, TokenBucket
+
+
+def test_token_bucket_wait_time():
+    b = TokenBucket(60)  # one per second
+    now = b.updated
+    assert b.wait_time(60, now) == 0.0
+    b.take(60)
+    assert abs(b.wait_time(2, now) - 2.0) < 1e-9
+    assert b.wait_time(2, now + 2) == 0.0
+
+
+def test_aimd_halves_on_throttle_and_ramps_up(monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now["t"])
+    lim = RateLimiter(max_concurrency=16, min_concurrency=1)
+    assert lim.concurrency == 8
+
+    lim.acquire()
+    lim.release(429, 0.1)
+    assert lim.concurrency == 4
+
+    for _ in range(40):
+        lim.acquire()
+        lim.release(200, 0.1)
+    assert lim.concurrency > 4
+    assert lim.throttled == 1
+
+
+def test_aimd_shrinks_only_on_throttle_statuses(monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now["t"])
+    lim = RateLimiter(max_concurrency=16, min_concurrency=1)
+    for status in (500, 502, 504):
+        lim.acquire()
+        lim.release(status, 0.1)
+    assert lim.concurrency == 8 and lim.throttled == 0
+
+    lim.acquire()
+    lim.release(503, 0.1)
+    assert lim.concurrency == 4 and lim.throttled == 1
+
+
+def test_aimd_backs_off_on_latency_rise(monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now["t"])
+    lim = RateLimiter(max_concurrency=8)
+    for _ in range(5):
+        lim.acquire()
+        lim.release(200, 0.1)
+    before = lim.limit
+    for _ in range(10):
+        now["t"] += 10
+        lim.acquire()
+        lim.release(200, 2.0)
+    assert lim.limit < before
+
+
+def test_client_reports_to_limiter(monkeypatch):
+    from ai_structurer import llm
+    from ai_structurer.llm import GroqClient
+
+    class Resp:
+        status_code = 200
+        headers = {}
+        text = ""
+
+        def json(self):
+            return {"choices": [{"text": "[{}]"}]}
+
+    lim = RateLimiter(requests_per_minute=600, tokens_per_minute=100000, max_concurrency=2, adaptive=False)
+    client = GroqClient(api_url="http://stub", api_key="k", limiter=lim)
+    monkeypatch.setattr(client.session, "post", lambda *a, **kw: Resp())
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+
+    llm.call_groq_llm("x" * 400, client=client, max_tokens=100)
+    assert lim.in_flight == 0
+    assert lim.request_bucket.tokens < 600
+    assert lim.token_bucket.tokens <= 100000 - 200
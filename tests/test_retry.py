@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from ai_structurer import metrics, retry
+from ai_structurer.retry import RetryPolicy
+from ai_structurer.runner import process_all_inputs
+
+
+@pytest.fixture(autouse=True)
+def default_policy():
+    yield
+    retry.configure_retries()
+
+
+def test_runner_spends_at_most_max_attempts_calls_per_line(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("bad line\n", encoding="utf-8")
+    calls = []
+
+    def always_bad(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        calls.append(retry_with_correction)
+        return "garbage"
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", always_bad)
+
+    records = process_all_inputs(str(inp))
+    assert records[0]["material_name"] is None
+    assert calls == [False, False]  # first prompt + one correction, no hidden llm-level retries
+
+    calls.clear()
+    retry.configure_retries(max_attempts=3)
+    process_all_inputs(str(inp))
+    assert len(calls) == 3
+
+
+def test_hedge_takes_the_first_valid_answer():
+    state = {"n": 0}
+
+    def attempt(deadline):
+        state["n"] += 1
+        if state["n"] == 1:
+            time.sleep(0.5)  # stalled first copy
+        return ["ok"]
+
+    registry = metrics.enable()
+    try:
+        policy = RetryPolicy(hedge=True, hedge_after=0.02)
+        start = time.monotonic()
+        assert policy.run([attempt]) == ["ok"]
+        assert time.monotonic() - start < 0.3
+        assert registry.counters["hedged_requests"] == 1
+        assert registry.counters["hedge_wins"] == 1
+    finally:
+        metrics.disable()
+        policy.close()
+
+
+def test_deadline_gives_up_on_slow_attempts():
+    seen = []
+
+    def slow(deadline):
+        # Like an HTTP call whose read timeout was cut to the time left
+        seen.append(deadline)
+        time.sleep(max(0.0, min(0.3, deadline - time.monotonic())))
+        raise TimeoutError("read timed out")
+
+    policy = RetryPolicy(deadline=0.05)
+    start = time.monotonic()
+    assert policy.run([slow, slow]) is None
+    assert time.monotonic() - start < 0.2
+    assert len(seen) == 1 and seen[0] is not None
+    policy.close()
+
+
+@pytest.mark.parametrize("hedge", [False, True])
+def test_attempts_do_not_queue_behind_other_lines(hedge):
+    # 64 lines in flight, each attempt taking 0.3s of a 0.6s deadline: none may
+    # wait for a pool thread (a 32-thread pool made half of them fall back)
+    policy = RetryPolicy(deadline=0.6, hedge=hedge, hedge_after=5.0, concurrency=64)
+
+    def attempt(deadline):
+        time.sleep(0.3)
+        return ["ok"]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=64) as lines:
+        results = list(lines.map(lambda _: policy.run([attempt]), range(64)))
+    policy.close()
+    assert results == [["ok"]] * 64
+
+
+def test_hedge_delay_follows_observed_quantile():
+    policy = RetryPolicy(hedge=True, min_samples=20)
+    for _ in range(19):
+        policy.observe(0.5)
+    assert policy.hedge_delay() is None  # not enough samples yet
+    for i in range(1, 101):
+        policy.observe(i / 100)
+    assert 0.9 <= policy.hedge_delay() <= 1.0
+    assert RetryPolicy(hedge=False).hedge_delay() is None
@@ -0,0 +1,47 @@
+from ai_structurer.rules import RuleExtractor, extract_by_rules
+from ai_structurer.runner import process_all_inputs
+
+
+def test_extract_by_rules_simple_line():
+    records, confidence = extract_by_rules(
+        "Need 20 boxes of screws for Project Phoenix, deliver to Warehouse 12 by 2099-01-15, urgent"
+    )
+    assert confidence == 1.0
+    assert records == [
+        {
+            "material_name": "screws",
+            "quantity": 20.0,
+            "unit": "boxes",
+            "project_name": "Phoenix",
+            "location": "Warehouse 12",
+            "urgency": "high",
+            "deadline": "2099-01-15",
+        }
+    ]
+
+
+def test_extract_by_rules_low_confidence_cases():
+    # Several items, relative dates and unmatched shapes are left to the LLM
+    assert extract_by_rules("Need 2 bags of cement and 5 kg nails for Site A")[1] < 0.9
+    assert extract_by_rules("Need 40 sheets of plywood by tomorrow")[1] < 0.9
+    assert extract_by_rules("Can you get 3 PCs for the new office?") == (None, 0.0)
+
+
+def test_runner_fast_path_bypasses_llm(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("Need 20 boxes of screws for Project Phoenix\nCan you get 3 PCs for the new office?\n", encoding="utf-8")
+    prompts = []
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        prompts.append(prompt)
+        return '[{"material_name": "PC", "quantity": 3, "unit": "units"}]'
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+    rules = RuleExtractor()
+
+    records = process_all_inputs(str(inp), rules=rules, batch_size=2)
+    assert [r["material_name"] for r in records] == ["screws", "PC"]
+    assert len(prompts) == 1 and "3 PCs" in prompts[0]
+    assert rules.bypassed == 1 and rules.attempted == 2
+    assert "1/2" in rules.stats_line()
@@ -46,3 +46,137 @@ def test_process_all_inputs_final_fallback(monkeypatch):
         assert r["material_name"] is None
         assert r["quantity"] is None
         assert r["urgency"] is None or r["urgency"] == "low"
+
+
+def test_process_all_inputs_concurrent_preserves_order(monkeypatch, tmp_path):
+    import time
+
+    inp = tmp_path / "in.txt"
+    inp.write_text("\n".join(f"line {i}" for i in range(8)), encoding="utf-8")
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        # Later lines answer faster, so completion order differs from input order
+        n = int(prompt.split("Text: line ")[1].split()[0])
+        time.sleep(0.01 * (8 - n))
+        return f'[{{"material_name":"M{n}","quantity":{n},"unit":"pcs"}}]'
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+
+    records = process_all_inputs(str(inp), concurrency=4)
+    assert [r["material_name"] for r in records] == [f"M{i}" for i in range(8)]
+
+
+def test_iter_line_results_yields_finished_lines_while_input_waits(monkeypatch):
+    import threading
+    import time
+
+    from ai_structurer.runner import iter_line_results
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+    more = threading.Event()
+
+    def lines():
+        # Like --follow: the next line is not there until more is set
+        yield "Need 10 boxes of screws"
+        more.wait(5)
+        yield "Order 5 bags of cement"
+
+    results = iter_line_results(lines(), concurrency=4)
+    start = time.monotonic()
+    first = next(results)
+    assert time.monotonic() - start < 2 and first[0]["material_name"]
+    more.set()
+    assert len(list(results)) == 1
+
+
+def test_process_all_inputs_batched_falls_back_per_line(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("alpha\nbeta\ngamma\n", encoding="utf-8")
+    prompts = []
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        prompts.append(prompt)
+        if "Lines:" in prompt:
+            # Batched answer omits line 2
+            return '{"1": [{"material_name": "A"}], "3": [{"material_name": "C"}]}'
+        return '[{"material_name": "B"}]'
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+
+    records = process_all_inputs(str(inp), batch_size=3)
+    assert [r["material_name"] for r in records] == ["A", "B", "C"]
+    assert len(prompts) == 2
+    assert "Text: beta" in prompts[1]
+
+
+def test_stream_outputs_json_matches_write_outputs(tmp_path, monkeypatch):
+    from ai_structurer.runner import iter_records, stream_outputs, write_outputs
+    from ai_structurer.utils import iter_inputs
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+    records = process_all_inputs("test_inputs.txt")
+    write_outputs(records, str(tmp_path / "a.json"))
+    n = stream_outputs(iter_records(iter_inputs("test_inputs.txt"), concurrency=2), str(tmp_path / "b.json"), fmt="json")
+    assert n == len(records)
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
+
+    stream_outputs([], str(tmp_path / "empty.json"), fmt="json")
+    assert (tmp_path / "empty.json").read_text() == "[]"
+
+
+def test_stream_outputs_ndjson(tmp_path):
+    import json
+    from ai_structurer.runner import stream_outputs
+
+    recs = [{"material_name": "A"}, {"material_name": "B"}]
+    stream_outputs(iter(recs), str(tmp_path / "o.ndjson"), fmt="ndjson")
+    lines = (tmp_path / "o.ndjson").read_text().splitlines()
+    assert [json.loads(x) for x in lines] == recs
+
+
+def test_process_all_inputs_streaming_aborts_and_retries(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("good\nbad\n", encoding="utf-8")
+    consumed = []
+
+    def fake_stream(prompt, model="", max_tokens=2048):
+        if "Text: good" in prompt:
+            pieces = ['[{"material_name": "Screws"}', "]"]
+        else:
+            pieces = ["[{", '"a": 1]', " never read", " never read"]
+        for p in pieces:
+            consumed.append(p)
+            yield p
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        assert retry_with_correction is False and "previous response was invalid" in prompt
+        return '[{"material_name": "Paint"}]'
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.stream_groq_llm", fake_stream)
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+
+    records = process_all_inputs(str(inp), stream=True)
+    assert [r["material_name"] for r in records] == ["Screws", "Paint"]
+    assert "never read" not in consumed
+
+
+def test_process_all_inputs_stream_dropped_midway_is_a_failed_attempt(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("two items\n", encoding="utf-8")
+
+    def dropped_stream(prompt, model="", max_tokens=2048):
+        yield '[{"material_name": "Screws"}, '
+        raise ConnectionError("connection reset mid-stream")
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        return '[{"material_name": "Screws"}, {"material_name": "Paint"}]'
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.stream_groq_llm", dropped_stream)
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+
+    records = process_all_inputs(str(inp), stream=True)
+    assert [r["material_name"] for r in records] == ["Screws", "Paint"]
@@ -41,3 +41,63 @@ def test_infer_urgency_from_deadline():
 
     d2 = (datetime.now() + timedelta(days=15)).date().isoformat()
     assert infer_urgency_from_deadline(d2) == "medium"
+
+
+def test_iter_inputs_follow_picks_up_appended_lines(tmp_path):
+    import threading
+    import time
+    from ai_structurer.utils import iter_inputs
+
+    p = tmp_path / "in.txt"
+    p.write_text("first\n\n", encoding="utf-8")
+
+    def append():
+        time.sleep(0.05)
+        with open(p, "a", encoding="utf-8") as f:
+            f.write("sec")
+            f.flush()
+            time.sleep(0.05)
+            f.write("ond\n")
+
+    t = threading.Thread(target=append)
+    t.start()
+    lines = list(iter_inputs(str(p), follow=True, poll_interval=0.01, idle_timeout=0.3))
+    t.join()
+    assert lines == ["first", "second"]
+
+
+def test_enforce_schema_many_matches_single_and_edge_dates():
+    from ai_structurer.schema import enforce_schema_many
+
+    objs = [
+        {"deadline": "2026-02-30", "quantity": "1,200"},
+        {"deadline": "January 15, 2026", "quantity": "approx 30", "urgency": "Medium"},
+        {"deadline": "next month", "quantity": True, "material_name": 42},
+        {"deadline": "2026-01-15T10:00:00", "urgency": "critical"},
+    ]
+    out = enforce_schema_many(objs)
+    assert out == [enforce_schema(o) for o in objs]
+    assert [o["deadline"] for o in out] == ["2026-02-30", "2026-01-15", None, "2026-01-15"]
+    assert [o["quantity"] for o in out] == [1200.0, 30.0, 1.0, None]
+    assert out[1]["urgency"] == "medium" and out[3]["urgency"] is None
+    assert out[2]["material_name"] == "42"
+
+
+def test_attempt_local_json_repair_picks_balanced_candidate():
+    text = 'Sure! See [the] notes: [{"material_name": "x]y", }, {\'unit\': "it\'s"}] and (also) [1]'
+    repaired = attempt_local_json_repair(text)
+    assert repaired == [{"material_name": "x]y"}, {"unit": "it's"}]
+
+
+def test_attempt_local_json_repair_recovers_truncated_array():
+    text = '[{"material_name": "Screws"}, {"material_name": "Nails", "quantity": None,}, {"material_name": "Pa'
+    repaired = attempt_local_json_repair(text)
+    assert repaired == [{"material_name": "Screws"}, {"material_name": "Nails", "quantity": None}]
+
+
+def test_attempt_local_json_repair_unbalanced_input_is_fast():
+    import time
+
+    start = time.perf_counter()
+    assert attempt_local_json_repair("[" * 50000 + " no json") is None
+    assert time.perf_counter() - start < 2.0
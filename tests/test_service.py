@@ -0,0 +1,77 @@
+import json
+import socket
+
+import pytest
+import requests
+
+from ai_structurer.llm import GroqClient
+from ai_structurer.runner import process_all_inputs
+from ai_structurer.service import ExtractionService
+from stub_llm import StubConfig, StubLLMServer
+
+LINES = ["Need 20 boxes of screws", "Order 5 tiles", "Need 3 bags of cement", "Need 7 kg nails"]
+
+
+def test_service_matches_cli_records_and_coalesces(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    cfg = StubConfig(records_per_response=1)
+
+    with StubLLMServer(cfg) as stub:
+        monkeypatch.setattr("ai_structurer.llm._default_client", GroqClient(api_url=stub.url, api_key="k"))
+        monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+        expected = process_all_inputs(str(inp))
+        calls_before = cfg.requests
+
+        with ExtractionService(port=0, batch_size=8, batch_window=0.05) as service:
+            body = "".join(json.dumps({"line": line}) + "\n" for line in LINES)
+            resp = requests.post(f"{service.url}/extract", data=body, headers={"Content-Type": "application/x-ndjson"})
+            single = requests.post(f"{service.url}/extract", json={"line": LINES[1]}).json()
+            bad = requests.post(f"{service.url}/extract", json={"text": "x"})
+            health = requests.get(f"{service.url}/health").json()
+
+    assert resp.status_code == 200
+    per_line = [json.loads(x)["records"] for x in resp.text.splitlines()]
+    assert [r for recs in per_line for r in recs] == expected
+    assert single["records"] == per_line[1]
+    # The four NDJSON lines went out as one batched prompt, the single line as another
+    assert cfg.requests - calls_before == 2
+    assert bad.status_code == 400
+    assert health["lines"] == 5 and health["batches"] == 2
+
+
+def test_concurrent_requests_share_a_batch(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+    with ExtractionService(port=0, batch_size=4, batch_window=0.5) as service:
+        with ThreadPoolExecutor(4) as pool:
+            replies = list(pool.map(lambda line: requests.post(f"{service.url}/extract", json={"line": line}).json(), LINES))
+        health = requests.get(f"{service.url}/health").json()
+
+    assert all(len(r["records"]) == 1 for r in replies)
+    assert health["batches"] == 1 and health["lines"] == 4
+
+
+def test_service_rejects_oversized_body_with_413(monkeypatch):
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+    with ExtractionService(port=0, max_body=64) as service:
+        big = requests.post(f"{service.url}/extract", json={"line": "x" * 100})
+        ok = requests.post(f"{service.url}/extract", json={"line": "Need 2 boxes of screws"})
+        health = requests.get(f"{service.url}/health").json()
+
+    assert big.status_code == 413
+    assert ok.status_code == 200
+    assert health["lines"] == 1
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3"])
+def test_service_rejects_invalid_content_length_with_400(monkeypatch, length):
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+    with ExtractionService(port=0) as service:
+        with socket.create_connection((service.host, service.port), timeout=5) as sock:
+            sock.sendall(f"POST /extract HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n".encode("latin-1"))
+            reply = sock.makefile("rb").read()
+
+    assert reply.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+    assert b"Connection: close" in reply and b"invalid Content-Length" in reply
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from ai_structurer.cli import main
+from ai_structurer.shard import LineIndex, merge_shards, parse_shard, shard_range, write_shard
+from ai_structurer.utils import load_inputs
+
+
+def test_line_index_matches_load_inputs(tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_bytes("first\n\n   \n  second line  \r\n \nthird é\nlast".encode("utf-8"))
+    index = LineIndex(str(inp))
+    assert list(index.iter_lines()) == load_inputs(str(inp))
+    assert list(index.iter_lines(1, 3)) == ["second line", "third é"]
+
+    empty = tmp_path / "empty.txt"
+    empty.write_text("", encoding="utf-8")
+    assert len(LineIndex(str(empty))) == 0
+
+
+def test_shard_ranges_cover_all_lines():
+    assert [shard_range(10, i, 3) for i in range(3)] == [(0, 3), (3, 6), (6, 10)]
+    assert parse_shard("2/4") == (2, 4)
+    with pytest.raises(ValueError):
+        parse_shard("4/4")
+
+
+def test_merge_restores_order_and_rejects_gaps(tmp_path):
+    paths = []
+    for i, (start, stop) in enumerate([(0, 2), (2, 3)]):
+        path = str(tmp_path / f"s{i}")
+        write_shard(path, ([{"n": k}] for k in range(start, stop)), i, 2, start, stop, 3)
+        paths.append(path)
+    assert [r["n"] for r in merge_shards(paths[::-1])] == [0, 1, 2]
+    with pytest.raises(ValueError, match="cover 2 of 3"):
+        merge_shards(paths[:1])
+
+
+def test_cli_shards_merge_to_same_output(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("Order 1 pipe\n\nOrder 2 pipes\nOrder 3 pipes\n", encoding="utf-8")
+
+    def fake_call(prompt, model="", max_tokens=2048, retry_with_correction=True):
+        qty = prompt.split("Order ")[-1].split(" ")[0]
+        return json.dumps([{"material_name": "pipe", "quantity": int(qty), "unit": "pcs"}])
+
+    monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+    monkeypatch.setattr("ai_structurer.runner.call_groq_llm", fake_call)
+    main(["-i", str(inp), "-o", str(tmp_path / "full.json"), "--no-cache"])
+    shards = [str(tmp_path / f"s{i}") for i in range(2)]
+    for i, path in enumerate(shards):
+        main(["-i", str(inp), "-o", path, "--no-cache", "--shard", f"{i}/2"])
+    main(["merge", *shards, "-o", str(tmp_path / "merged.json")])
+
+    merged = (tmp_path / "merged.json").read_text(encoding="utf-8")
+    assert merged == (tmp_path / "full.json").read_text(encoding="utf-8")
+    assert [r["quantity"] for r in json.loads(merged)] == [1, 2, 3]
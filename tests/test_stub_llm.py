@@ -0,0 +1,35 @@
+from ai_structurer.llm import GroqClient
+from ai_structurer.runner import process_all_inputs
+from stub_llm import StubConfig, StubLLMServer
+
+
+def test_pipeline_against_stub_with_throttling(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("".join(f"Need {i} boxes of screws\n" for i in range(20)), encoding="utf-8")
+    cfg = StubConfig(rate_429=0.2, retry_after=0, records_per_response=2, seed=1)
+
+    with StubLLMServer(cfg) as server:
+        client = GroqClient(api_url=server.url, api_key="k", max_retries=10, backoff_base=0.001)
+        monkeypatch.setattr("ai_structurer.llm._default_client", client)
+        monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+        records = process_all_inputs(str(inp), concurrency=4)
+
+    assert len(records) == 40
+    assert all(r["material_name"] is not None for r in records)
+    assert cfg.statuses.get(429, 0) > 0
+    assert cfg.statuses[200] == 20
+
+
+def test_stub_streams_and_batches(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("alpha\nbeta\ngamma\n", encoding="utf-8")
+
+    with StubLLMServer(StubConfig()) as server:
+        client = GroqClient(api_url=server.url, api_key="k")
+        monkeypatch.setattr("ai_structurer.llm._default_client", client)
+        monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "0")
+        streamed = process_all_inputs(str(inp), stream=True)
+        batched = process_all_inputs(str(inp), batch_size=3)
+
+    assert streamed == batched
+    assert len(streamed) == 3
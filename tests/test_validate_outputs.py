@@ -0,0 +1,92 @@
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "validate_outputs.py"
+
+
+@pytest.fixture(scope="module")
+def vo():
+    spec = importlib.util.spec_from_file_location("validate_outputs", _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["validate_outputs"] = module  # worker processes unpickle validate_chunk from here
+    spec.loader.exec_module(module)
+    yield module
+    del sys.modules["validate_outputs"]
+
+
+def _records():
+    good = {"material_name": 'Tiles "{a}, {b}"', "quantity": 20, "unit": "boxes", "project_name": None, "location": "Bay }, {", "urgency": "low", "deadline": "2026-01-01"}
+    recs = [dict(good) for _ in range(40)]
+    recs[3]["quantity"] = "20"
+    recs[7]["urgency"] = "urgent"
+    recs[9]["extra"] = 1
+    recs[13]["unit"] = {"nested": [{"x": 1}, {"y": 2}]}
+    recs[17] = [1, 2]
+    return recs
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("fmt", ["json", "ndjson"])
+def test_collects_every_violation_with_its_index(vo, tmp_path, fmt, workers):
+    recs = _records()
+    path = tmp_path / f"out.{fmt}"
+    path.write_text(json.dumps(recs, indent=2) if fmt == "json" else "".join(json.dumps(r) + "\n" for r in recs), encoding="utf-8")
+
+    # Tiny blocks put chunk cuts everywhere, including next to braces inside strings
+    res = vo.validate_file(str(path), workers=workers, block_chars=64, show=0)
+    assert res["records"] == 40 and res["error"] is None
+    assert res["kinds"] == {"quantity": 1, "urgency": 1, "keys": 1, "unit": 1, "not_object": 1}
+
+
+def test_syntax_errors_are_reported_per_record(vo, tmp_path):
+    path = tmp_path / "bad.json"
+    good = json.dumps(_records()[0])
+    path.write_text(f"[{good},\n {{\"material_name\": oops}},\n {good}\n]", encoding="utf-8")
+    report = tmp_path / "report.ndjson"
+
+    assert vo.main([str(path), "--workers", "1", "--report", str(report)]) == 1
+    rows = [json.loads(line) for line in report.read_text(encoding="utf-8").splitlines()]
+    assert [(r["index"], r["kind"]) for r in rows] == [(1, "syntax")]
+
+    path.write_text(f"[{good},\n {good}", encoding="utf-8")
+    assert vo.main([str(path), "--workers", "1"]) == 2  # unterminated array
+    assert vo.main([str(tmp_path / "missing.json")]) == 2
+
+
+def test_resync_after_broken_element_ignores_separators_in_its_strings(vo, tmp_path):
+    recs = _records()[:4]
+    path = tmp_path / "bad.json"
+    broken = '{"material_name": oops, "location": "Dock \\", {\\"B"}'
+    path.write_text("[" + ",\n".join([json.dumps(recs[0]), broken, json.dumps(recs[1]), json.dumps(recs[2]), broken, json.dumps(recs[3])]) + "]", encoding="utf-8")
+
+    res = vo.validate_file(str(path), show=0)
+    assert res["records"] == 6 and res["error"] is None
+    assert res["kinds"] == {"syntax": 2, "quantity": 1}
+    report = tmp_path / "report.ndjson"
+    with report.open("w", encoding="utf-8") as f:
+        vo.validate_file(str(path), report=f, show=0)
+    rows = [json.loads(line) for line in report.read_text(encoding="utf-8").splitlines()]
+    assert [(r["index"], r["kind"]) for r in rows] == [(1, "syntax"), (4, "syntax"), (5, "quantity")]
+
+
+def test_top_level_object_is_not_read_as_ndjson(vo, tmp_path, capsys):
+    path = tmp_path / "obj.json"
+    path.write_text(json.dumps({"records": _records()[:2]}, indent=2), encoding="utf-8")
+
+    assert vo.main([str(path)]) == 2
+    out = capsys.readouterr().out
+    assert "top level must be a JSON array" in out and "syntax" not in out
+
+
+def test_empty_file_is_an_error(vo, tmp_path, capsys):
+    path = tmp_path / "empty.json"
+    for text in ("", "\n  \n"):
+        path.write_text(text, encoding="utf-8")
+        assert vo.main([str(path)]) == 2
+        assert "the file is empty" in capsys.readouterr().out
+    path.write_text("[]\n", encoding="utf-8")
+    assert vo.main([str(path)]) == 0
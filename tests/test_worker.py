@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_structurer.cli import main
+from ai_structurer.worker import forward
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_cli_runs_in_warm_worker(monkeypatch, tmp_path):
+    inp = tmp_path / "in.txt"
+    inp.write_text("Need 20 boxes of screws\nOrder 5 tiles\n", encoding="utf-8")
+    sock = str(tmp_path / "w.sock")
+    assert forward(sock, ["-i", str(inp)]) is None  # no worker yet: caller runs locally
+
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    worker = subprocess.Popen([sys.executable, "-m", "ai_structurer.cli", "worker", "--socket", sock, "--idle-timeout", "10"], env=env, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(sock) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        monkeypatch.setenv("AI_STRUCTURER_USE_MOCK", "1")
+        monkeypatch.chdir(tmp_path)
+
+        main(["-i", "in.txt", "-o", "local.json", "--no-cache"])
+        with pytest.raises(SystemExit) as exc:
+            main(["--worker-socket", sock, "-i", "in.txt", "-o", "warm.json", "--no-cache"])
+        assert exc.value.code == 0
+        assert (tmp_path / "warm.json").read_bytes() == (tmp_path / "local.json").read_bytes()
+
+        with pytest.raises(SystemExit) as exc:
+            main(["--worker-socket", sock, "-i", "missing.txt", "--no-cache"])
+        assert exc.value.code == 1
+    finally:
+        worker.terminate()
+        worker.wait(5)
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+
+import pytest
+
+from ai_structurer import writers
+from ai_structurer.records import Record
+from ai_structurer.writers import write_records
+
+RECS = [
+    {"material_name": "Screws", "quantity": 20.0, "unit": "boxes", "project_name": "Phoenix", "location": None, "urgency": "high", "deadline": "2099-01-15"},
+    {"material_name": "Tuiles é", "quantity": None, "unit": None, "project_name": None, "location": "Site, A", "urgency": "low", "deadline": None},
+]
+
+
+def _write(records, fmt, **kwargs):
+    buf = io.StringIO()
+    n = write_records(records, buf, fmt, **kwargs)
+    return n, buf.getvalue()
+
+
+def test_record_is_slotted_and_round_trips():
+    rec = Record.from_dict(RECS[0])
+    assert not hasattr(rec, "__dict__")
+    assert rec.to_dict() == RECS[0] and list(rec.to_dict()) == list(RECS[0])
+    assert rec == RECS[0]
+
+
+def test_json_writer_matches_json_dumps_for_dicts_and_records(monkeypatch):
+    expected = json.dumps(RECS, ensure_ascii=False, indent=2)
+    assert _write(RECS, "json") == (2, expected)
+    monkeypatch.setattr(writers, "_CHUNK_CHARS", 10)
+    assert _write([Record.from_dict(r) for r in RECS], "json") == (2, expected)
+    assert _write([], "json")[1] == "[]"
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_compact_formats_parse_back(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(writers, "orjson", None)
+    assert json.loads(_write(RECS, "json-compact")[1]) == RECS
+    assert [json.loads(x) for x in _write(RECS, "ndjson")[1].splitlines()] == RECS
+    columns = json.loads(_write(RECS, "columnar")[1])
+    assert columns["material_name"] == ["Screws", "Tuiles é"] and columns["location"] == [None, "Site, A"]
+
+
+def test_csv_writer_and_unknown_format():
+    rows = list(csv.reader(io.StringIO(_write(RECS, "csv", flush_each=True)[1])))
+    assert rows[0][0] == "material_name" and rows[2][4] == "Site, A" and rows[2][1] == ""
+    with pytest.raises(ValueError):
+        _write(RECS, "xml")
+
+
+def test_json_writer_fast_path_matches_stdlib_on_odd_values():
+    odd = [{"a": float("nan"), "b": float("inf"), "c": True, "d": 3, "e": 'x"\n é', "f": [1, {"g": None}]}, {1: "x"}, {}]
+    assert _write(odd, "json")[1] == json.dumps(odd, ensure_ascii=False, indent=2)